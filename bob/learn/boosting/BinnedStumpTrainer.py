@@ -0,0 +1,115 @@
+from ._library import StumpMachine, weighted_histograms
+import numpy
+
+class BinnedStumpTrainer():
+  """ The class for training weak stump classifiers on quantized features.
+  The weak stump is parameterized the threshold and the polarity.
+
+  Instead of testing all unique feature values as thresholds, each feature is quantized once into at most ``number_of_bins`` bins, see :py:meth:`prepare`.
+  In each round of boosting, the thresholds are selected from the bin edges by scanning the weighted histograms of the quantized features.
+  Hence, the cost per round is linear in the number of samples and bins.
+  """
+
+  def __init__(self, number_of_bins = 256, binning = 'quantile'):
+    """Initializes the parameters of the binned stump trainer.
+
+    Keyword parameters
+      number_of_bins (int): The maximum number of bins per feature, at most 65536
+
+      binning (str):
+        The way the bin edges are computed, either 'quantile' or 'uniform'.
+        For 'quantile' binning, the bins contain (approximately) the same number of samples, while for 'uniform' binning, the bins have the same width.
+    """
+    if binning not in ('quantile', 'uniform'):
+      raise ValueError("The binning '%s' is not known; use one of 'quantile' or 'uniform'" % binning)
+    if number_of_bins < 2 or number_of_bins > 65536:
+      raise ValueError("The number of bins must be between 2 and 65536, but you used %d" % number_of_bins)
+    self.m_number_of_bins = number_of_bins
+    self.m_binning = binning
+    self._prepared_features = None
+
+
+  def prepare(self, training_features):
+    """Computes the bin edges of all features and quantizes the training features, which is re-used in all subsequent calls to :py:meth:`train` with the same training features.
+
+    This function is called automatically by :py:meth:`train` when it receives a different training feature array.
+    If the values of the training feature array are modified in-place, please call this function again.
+
+    Keyword parameters
+      training_features (float<#samples, #features>): The training features samples
+    """
+    number_of_features = training_features.shape[1]
+    # the bin edges of each feature, padded with infinity
+    self._edges = numpy.empty((number_of_features, self.m_number_of_bins - 1))
+    self._edges.fill(numpy.inf)
+    self._number_of_edges = numpy.zeros(number_of_features, numpy.int32)
+    self._bins = numpy.empty(training_features.shape, numpy.uint16)
+
+    for i in range(number_of_features):
+      feature = training_features[:,i]
+      minimum, maximum = numpy.min(feature), numpy.max(feature)
+      if self.m_binning == 'quantile':
+        edges = numpy.percentile(feature, numpy.linspace(0., 100., self.m_number_of_bins + 1)[1:-1])
+      else:
+        edges = numpy.linspace(minimum, maximum, self.m_number_of_bins + 1)[1:-1]
+      # only edges that separate the samples can be used as thresholds
+      edges = numpy.unique(edges[(edges > minimum) & (edges <= maximum)])
+
+      self._edges[i,:len(edges)] = edges
+      self._number_of_edges[i] = len(edges)
+      # the samples in bin b lie in the interval [edges[b-1], edges[b])
+      self._bins[:,i] = numpy.searchsorted(edges, feature, side='right')
+
+    self._prepared_features = training_features
+
+
+  def train(self, training_features, loss_gradient, sample_indices = None):
+    """Computes a weak stump machine.
+
+    The best weak machine is chosen to maximize the dot product of the outputs and the weights (gain), where the thresholds are restricted to the bin edges.
+    The quantized features are computed in the first call, see :py:meth:`prepare`.
+
+    Keyword parameters
+      training_features (float<#samples, #features>): The training features samples
+
+      loss_gradient (float<#samples>) or (float<#samples, 1>): The loss gradient values for the training samples
+
+      sample_indices (int32<#selected>) or None: If given, only the training samples with these indices are used; the bin edges of all training samples are kept
+
+    Returns
+      A (weak) :py:class:`bob.learn.boosting.StumpMachine`
+    """
+    if self._prepared_features is not training_features:
+      self.prepare(training_features)
+
+    number_of_samples, number_of_features = training_features.shape
+    gradient = -loss_gradient.reshape(number_of_samples, 1)
+
+    # compute the sum of the negative gradient for each bin of each feature
+    if sample_indices is not None:
+      histograms = weighted_histograms(self._bins, gradient, self.m_number_of_bins, numpy.asarray(sample_indices, numpy.int32))[:,:,0]
+    else:
+      histograms = weighted_histograms(self._bins, gradient, self.m_number_of_bins)[:,:,0]
+
+    # For all the bin edges compute the dot product, i.e., the sum of the gradients of the samples above the edge
+    grad_cs = numpy.cumsum(histograms, 1)
+    gains = grad_cs[:,-1:] - grad_cs[:,:-1]
+
+    # Find the edge that maximizes the gain for each feature
+    absolute = numpy.absolute(gains)
+    absolute[numpy.arange(self.m_number_of_bins - 1) >= self._number_of_edges[:,numpy.newaxis]] = -1.
+    best_edges = numpy.argmax(absolute, 1)
+    features = numpy.arange(number_of_features)
+    gain = absolute[features, best_edges]
+
+    #  Find the optimum id and its corresponding threshold and polarity
+    best_index = numpy.argmax(gain)
+    best_edge = best_edges[best_index]
+    if gain[best_index] < 0.:
+      # if all features are constant, we gain nothing
+      return StumpMachine(0., 1., numpy.int32(best_index))
+
+    threshold = self._edges[best_index, best_edge]
+    polarity = -1. if gains[best_index, best_edge] > 0 else 1.
+
+    return StumpMachine(threshold, polarity, numpy.int32(best_index))
@@ -1,10 +1,16 @@
 from ._library import BoostedMachine
+import bob.io.base
 import numpy
 import scipy.optimize
+import os
+import time
 import logging
 logger = logging.getLogger('bob')
 
 
+# The number of rounds after which cached sample weights are renormalized
+RENORMALIZATION_ROUNDS = 10
+
 class Boosting:
   """ The class to boost the features from  a set of training samples.
 
@@ -21,12 +27,75 @@ class Boosting:
     loss_function : a class derived from :py:class:`bob.learn.boosting.LossFunction`
       The function to define the weights for the weak machines.
 
+    line_search : str or callable
+      The strategy to compute the weights (alpha) of the weak machines, one of:
+
+      * ``'auto'``: use the closed form solution of the loss function (``optimal_alpha``) if available, otherwise Newton's method if the loss function implements ``loss_hessian``, otherwise L-BFGS
+      * ``'newton'``: use Newton's method, which requires ``loss_hessian``
+      * ``'lbfgs'``: always use ``scipy.optimize.fmin_l_bfgs_b``
+      * a function ``line_search(targets, previous_scores, current_scores)`` that returns the weights, or ``None`` if it cannot compute them
+
+      Whenever a strategy does not provide a solution, e.g., when the optimal alpha is infinite or Newton's method does not converge, L-BFGS is used as a fallback.
+
+    subsample : float
+      The fraction of the training samples that are used to train the weak machine in each round (stochastic gradient boosting).
+      The selected samples are passed as ``sample_indices`` to the ``train`` function of the weak trainer, so that the training features are not copied.
+      With the default ``1.``, all samples are used.
+
+    sampling : str
+      The way the samples of each round are selected, one of:
+
+      * ``'uniform'``: select the samples uniformly at random
+      * ``'goss'``: gradient-based one-side sampling; the ``top_rate`` fraction of the samples with the largest loss gradient is always selected, and the remaining samples are selected uniformly from the others, while their gradient is amplified accordingly (only for training the weak machine)
+
+    top_rate : float
+      The fraction of the training samples with the largest loss gradient that are always selected for ``'goss'`` sampling; must not be larger than ``subsample``.
+
+    subsample_line_search : bool
+      If enabled, the weights (alpha) of the weak machines are computed using the selected samples only; otherwise all training samples are used.
+      This cannot be combined with ``'goss'`` sampling, since the line search does not support the amplification of the samples.
+
+    random_seed : int or None
+      The seed for selecting the samples; if given, the samples of each round depend only on the seed and the round, otherwise :py:mod:`numpy.random` is used.
+
+    trim_fraction : float or None
+      If given, weight trimming is enabled: in each round, the weak machine is trained with the smallest set of samples, which covers this fraction (e.g. ``0.99``) of the sum of the absolute loss gradients.
+      Samples with negligible gradients, e.g., well classified samples for :py:class:`bob.learn.boosting.ExponentialLoss`, are hence skipped by the weak trainer.
+      When subsampling is enabled as well, the samples are selected from the trimmed samples.
+
+    trim_refresh_rounds : int
+      When weight trimming is enabled, all samples are used in every round that is a multiple of this number, so that no sample is lost permanently.
+
+  For loss functions that provide sample weights (such as :py:class:`bob.learn.boosting.ExponentialLoss`), the weights are cached during training and updated multiplicatively in each round, instead of recomputing the loss gradient from the scores.
+
   """
 
 
-  def __init__(self, weak_trainer, loss_function):
+  def __init__(self, weak_trainer, loss_function, line_search = 'auto', subsample = 1., sampling = 'uniform', top_rate = 0.2, subsample_line_search = False, random_seed = None, trim_fraction = None, trim_refresh_rounds = 10):
+    if line_search not in ('auto', 'newton', 'lbfgs') and not callable(line_search):
+      raise ValueError("The line search '%s' is not known; use one of 'auto', 'newton', 'lbfgs' or a function" % line_search)
+    if not 0. < subsample <= 1.:
+      raise ValueError("The subsample fraction must be in the interval (0, 1], but you used %f" % subsample)
+    if sampling not in ('uniform', 'goss'):
+      raise ValueError("The sampling '%s' is not known; use one of 'uniform' or 'goss'" % sampling)
+    if sampling == 'goss' and not 0. <= top_rate <= subsample:
+      raise ValueError("The top rate must be in the interval [0, %f], but you used %f" % (subsample, top_rate))
+    if sampling == 'goss' and subsample_line_search:
+      raise ValueError("The line search cannot be restricted to the selected samples for 'goss' sampling, since the selected samples are amplified")
+    if trim_fraction is not None and not 0. < trim_fraction <= 1.:
+      raise ValueError("The trim fraction must be in the interval (0, 1], but you used %f" % trim_fraction)
+    if trim_refresh_rounds < 1:
+      raise ValueError("The number of rounds after which all samples are used must be positive, but you used %d" % trim_refresh_rounds)
     self.m_trainer = weak_trainer
     self.m_loss_function = loss_function
+    self.m_line_search = line_search
+    self.m_subsample = subsample
+    self.m_sampling = sampling
+    self.m_top_rate = top_rate
+    self.m_subsample_line_search = subsample_line_search
+    self.m_random_seed = random_seed
+    self.m_trim_fraction = trim_fraction
+    self.m_trim_refresh_rounds = trim_refresh_rounds
 
 
   def get_loss_function(self):
@@ -34,14 +103,25 @@ class Boosting:
     return self.m_loss_function
 
 
-  def train(self, training_features, training_targets, number_of_rounds = 20, boosted_machine = None):
+  def train(self, training_features, training_targets, number_of_rounds = 20, boosted_machine = None, validation_features = None, validation_targets = None, patience = 10, checkpoint_file = None, checkpoint_rounds = 10, checkpoint_seconds = None):
     """The function to train a boosting machine.
 
     The function boosts the training features and returns a strong classifier as a weighted combination of weak classifiers.
 
+    When validation data is given, the training stops early when the loss on the validation set did not decrease for ``patience`` rounds.
+    The scores of the validation samples are updated in each round using the new weak machine only.
+    In this case, the returned machine contains only the weak machines up to the round with the lowest validation loss, see :py:meth:`bob.learn.boosting.BoostedMachine.truncate`.
+
+    When a checkpoint file is given, the state of the training is written to this HDF5 file regularly and at the end of the training.
+    The state contains the boosted machine, the scores of the training (and validation) samples, the number of finished rounds, and the states of the random generators that select the samples and the features (see :py:attr:`bob.learn.boosting.LUTTrainer.random_state`).
+    Hence, a resumed training selects the same samples and features as the uninterrupted training.
+    If the checkpoint file exists when the training starts, the training is resumed from this state, without re-computing the scores of the training samples.
+    If the training in the checkpoint file has stopped early, the machine with the lowest validation loss is returned right away.
+    In this case, ``number_of_rounds`` is the total number of rounds, including the rounds that were finished before.
+
     Keyword parameters:
 
-    training_features : uint16 <#samples, #features> or float <#samples, #features>)
+    training_features : uint8, uint16 or float <#samples, #features>)
       Features extracted from the training samples.
 
     training_targets : float <#samples, #outputs>
@@ -52,6 +132,25 @@ class Boosting:
 
     boosted_machine :py:class:`bob.learn.boosting.BoostedMachine` or None
       The machine to add the weak machines to. If not given, a new machine is created.
+      When validation data is given, the weak machines are added to a copy of this machine, which is left untouched.
+
+    validation_features : uint8, uint16 or float <#samples, #features> or None
+      Features extracted from the validation samples, which are used for early stopping.
+
+    validation_targets : float <#samples, #outputs> or None
+      The values that the boosted classifier should reach for the validation samples.
+
+    patience : int
+      The number of rounds without improvement of the validation loss, after which the training stops.
+
+    checkpoint_file : str or None
+      The name of the HDF5 file to write the checkpoints to, and to resume the training from.
+
+    checkpoint_rounds : int or None
+      Write a checkpoint each time after this number of rounds.
+
+    checkpoint_seconds : float or None
+      Write a checkpoint when this number of seconds has passed since the last checkpoint.
 
     Returns : :py:class:`bob.learn.boosting.BoostedMachine`
       The boosted machine that is combination of the weak classifiers.
@@ -67,51 +166,308 @@ class Boosting:
     strong_predicted_scores = numpy.zeros((number_of_samples, number_of_outputs))
     weak_predicted_scores = numpy.ndarray((number_of_samples, number_of_outputs))
 
-    if boosted_machine is not None:
+    # the state stored in the checkpoint file
+    first_round = 0
+    checkpoint = None
+    if checkpoint_file is not None and os.path.exists(checkpoint_file):
+      if boosted_machine is not None:
+        raise ValueError("A boosted machine cannot be given when resuming from the checkpoint file '%s'" % checkpoint_file)
+      checkpoint = bob.io.base.HDF5File(checkpoint_file)
+      first_round = int(checkpoint.read("Round"))
+      strong_predicted_scores = checkpoint.read("StrongScores").reshape(-1, number_of_outputs)
+      if strong_predicted_scores.shape[0] != number_of_samples:
+        raise ValueError("The checkpoint file '%s' was written for %d instead of %d training samples" % (checkpoint_file, strong_predicted_scores.shape[0], number_of_samples))
+      checkpoint.cd("Machine")
+      boosted_machine = BoostedMachine(checkpoint)
+      checkpoint.cd("..")
+      if "Finished" in checkpoint and checkpoint.read("Finished"):
+        logger.info("The training in checkpoint file '%s' has stopped early after round %d" % (checkpoint_file, first_round))
+        return boosted_machine.truncate(int(checkpoint.read("BestNumberOfMachines")))
+      self._restore_random_states(checkpoint)
+      logger.info("Resuming boosting after round %d from checkpoint file '%s'" % (first_round, checkpoint_file))
+    elif boosted_machine is not None:
+      if validation_features is not None:
+        # early stopping returns a truncated copy, so the given machine should not get the rounds after the best round either
+        boosted_machine = boosted_machine.truncate(len(boosted_machine.weak_machines))
       boosted_machine(training_features, strong_predicted_scores)
     else:
       boosted_machine = BoostedMachine()
 
+    # Keep the validation scores up to date for early stopping
+    validation_scores = None
+    number_of_machines = len(boosted_machine.weak_machines)
+    if validation_features is not None:
+      if validation_targets is None:
+        raise ValueError("The validation targets are required for early stopping")
+      if(len(validation_targets.shape) == 1):
+        validation_targets = validation_targets[:,numpy.newaxis]
+      weak_validation_scores = numpy.ndarray((validation_features.shape[0], number_of_outputs))
+      if checkpoint is not None and "ValidationScores" in checkpoint:
+        validation_scores = checkpoint.read("ValidationScores").reshape(-1, number_of_outputs)
+        best_validation_loss = float(checkpoint.read("BestValidationLoss"))
+        best_number_of_machines = int(checkpoint.read("BestNumberOfMachines"))
+      else:
+        validation_scores = numpy.zeros((validation_features.shape[0], number_of_outputs))
+        if number_of_machines:
+          boosted_machine(validation_features, validation_scores)
+        best_validation_loss = numpy.sum(self.m_loss_function.loss(validation_targets, validation_scores))
+        best_number_of_machines = number_of_machines
+
+    # Keep the sample weights as a state for loss functions that support it
+    sample_weights = None
+    if hasattr(self.m_loss_function, 'update_sample_weights'):
+      if checkpoint is not None and "SampleWeights" in checkpoint:
+        sample_weights = checkpoint.read("SampleWeights").reshape(-1, number_of_outputs)
+      else:
+        sample_weights = self.m_loss_function.sample_weights(training_targets, strong_predicted_scores)
+    del checkpoint
+
+    def save_checkpoint(finished_rounds, finished = False):
+      validation_state = (validation_scores, best_validation_loss, best_number_of_machines) if validation_scores is not None else None
+      self._save_checkpoint(checkpoint_file, finished_rounds, boosted_machine, strong_predicted_scores, sample_weights, validation_state, finished)
+
+    finished_rounds = first_round
+    stopped_early = False
+    last_checkpoint = time.time()
+
+    # The weak trainer might re-use the sort order of the training features from an earlier training, which is stale if the features were modified in-place
+    if hasattr(self.m_trainer, 'prepare'):
+      self.m_trainer.prepare(training_features)
+
     # Start boosting iterations for num_rnds rounds
-    logger.info("Starting %d rounds of boosting" % number_of_rounds)
-    for round in range(number_of_rounds):
+    logger.info("Starting %d rounds of boosting" % (number_of_rounds - first_round))
+    for round in range(first_round, number_of_rounds):
 
       logger.debug("Starting round %d" % (round+1))
 
       # Compute the gradient of the loss function, l'(y,f(x)) using loss_class
-      loss_gradient = self.m_loss_function.loss_gradient(training_targets, strong_predicted_scores)
-
-      # Select the best weak machine for current round of boosting
-      weak_machine = self.m_trainer.train(training_features, loss_gradient)
+      if sample_weights is not None:
+        loss_gradient = self.m_loss_function.loss_gradient_from_weights(training_targets, sample_weights)
+      else:
+        loss_gradient = self.m_loss_function.loss_gradient(training_targets, strong_predicted_scores)
+
+      # Select the best weak machine for current round of boosting, using the selected samples only
+      sample_indices, weak_gradient = self._select_samples(loss_gradient, round)
+      if sample_indices is not None:
+        weak_machine = self.m_trainer.train(training_features, weak_gradient, sample_indices)
+      else:
+        weak_machine = self.m_trainer.train(training_features, weak_gradient)
 
       # Compute the classification scores of the samples based only on the current round weak classifier (g_r)
       weak_machine(training_features, weak_predicted_scores)
 
-      # Perform L-BFGS minimization and compute the scale (alpha_r) for current weak machine
-      alpha, _, flags = scipy.optimize.fmin_l_bfgs_b(
-          func   = self.m_loss_function.loss_sum,
-          x0     = numpy.zeros(number_of_outputs),
-          fprime = self.m_loss_function.loss_gradient_sum,
-          args   = (training_targets, strong_predicted_scores, weak_predicted_scores),
-#          disp = 1
-      )
-      # check output of L-BFGS
-      if flags['warnflag'] != 0:
-        msg = "too many function evaluations or too many iterations" if flags['warnflag'] == 1 else flags['task']
-        if (alpha == numpy.zeros(number_of_outputs)).all():
-          logger.error("L-BFGS returned zero weights with error '%d': %s" % (flags['warnflag'], msg))
-          return boosted_machine
-        else:
-          logger.warn("L-BFGS returned warning '%d': %s" % (flags['warnflag'], msg))
-
+      # Compute the scale (alpha_r) for current weak machine
+      if sample_indices is not None and self.m_subsample_line_search:
+        alpha = self._line_search(training_targets[sample_indices], strong_predicted_scores[sample_indices], weak_predicted_scores[sample_indices], sample_weights[sample_indices] if sample_weights is not None else None)
+      else:
+        alpha = self._line_search(training_targets, strong_predicted_scores, weak_predicted_scores, sample_weights)
+      if alpha is None:
+        break
 
       # Update the prediction score after adding the score from the current weak classifier f(x) = f(x) + alpha_r*g_r
       strong_predicted_scores += alpha * weak_predicted_scores
+      if sample_weights is not None:
+        self.m_loss_function.update_sample_weights(sample_weights, training_targets, alpha, weak_predicted_scores)
+        if (round + 1) % RENORMALIZATION_ROUNDS == 0:
+          # avoid under- or overflow; a global scale changes neither the selected weak machines nor their weights
+          sample_weights /= numpy.mean(sample_weights)
 
       # Add the current weak machine into the boosting machine
       boosted_machine.add_weak_machine(weak_machine, alpha)
+      number_of_machines += 1
+      finished_rounds = round + 1
 
       logger.info("Finished round %d / %d" % (round+1, number_of_rounds))
 
+      if validation_scores is not None:
+        # Update the validation scores with the current weak machine only
+        weak_machine(validation_features, weak_validation_scores)
+        validation_scores += alpha * weak_validation_scores
+        validation_loss = numpy.sum(self.m_loss_function.loss(validation_targets, validation_scores))
+        logger.debug("The validation loss after round %d is %f" % (round+1, validation_loss))
+        if validation_loss < best_validation_loss:
+          best_validation_loss = validation_loss
+          best_number_of_machines = number_of_machines
+        elif number_of_machines - best_number_of_machines >= patience:
+          logger.info("Stopping early after round %d, since the validation loss did not decrease for %d rounds" % (round+1, patience))
+          stopped_early = True
+          break
+
+      if checkpoint_file is not None and ((checkpoint_rounds and finished_rounds % checkpoint_rounds == 0) or (checkpoint_seconds is not None and time.time() - last_checkpoint >= checkpoint_seconds)):
+        save_checkpoint(finished_rounds)
+        last_checkpoint = time.time()
+
+    if checkpoint_file is not None and number_of_machines:
+      # a resumed training must not continue after it has stopped early
+      save_checkpoint(finished_rounds, stopped_early)
+
+    if validation_scores is not None and best_number_of_machines < number_of_machines:
+      # return the machine with the lowest validation loss
+      return boosted_machine.truncate(best_number_of_machines)
+
     return boosted_machine
 
+
+  def _select_samples(self, loss_gradient, round):
+    """Returns the sorted indices of the training samples selected for the given round (or ``None`` if all samples are used), and the loss gradient to train the weak machine with.
+    The samples are trimmed first (if enabled), and the remaining samples are subsampled afterwards.
+    For 'goss' sampling, the loss gradient of the randomly selected samples is amplified in a copy; otherwise, the given loss gradient is returned."""
+    number_of_samples = loss_gradient.shape[0]
+    magnitude = None
+
+    # trim the samples with negligible gradients, except in the rounds in which all samples are revisited
+    candidates = None
+    if self.m_trim_fraction is not None and round % self.m_trim_refresh_rounds:
+      magnitude = numpy.sum(numpy.abs(loss_gradient), 1)
+      order = numpy.argsort(-magnitude, kind='mergesort')
+      mass = numpy.cumsum(magnitude[order])
+      # the smallest set of samples that covers the requested fraction of the gradient mass
+      number_of_kept = min(int(numpy.searchsorted(mass, self.m_trim_fraction * mass[-1])) + 1, number_of_samples)
+      if number_of_kept < number_of_samples:
+        candidates = numpy.sort(order[:number_of_kept])
+        logger.debug("Trimmed %d of %d samples in round %d" % (number_of_samples - number_of_kept, number_of_samples, round+1))
+
+    number_of_candidates = number_of_samples if candidates is None else len(candidates)
+    number_of_selected = max(1, int(self.m_subsample * number_of_candidates + 0.5))
+    if number_of_selected >= number_of_candidates:
+      return (None if candidates is None else candidates.astype(numpy.int32)), loss_gradient
+
+    # select the positions in the candidates
+    random = numpy.random if self.m_random_seed is None else numpy.random.RandomState((self.m_random_seed, round))
+    if self.m_sampling == 'uniform':
+      selected = random.choice(number_of_candidates, number_of_selected, replace=False)
+    else:
+      # keep the samples with the largest gradients, and select the others randomly
+      if magnitude is None:
+        magnitude = numpy.sum(numpy.abs(loss_gradient), 1)
+      number_of_top = min(int(self.m_top_rate * number_of_candidates + 0.5), number_of_selected)
+      order = numpy.argsort(-(magnitude if candidates is None else magnitude[candidates]), kind='mergesort')
+      others = random.choice(order[number_of_top:], number_of_selected - number_of_top, replace=False)
+      if len(others):
+        # the small gradients are amplified to keep the expected gradient sum of the unselected samples
+        # (in a copy, so that the loss gradient itself is not changed)
+        loss_gradient = loss_gradient.copy()
+        loss_gradient[others if candidates is None else candidates[others]] *= float(number_of_candidates - number_of_top) / len(others)
+      selected = numpy.concatenate((order[:number_of_top], others))
+
+    # sorted indices provide a better memory access pattern in the weak trainers
+    selected = numpy.sort(selected)
+    if candidates is not None:
+      selected = candidates[selected]
+    return selected.astype(numpy.int32), loss_gradient
+
+
+  def _save_checkpoint(self, checkpoint_file, finished_rounds, boosted_machine, strong_predicted_scores, sample_weights, validation_state, finished = False):
+    """Writes the current state of the training to the given checkpoint file.
+    If ``finished`` is set, the training has stopped early and cannot be resumed."""
+    # write to a temporary file first, so that the previous checkpoint is kept when writing is interrupted
+    temporary_file = checkpoint_file + ".tmp"
+    hdf5 = bob.io.base.HDF5File(temporary_file, 'w')
+    hdf5.set("Round", finished_rounds)
+    hdf5.set("Finished", int(finished))
+    hdf5.set("StrongScores", strong_predicted_scores)
+    if sample_weights is not None:
+      hdf5.set("SampleWeights", sample_weights)
+    if validation_state is not None:
+      validation_scores, best_validation_loss, best_number_of_machines = validation_state
+      hdf5.set("ValidationScores", validation_scores)
+      hdf5.set("BestValidationLoss", float(best_validation_loss))
+      hdf5.set("BestNumberOfMachines", best_number_of_machines)
+    if hasattr(self.m_trainer, 'random_state'):
+      hdf5.set("TrainerRandomState", self.m_trainer.random_state)
+    if self.m_random_seed is None and self.m_subsample < 1.:
+      # the samples are selected with the global numpy generator
+      _, keys, position, has_gauss, cached_gaussian = numpy.random.get_state()
+      hdf5.set("NumpyRandomKeys", keys)
+      hdf5.set("NumpyRandomPosition", int(position))
+      hdf5.set("NumpyRandomHasGauss", int(has_gauss))
+      hdf5.set("NumpyRandomCachedGaussian", float(cached_gaussian))
+    hdf5.create_group("Machine")
+    hdf5.cd("Machine")
+    boosted_machine.save(hdf5)
+    hdf5.cd("..")
+    del hdf5
+    os.rename(temporary_file, checkpoint_file)
+    logger.debug("Wrote checkpoint after round %d to file '%s'" % (finished_rounds, checkpoint_file))
+
+
+  def _restore_random_states(self, checkpoint):
+    """Restores the states of the random generators of the weak trainer and of the sample selection from the given checkpoint file."""
+    if "TrainerRandomState" in checkpoint:
+      self.m_trainer.random_state = checkpoint.read("TrainerRandomState")
+    if "NumpyRandomKeys" in checkpoint:
+      numpy.random.set_state(('MT19937', checkpoint.read("NumpyRandomKeys"), int(checkpoint.read("NumpyRandomPosition")), int(checkpoint.read("NumpyRandomHasGauss")), float(checkpoint.read("NumpyRandomCachedGaussian"))))
+
+
+  def _line_search(self, targets, previous_scores, current_scores, sample_weights = None):
+    """Computes the weights of the current weak machine using the selected line search strategy, falling back to L-BFGS."""
+    alpha = None
+    if callable(self.m_line_search):
+      alpha = self.m_line_search(targets, previous_scores, current_scores)
+    else:
+      if self.m_line_search == 'auto' and hasattr(self.m_loss_function, 'optimal_alpha'):
+        alpha = self.m_loss_function.optimal_alpha(targets, previous_scores, current_scores, sample_weights)
+      if alpha is None and self.m_line_search in ('auto', 'newton') and hasattr(self.m_loss_function, 'loss_hessian'):
+        alpha = self._newton(targets, previous_scores, current_scores)
+
+    if alpha is not None:
+      return numpy.asarray(alpha, numpy.float64).reshape(targets.shape[1])
+
+    return self._lbfgs(targets, previous_scores, current_scores)
+
+
+  def _newton(self, targets, previous_scores, current_scores, maximum_iterations = 20, tolerance = 1e-10):
+    """Minimizes the loss sum with Newton's method; returns None if the method does not converge."""
+    alpha = numpy.zeros(targets.shape[1])
+    for iteration in range(maximum_iterations):
+      gradient = self.m_loss_function.loss_gradient_sum(alpha, targets, previous_scores, current_scores)
+      hessian = self.m_loss_function.loss_hessian_sum(alpha, targets, previous_scores, current_scores)
+      if not numpy.all(hessian > 0.):
+        # the loss is not (strictly) convex at the current alpha
+        return None
+      step = gradient / hessian
+      alpha -= step
+      if not numpy.all(numpy.isfinite(alpha)):
+        return None
+      if numpy.all(numpy.abs(step) <= tolerance * (1. + numpy.abs(alpha))):
+        logger.debug("Newton's method converged after %d iterations" % (iteration+1))
+        return alpha
+
+    # e.g., for separable data the optimal alpha is infinite
+    logger.debug("Newton's method did not converge after %d iterations" % maximum_iterations)
+    return None
+
+
+  def _lbfgs(self, targets, previous_scores, current_scores):
+    """Minimizes the loss sum with L-BFGS; returns None if the optimization failed."""
+    number_of_outputs = targets.shape[1]
+    if hasattr(self.m_loss_function, 'loss_and_gradient_sum'):
+      # compute the loss and its gradient at once, writing the gradient into a pre-allocated array
+      gradient_sum = numpy.ndarray((number_of_outputs,))
+      def func(alpha, *args):
+        loss_sum, _ = self.m_loss_function.loss_and_gradient_sum(alpha, *args, gradient_sum = gradient_sum)
+        # the weights of the outputs are independent, so the sum over the outputs can be optimized
+        return numpy.sum(loss_sum), gradient_sum.copy()
+      fprime = None
+    else:
+      # the weights of the outputs are independent, so the sum over the outputs can be optimized
+      func = lambda *args: numpy.sum(self.m_loss_function.loss_sum(*args))
+      fprime = self.m_loss_function.loss_gradient_sum
+
+    alpha, _, flags = scipy.optimize.fmin_l_bfgs_b(
+        func   = func,
+        x0     = numpy.zeros(number_of_outputs),
+        fprime = fprime,
+        args   = (targets, previous_scores, current_scores),
+#        disp = 1
+    )
+    # check output of L-BFGS
+    if flags['warnflag'] != 0:
+      msg = "too many function evaluations or too many iterations" if flags['warnflag'] == 1 else flags['task']
+      if (alpha == numpy.zeros(number_of_outputs)).all():
+        logger.error("L-BFGS returned zero weights with error '%d': %s" % (flags['warnflag'], msg))
+        return None
+      else:
+        logger.warn("L-BFGS returned warning '%d': %s" % (flags['warnflag'], msg))
+
+    return alpha
@@ -0,0 +1,165 @@
+from ._library import BoostedMachine
+import numpy
+
+class Cascade:
+  """A cascade of uni-variate strong classifiers, as introduced by Viola and Jones.
+
+  Each stage of the cascade is a :py:class:`bob.learn.boosting.BoostedMachine` with a threshold.
+  A sample is rejected by the first stage, for which its prediction is below the threshold of this stage.
+  Only samples that pass all stages are accepted by the cascade.
+  Since most of the (negative) samples are rejected by the first stages, which usually contain only few weak machines, the evaluation of the cascade is much faster than the evaluation of a single strong classifier with the same accuracy.
+
+  Cascades are usually trained by :py:class:`bob.learn.boosting.CascadeTrainer`.
+
+  **Constructor Documentation**
+
+  Keyword parameters
+
+    hdf5 : :py:class:`bob.io.base.HDF5File` or None
+      If given, the cascade is read from the given file, see :py:meth:`load`.
+  """
+
+  def __init__(self, hdf5 = None):
+    self.m_stages = []
+    self.m_thresholds = []
+    if hdf5 is not None:
+      self.load(hdf5)
+
+
+  def add_stage(self, machine, threshold):
+    """Adds the given strong machine as the last stage of the cascade.
+
+    Keyword parameters
+
+      machine : :py:class:`bob.learn.boosting.BoostedMachine`
+        The uni-variate strong machine of the stage.
+
+      threshold : float
+        The samples with a prediction below this threshold are rejected by this stage.
+    """
+    if machine.outputs != 1:
+      raise ValueError("Only uni-variate machines can be used as stages of the cascade")
+    self.m_stages.append(machine)
+    self.m_thresholds.append(float(threshold))
+
+
+  def stages(self):
+    """Returns the list of strong machines of the stages of the cascade."""
+    return self.m_stages
+
+
+  def thresholds(self):
+    """Returns the thresholds of the stages of the cascade."""
+    return numpy.array(self.m_thresholds)
+
+
+  def __len__(self):
+    """Returns the number of stages of the cascade."""
+    return len(self.m_stages)
+
+
+  def __call__(self, features, number_of_threads = 1):
+    """Computes the predictions and the exit stages of the given feature vector(s).
+
+    For a single feature vector, the stages are evaluated one by one.
+    For several feature vectors, each stage is evaluated in one batch for all samples that were not rejected by the previous stages.
+
+    Keyword parameters
+
+      features : uint8 or uint16 <#inputs> or uint8 or uint16 <#samples, #inputs>
+        The feature vector(s) to classify.
+
+      number_of_threads : int
+        The number of threads used to evaluate the stages for several feature vectors, see :py:meth:`bob.learn.boosting.BoostedMachine.forward`.
+
+    Returns
+
+      prediction(s) : float or float <#samples>
+        The prediction of the last stage that was evaluated, i.e., of the rejecting stage or of the last stage.
+
+      exit stage(s) : int or int32 <#samples>
+        The index of the stage that rejected the sample, or the number of stages for accepted samples.
+    """
+    if not self.m_stages:
+      raise ValueError("The cascade does not contain any stage")
+
+    if features.ndim == 1:
+      for stage, (machine, threshold) in enumerate(zip(self.m_stages, self.m_thresholds)):
+        prediction = machine(features)
+        if prediction < threshold:
+          return prediction, stage
+      return prediction, len(self.m_stages)
+
+    number_of_samples = features.shape[0]
+    predictions = numpy.zeros(number_of_samples)
+    exit_stages = numpy.empty(number_of_samples, numpy.int32)
+    exit_stages.fill(len(self.m_stages))
+
+    # the indices of the samples that have not been rejected yet
+    active = numpy.arange(number_of_samples)
+    for stage, (machine, threshold) in enumerate(zip(self.m_stages, self.m_thresholds)):
+      if not len(active):
+        break
+      stage_features = features if len(active) == number_of_samples else features[active]
+      scores = numpy.ndarray((len(active),), numpy.float64)
+      machine(stage_features, scores, number_of_threads = number_of_threads)
+      predictions[active] = scores
+
+      rejected = scores < threshold
+      exit_stages[active[rejected]] = stage
+      active = active[~rejected]
+
+    return predictions, exit_stages
+
+
+  def accepted(self, features, number_of_threads = 1):
+    """Returns the indices of the given feature vectors that are accepted by all stages of the cascade.
+
+    Keyword parameters
+
+      features : uint8 or uint16 <#samples, #inputs>
+        The feature vectors to classify.
+
+      number_of_threads : int
+        The number of threads used to evaluate the stages.
+
+    Returns : int <#accepted>
+      The indices of the accepted samples.
+    """
+    return numpy.flatnonzero(self(features, number_of_threads)[1] == len(self.m_stages))
+
+
+  def save(self, hdf5):
+    """Writes the cascade to the given HDF5 file.
+
+    The thresholds are written to the ``Thresholds`` dataset, and the strong machine of each stage to the group ``Stage_<index>``.
+
+    Keyword parameters
+
+      hdf5 : :py:class:`bob.io.base.HDF5File`
+        The file open for writing.
+    """
+    hdf5.set("Thresholds", numpy.array(self.m_thresholds))
+    for stage, machine in enumerate(self.m_stages):
+      group = "Stage_%d" % stage
+      hdf5.create_group(group)
+      hdf5.cd(group)
+      machine.save(hdf5)
+      hdf5.cd("..")
+
+
+  def load(self, hdf5):
+    """Reads the cascade from the given HDF5 file, replacing all stages.
+
+    Keyword parameters
+
+      hdf5 : :py:class:`bob.io.base.HDF5File`
+        The file open for reading.
+    """
+    thresholds = numpy.atleast_1d(hdf5.read("Thresholds"))
+    self.m_stages = []
+    self.m_thresholds = []
+    for stage, threshold in enumerate(thresholds):
+      hdf5.cd("Stage_%d" % stage)
+      self.add_stage(BoostedMachine(hdf5), threshold)
+      hdf5.cd("..")
@@ -0,0 +1,137 @@
+from .Cascade import Cascade
+import numpy
+import logging
+logger = logging.getLogger('bob')
+
+class CascadeTrainer:
+  """Trains a Viola-Jones style :py:class:`bob.learn.boosting.Cascade` of uni-variate strong classifiers.
+
+  Each stage is trained with the given :py:class:`bob.learn.boosting.Boosting` trainer.
+  Weak machines are added to the stage until the stage reaches the requested false alarm rate, while its threshold is adapted to keep the requested hit rate of the positive samples.
+  Each stage is trained only with the positive and negative samples that were accepted by all previous stages.
+  The negative samples are mined from a (large) pool of negatives by evaluating the new stage in batches.
+
+  **Constructor Documentation**
+
+  Keyword parameters
+
+    boosting : :py:class:`bob.learn.boosting.Boosting`
+      The trainer for the strong classifiers of the stages; it must be set up for uni-variate classification.
+
+    hit_rate : float
+      The minimum fraction of the positive training samples that must be accepted by each stage.
+
+    false_alarm_rate : float
+      The maximum fraction of the negative training samples that should be accepted by each stage.
+
+    initial_rounds : int
+      The number of rounds of boosting that are performed for a new stage.
+
+    rounds_increment : int
+      The number of rounds of boosting that are added to a stage, until it reaches the false alarm rate.
+
+    maximum_rounds : int
+      The maximum number of weak machines of a stage.
+
+    negatives_per_stage : int or None
+      The maximum number of negative samples used to train each stage; if ``None``, all negatives of the pool that were not rejected are used.
+
+    number_of_threads : int
+      The number of threads used to evaluate the stages on the pool of negatives.
+  """
+
+  def __init__(self, boosting, hit_rate = 0.995, false_alarm_rate = 0.5, initial_rounds = 2, rounds_increment = 2, maximum_rounds = 200, negatives_per_stage = None, number_of_threads = 1):
+    if not 0. < hit_rate <= 1.:
+      raise ValueError("The hit rate must be in the interval (0, 1], but you used %f" % hit_rate)
+    if not 0. < false_alarm_rate <= 1.:
+      raise ValueError("The false alarm rate must be in the interval (0, 1], but you used %f" % false_alarm_rate)
+    self.m_boosting = boosting
+    self.m_hit_rate = hit_rate
+    self.m_false_alarm_rate = false_alarm_rate
+    self.m_initial_rounds = initial_rounds
+    self.m_rounds_increment = rounds_increment
+    self.m_maximum_rounds = maximum_rounds
+    self.m_negatives_per_stage = negatives_per_stage
+    self.m_number_of_threads = number_of_threads
+
+
+  def train(self, positives, negatives, number_of_stages = 10):
+    """Trains a cascade with the given number of stages.
+
+    The training stops early, when all negative samples are rejected by the cascade.
+
+    Keyword parameters
+
+      positives : uint8 or uint16 <#positives, #features>
+        The features of the positive training samples.
+
+      negatives : uint8 or uint16 <#negatives, #features>
+        The features of the pool of negative training samples.
+
+      number_of_stages : int
+        The (maximum) number of stages of the cascade.
+
+    Returns : :py:class:`bob.learn.boosting.Cascade`
+      The trained cascade.
+    """
+    cascade = Cascade()
+    # the indices of the samples that passed all stages so far
+    positive_indices = numpy.arange(positives.shape[0])
+    negative_indices = numpy.arange(negatives.shape[0])
+
+    for stage in range(number_of_stages):
+      if not len(negative_indices):
+        logger.info("All negative samples are rejected after %d stages" % stage)
+        break
+
+      # select the negatives for the current stage
+      training_negatives = negative_indices
+      if self.m_negatives_per_stage is not None and len(negative_indices) > self.m_negatives_per_stage:
+        training_negatives = numpy.sort(numpy.random.choice(negative_indices, self.m_negatives_per_stage, replace=False))
+
+      machine, threshold = self._train_stage(positives[positive_indices], negatives[training_negatives])
+      cascade.add_stage(machine, threshold)
+
+      # keep only the samples that pass the new stage
+      positive_indices = positive_indices[self._passed(machine, threshold, positives[positive_indices])]
+      negative_indices = negative_indices[self._passed(machine, threshold, negatives[negative_indices])]
+      logger.info("Finished stage %d / %d with %d weak machines; %d positive and %d negative samples remain" % (stage+1, number_of_stages, len(machine.weak_machines), len(positive_indices), len(negative_indices)))
+
+    return cascade
+
+
+  def _passed(self, machine, threshold, features):
+    """Returns the mask of the samples that pass the given stage."""
+    scores = numpy.ndarray((features.shape[0],), numpy.float64)
+    machine(features, scores, number_of_threads = self.m_number_of_threads)
+    return scores >= threshold
+
+
+  def _threshold(self, positive_scores):
+    """Returns the highest threshold that accepts the requested fraction of the given positive scores."""
+    sorted_scores = numpy.sort(positive_scores)
+    return sorted_scores[int(numpy.floor((1. - self.m_hit_rate) * len(sorted_scores)))]
+
+
+  def _train_stage(self, positives, negatives):
+    """Trains a single stage and returns its strong machine and threshold."""
+    features = numpy.vstack((positives, negatives))
+    targets = numpy.hstack((numpy.ones(positives.shape[0]), -numpy.ones(negatives.shape[0])))
+    scores = numpy.ndarray((features.shape[0],), numpy.float64)
+
+    machine = None
+    rounds = self.m_initial_rounds
+    while True:
+      number_of_machines = len(machine.weak_machines) if machine is not None else 0
+      machine = self.m_boosting.train(features, targets, min(rounds, self.m_maximum_rounds - number_of_machines), machine)
+      machine(features, scores)
+      threshold = self._threshold(scores[:positives.shape[0]])
+      false_alarm_rate = numpy.mean(scores[positives.shape[0]:] >= threshold)
+      logger.debug("The stage with %d weak machines has a false alarm rate of %f" % (len(machine.weak_machines), false_alarm_rate))
+
+      if false_alarm_rate <= self.m_false_alarm_rate or len(machine.weak_machines) >= self.m_maximum_rounds:
+        return machine, threshold
+      if len(machine.weak_machines) == number_of_machines:
+        # boosting did not add any weak machine
+        return machine, threshold
+      rounds = self.m_rounds_increment
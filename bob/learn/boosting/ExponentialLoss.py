@@ -3,7 +3,10 @@ from .LossFunction import LossFunction
 import numpy
 
 class ExponentialLoss (LossFunction):
-  """ The class implements the exponential loss function for the boosting framework."""
+  """ The class implements the exponential loss function for the boosting framework.
+
+  Since the exponential loss of the samples is multiplicative in the scores of the weak machines, the loss values can be used as sample weights that are updated in each round of boosting, see update_sample_weights().
+  """
 
 
   def loss(self, targets, scores):
@@ -37,3 +40,122 @@ class ExponentialLoss (LossFunction):
     loss = numpy.exp(-(targets * scores))
     return -targets * loss
 
+
+
+  def loss_and_gradient(self, targets, scores):
+    """The function computes the exponential loss values and their gradient at once, evaluating exp() only once.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>, float <#samples, #outputs>): The loss values and the gradient of the loss based on the given scores and targets.
+    """
+    loss = numpy.exp(-(targets * scores))
+    return loss, -targets * loss
+
+
+  def loss_hessian(self, targets, scores):
+    """The function computes the second derivative of the exponential loss function with respect to the scores.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>): The second derivative of the loss based on the given scores and targets, always >= 0
+    """
+    loss = numpy.exp(-(targets * scores))
+    return targets**2 * loss
+
+
+  def sample_weights(self, targets, scores):
+    """The function computes the sample weights, i.e., the exponential loss values, for the given targets and scores.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>): The sample weights, which can be updated using update_sample_weights()
+    """
+    return self.loss(targets, scores)
+
+
+  def update_sample_weights(self, weights, targets, alpha, current_scores):
+    """The function updates the given sample weights in-place after a weak machine with the given weight has been added.
+
+    The weights are multiplied by exp(-alpha * targets * current_scores), so that they are proportional to the loss of the updated scores.
+    When the products of targets and weak machine scores are all -1, 0 or +1, only two exp() evaluations per output are required.
+
+    Keyword parameters:
+
+      weights (float <#samples, #outputs>): The sample weights to update.
+
+      targets (float <#samples, #outputs>): The targets for the samples
+
+      alpha (float <#outputs>): The weight of the current weak machine.
+
+      current_scores (float <#samples, #outputs>): The prediction scores of the samples for the current round of the boosting.
+    """
+    margins = targets * current_scores
+    if numpy.all((margins == 1.) | (margins == -1.) | (margins == 0.)):
+      alpha = numpy.asarray(alpha)
+      weights *= numpy.where(margins > 0, numpy.exp(-alpha), numpy.where(margins < 0, numpy.exp(alpha), 1.))
+    else:
+      weights *= numpy.exp(-alpha * margins)
+
+
+  def loss_gradient_from_weights(self, targets, weights):
+    """The function computes the gradient of the exponential loss from the sample weights, without evaluating exp().
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      weights (float <#samples, #outputs>): The sample weights, see sample_weights().
+
+    Returns
+      loss (float <#samples, #outputs>): The gradient of the loss, up to the scale of the weights.
+    """
+    return -targets * weights
+
+
+  def optimal_alpha(self, targets, previous_scores, current_scores, weights = None):
+    """The function computes the optimal weight of the current weak machine in closed form.
+
+    When the products of targets and weak machine scores are all -1, 0 or +1 (e.g., for ±1 targets and StumpMachine or LUTMachine scores), the exponential loss sum is minimized by alpha = 0.5 * log(W+ / W-), where W+ and W- are the sums of the losses of the correctly and incorrectly classified samples.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The targets for the samples
+
+      previous_scores (float <#samples, #outputs>): The cumulative prediction scores of the samples until the previous round of the boosting.
+
+      current_scores (float <#samples, #outputs>): The prediction scores of the samples for the current round of the boosting.
+
+      weights (float <#samples, #outputs>): The (possibly scaled) sample weights for the previous scores; if given, the previous scores are not used.
+
+    Returns
+      (float <#outputs>) The optimal alpha, or None if there is no (finite) closed form solution.
+    """
+    margins = targets * current_scores
+    if not numpy.all((margins == 1.) | (margins == -1.) | (margins == 0.)):
+      return None
+
+    # sum the losses of the correctly and the incorrectly classified samples
+    losses = self.loss(targets, previous_scores) if weights is None else weights
+    correct = numpy.sum(losses * (margins > 0), 0)
+    incorrect = numpy.sum(losses * (margins < 0), 0)
+    if numpy.any(correct <= 0.) or numpy.any(incorrect <= 0.):
+      # one of the classes is empty, so that the optimal alpha is infinite
+      return None
+
+    return 0.5 * numpy.log(correct / incorrect)
@@ -1,4 +1,4 @@
-from ._library import LUTMachine, weighted_histogram
+from ._library import LUTMachine, weighted_histograms
 
 import numpy
 
@@ -34,7 +34,6 @@ class LUTTrainer():
     self._feature_gradient = numpy.ndarray((self.m_maximum_feature_value, self.m_number_of_outputs))
     self._luts = numpy.ndarray((self.m_maximum_feature_value, self.m_number_of_outputs))
     self._selected_indices = numpy.ndarray((self.m_number_of_outputs,), numpy.int32)
-    self._gradient_histogram = numpy.ndarray((self.m_maximum_feature_value,))
     self._loss_sum = numpy.ndarray((self.m_feature_length, self.m_number_of_outputs))
 
 
@@ -45,7 +44,7 @@ class LUTTrainer():
     The function searches for a features index that minimizes (the length of) the loss gradient and computes the LUT corresponding to that feature index.
 
     Keyword parameters
-      training_features (uint16<#samples, #features>): The training features samples
+      training_features (uint8 or uint16 <#samples, #features>): The training features samples
 
       loss_gradient (float<#samples, #outputs>): The loss gradient values for the training samples
 
@@ -53,12 +52,10 @@ class LUTTrainer():
       A (weak) LUTMachine
     """
 
-    # Compute the sum of the gradient based on the feature values or the loss associated with each feature index
+    # Compute the sum of the gradient based on the feature values for all features and outputs in a single sweep
+    histograms = weighted_histograms(training_features, loss_gradient, self.m_maximum_feature_value)
     # Compute the loss for each feature
-    for feature_index in range(self.m_feature_length):
-      for output_index in range(self.m_number_of_outputs):
-        weighted_histogram(training_features[:,feature_index], loss_gradient[:,output_index], self._gradient_histogram)
-        self._loss_sum[feature_index, output_index] = - numpy.sum(numpy.abs(self._gradient_histogram))
+    self._loss_sum[:] = - numpy.sum(numpy.abs(histograms), 1)
 
     # Select the most discriminative index (or indices) for classification which minimizes the loss
     #  and compute the sum of gradient for that index
@@ -78,7 +75,7 @@ class LUTTrainer():
 
     for output_index in range(self.m_number_of_outputs):
       feature_index = self._selected_indices[output_index]
-      self._feature_gradient[:,output_index] = weighted_histogram(training_features[:,feature_index], loss_gradient[:,output_index], self.m_maximum_feature_value)
+      self._feature_gradient[:,output_index] = histograms[feature_index,:,output_index]
 
     # Assign the values to LookUp Table
     self._luts.fill(1.)
@@ -36,3 +36,37 @@ class LogitLoss(LossFunction):
     e = numpy.exp(-(targets * scores))
     denom = 1./(1. + e)
     return -targets * e * denom
+
+
+  def loss_and_gradient(self, targets, scores):
+    """The function computes the logit loss values and their gradient at once, evaluating exp() only once.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>, float <#samples, #outputs>): The loss values and the gradient of the loss based on the given scores and targets.
+    """
+    e = numpy.exp(-(targets * scores))
+    denom = 1./(1. + e)
+    return numpy.log(1. + e), -targets * e * denom
+
+
+  def loss_hessian(self, targets, scores):
+    """The function computes the second derivative of the logit loss function with respect to the scores.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>): The second derivative of the loss based on the given scores and targets, always >= 0
+    """
+    e = numpy.exp(-(targets * scores))
+    denom = 1./(1. + e)
+    return targets**2 * e * denom * denom
@@ -6,6 +6,8 @@ class LossFunction:
 
   This class provides the interface for the L-BFGS optimizer.
   Please overwrite the loss() and loss_gradient() function (see below) in derived loss classes.
+  Derived classes should also overwrite loss_and_gradient() to share the intermediate values of the loss and its gradient, which are used in loss_and_gradient_sum().
+  Derived classes that additionally implement loss_hessian() can be optimized with Newton's method, see loss_hessian_sum().
   """
 
   def loss(self, targets, scores):
@@ -40,6 +42,23 @@ class LossFunction:
     raise NotImplementedError("This is a pure abstract function. Please implement that in your derived class.")
 
 
+  def loss_and_gradient(self, targets, scores):
+    """This function computes the loss and its gradient for the given targets and scores at once.
+
+    The default implementation calls loss() and loss_gradient(); derived classes should overwrite this function to compute shared intermediate values only once.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>, float <#samples, #outputs>): The loss and the gradient of the loss based on the given scores and targets.
+    """
+    return self.loss(targets, scores), self.loss_gradient(targets, scores)
+
+
   def loss_sum(self, alpha, targets, previous_scores, current_scores):
     """The function computes the sum of the loss which is used to find the optimized values of alpha (x).
 
@@ -95,3 +114,64 @@ class LossFunction:
 
     # take the sum of the loss gradient values
     return numpy.sum(loss_gradients * current_scores, 0)
+
+
+  def loss_and_gradient_sum(self, alpha, targets, previous_scores, current_scores, loss_sum = None, gradient_sum = None):
+    """The function computes loss_sum() and loss_gradient_sum() for the same alpha at once.
+
+    The scores for the current alpha are computed only once, and the loss and its gradient are computed with loss_and_gradient(), sharing the intermediate values.
+    This function can be given as the input for the L-BFGS optimization function, when the sum of the returned loss sum is used as the function value.
+
+    Keyword parameters:
+
+      alpha (float): The current value of the alpha.
+
+      targets (float <#samples, #outputs>): The targets for the samples
+
+      previous_scores (float <#samples, #outputs>): The cumulative prediction scores of the samples until the previous round of the boosting.
+
+      current_scores (float <#samples, #outputs>): The prediction scores of the samples for the current round of the boosting.
+
+      loss_sum (float <#outputs>) or None: If given, the sum of the loss values is written into this array.
+
+      gradient_sum (float <#outputs>) or None: If given, the sum of the loss gradient is written into this array.
+
+    Returns
+      (float <#outputs>, float <#outputs>) The sum of the loss values and the sum of the loss gradient for the current value of the alpha.
+    """
+
+    # compute the loss and the loss gradient for the updated score
+    scores = previous_scores + alpha * current_scores
+    losses, loss_gradients = self.loss_and_gradient(targets, scores)
+
+    # take the sums, re-using the temporary arrays
+    loss_gradients *= current_scores
+    return numpy.sum(losses, 0, out = loss_sum), numpy.sum(loss_gradients, 0, out = gradient_sum)
+
+
+  def loss_hessian_sum(self, alpha, targets, previous_scores, current_scores):
+    """The function computes the second derivative of the loss sum with respect to alpha.
+
+    Together with loss_gradient_sum(), it is used to compute Newton steps for the optimization of alpha.
+    It requires that the derived class implements the loss_hessian(targets, scores) function, which computes the second derivative of the loss with respect to the scores.
+
+    Keyword parameters:
+
+      alpha (float): The current value of the alpha.
+
+      targets (float <#samples, #outputs>): The targets for the samples
+
+      previous_scores (float <#samples, #outputs>): The cumulative prediction scores of the samples until the previous round of the boosting.
+
+      current_scores (float <#samples, #outputs>): The prediction scores of the samples for the current round of the boosting.
+
+    Returns
+      (float <#outputs>) The sum of the second derivatives of the loss for the current value of the alpha.
+    """
+
+    # compute the loss hessian for the updated score
+    scores = previous_scores + alpha * current_scores
+    loss_hessians = self.loss_hessian(targets, scores)
+
+    # take the sum of the loss hessian values
+    return numpy.sum(loss_hessians * current_scores**2, 0)
@@ -1,35 +1,68 @@
 from ._library import StumpMachine
 import numpy
 
+# The maximum number of elements of the temporary arrays used to compute the thresholds of a block of features
+FEATURE_BLOCK_ELEMENTS = 1 << 22
+
 class StumpTrainer():
   """ The class for training weak stump classifiers.
   The weak stump is parameterized the threshold and the polarity.
+
+  Since the training features do not change between the rounds of boosting, the sort order of each feature is computed only once, see :py:meth:`prepare`.
   """
 
+  def __init__(self):
+    self._prepared_features = None
+
+
+  def prepare(self, training_features):
+    """Precomputes the sort order of all features, which is re-used in all subsequent calls to :py:meth:`train` with the same training features.
+
+    This function is called automatically by :py:meth:`train` when it receives a different training feature array.
+    If the values of the training feature array are modified in-place, please call this function again.
+
+    Keyword parameters
+      training_features (float<#samples, #features>): The training features samples
+    """
+    # compute a stable sort order of each feature column and the sorted feature values
+    self._sort_indices = numpy.argsort(training_features, axis=0, kind='mergesort')
+    self._sorted_features = training_features[self._sort_indices, numpy.arange(training_features.shape[1])]
+    # the thresholds can be placed only between two different feature values
+    self._splits = self._sorted_features[1:] != self._sorted_features[:-1]
+    self._prepared_features = training_features
+
+
   def train(self, training_features, loss_gradient):
     """Computes a weak stump machine.
 
     The best weak machine is chosen to maximize the dot product of the outputs and the weights (gain).
     The weights are the negative of the loss gradient for exponential loss.
+    The sort order of the features is computed in the first call, see :py:meth:`prepare`.
 
     Keyword parameters
       training_features (float<#samples, #features>): The training features samples
 
-      loss_gradient (float<#samples>): The loss gradient values for the training samples
+      loss_gradient (float<#samples>) or (float<#samples, 1>): The loss gradient values for the training samples
 
     Returns
       A (weak) :py:class:`bob.learn.boosting.StumpMachine`
     """
+    if self._prepared_features is not training_features:
+      self.prepare(training_features)
 
     # Initialization
-    number_of_features = training_features.shape[1]
+    number_of_samples, number_of_features = training_features.shape
     threshold = numpy.zeros(number_of_features)
     polarity = numpy.zeros(number_of_features)
     gain = numpy.zeros(number_of_features)
 
-    # For each feature find the optimum threshold, polarity and the gain
-    for i in range(number_of_features):
-      polarity[i], threshold[i], gain[i] = self.compute_threshold(training_features[:,i], -loss_gradient)
+    # For all features find the optimum threshold, polarity and the gain
+    # The features are processed in blocks to limit the size of the temporary arrays
+    gradient = -loss_gradient.reshape(number_of_samples)
+    block_size = max(1, FEATURE_BLOCK_ELEMENTS // max(1, number_of_samples))
+    for first in range(0, number_of_features, block_size):
+      block = slice(first, min(first + block_size, number_of_features))
+      polarity[block], threshold[block], gain[block] = self._sorted_thresholds(self._sorted_features[:,block], gradient[self._sort_indices[:,block]], self._splits[:,block])
 
     #  Find the optimum id and its corresponding trainer
     best_index = gain.argmax()
@@ -53,37 +86,46 @@ class StumpTrainer():
       gain (float): gain of the classifier
     """
     # Sort the feature and rearrange the corresponding weights and feature values
-    sort_indices = numpy.argsort(features)
+    sort_indices = numpy.argsort(features, kind='mergesort')
     features = features[sort_indices]
-    gradient = gradient[sort_indices]
+    gradient = gradient.reshape(features.shape[0])[sort_indices]
+    splits = features[1:] != features[:-1]
 
-    unique_features, unique_indices = numpy.unique(features,return_index=True)
+    polarity, threshold, gain = self._sorted_thresholds(features[:,numpy.newaxis], gradient[:,numpy.newaxis], splits[:,numpy.newaxis])
 
-    if unique_features.shape[0] == 1:
-      # if all features are identical, we gain nothing
-      return 1., 0., 0.
-
-    grad_cs = numpy.ndarray(unique_features.shape[0]-1)
-    for i in range(1,unique_features.shape[0]):
-      grad_cs[i-1] = numpy.sum(gradient[unique_indices[0]:unique_indices[i]])
+    # return polarity, threshold and the gain
+    return polarity[0], threshold[0], gain[0]
 
-    # For all the threshold compute the dot product
-#    grad_cs =  numpy.cumsum(gradient)
-    grad_sum = numpy.sum(gradient)
-    gain = (grad_sum - grad_cs)
 
-    # Find the index that maximizes the gain
-    best_gain = numpy.argmax(numpy.absolute(gain))
+  def _sorted_thresholds(self, sorted_features, sorted_gradients, splits):
+    """Computes polarities, thresholds and gains for several features at once.
+    The columns of sorted_features contain the sorted values of each feature, and the columns of sorted_gradients the accordingly sorted negative loss gradient.
+    splits[k,i] states whether sorted_features[k,i] and sorted_features[k+1,i] differ."""
+    number_of_features = sorted_features.shape[1]
+    polarity = numpy.ones(number_of_features)
+    threshold = numpy.zeros(number_of_features)
+    gain = numpy.zeros(number_of_features)
+    if sorted_features.shape[0] < 2:
+      # a single sample does not allow to split
+      return polarity, threshold, gain
+
+    # For all the thresholds compute the dot product, i.e., the sum of the gradients of the samples above the threshold
+    grad_cs = numpy.cumsum(sorted_gradients, 0)
+    gains = grad_cs[-1] - grad_cs[:-1]
+
+    # Find the index that maximizes the gain; thresholds can only be placed between different feature values
+    absolute = numpy.absolute(gains)
+    absolute[~splits] = -1.
+    best_gain = numpy.argmax(absolute, 0)
+    columns = numpy.arange(number_of_features)
+    # if all features are identical, we gain nothing
+    valid = splits[best_gain, columns]
 
     # Find the corresponding threshold value
-    threshold = (unique_features[best_gain] + unique_features[best_gain+1])*0.5
+    threshold[valid] = ((sorted_features[best_gain, columns] + sorted_features[best_gain+1, columns])*0.5)[valid]
 
     # Find the polarity or the directionality of the current trainer
-    if gain[best_gain] > 0:
-        polarity = -1
-    else:
-        polarity =  1
-
-    # return polarity, threshold and the gain
-    return polarity, threshold, abs(gain[best_gain])
+    polarity[valid & (gains[best_gain, columns] > 0)] = -1.
+    gain[valid] = absolute[best_gain, columns][valid]
 
+    return polarity, threshold, gain
@@ -19,6 +19,23 @@ class TangentialLoss (LossFunction):
     """
     return (2. * numpy.arctan(targets * scores) - 1.)**2
 
+  def loss_and_gradient(self, targets, scores):
+    """The function computes the tangential loss values and their gradient at once, evaluating arctan() only once.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>, float <#samples, #outputs>): The loss values and the gradient of the loss based on the given scores and targets.
+    """
+    m = targets * scores
+    a = 2. * numpy.arctan(m) - 1.
+    denom = 1. + m**2
+    return a**2, targets * (4. * a)/denom
+
   def loss_gradient(self, targets, scores):
     """The function computes the gradient of the tangential loss function using prediction scores and targets.
 
@@ -34,5 +51,25 @@ class TangentialLoss (LossFunction):
     m = targets * scores
     numer = 4. * (2. * numpy.arctan(m) - 1.)
     denom = 1. + m**2
-    return numer/denom
+    return targets * numer/denom
+
 
+
+  def loss_hessian(self, targets, scores):
+    """The function computes the second derivative of the tangential loss function with respect to the scores.
+
+    Note that the tangential loss is not convex, so that the second derivative might be negative.
+
+    Keyword parameters:
+
+      targets (float <#samples, #outputs>): The target values that should be reached.
+
+      scores (float <#samples, #outputs>): The scores provided by the classifier.
+
+    Returns
+      (float <#samples, #outputs>): The second derivative of the loss based on the given scores and targets.
+    """
+    m = targets * scores
+    numer = 8. * (1. - m * (2. * numpy.arctan(m) - 1.))
+    denom = 1. + m**2
+    return targets**2 * numer / denom**2
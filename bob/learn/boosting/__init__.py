@@ -15,18 +15,21 @@ from bob.learn.boosting import LossFunction # Just to get the documentation for
 from bob.learn.boosting.ExponentialLoss import ExponentialLoss
 from bob.learn.boosting.LogitLoss import LogitLoss
 from bob.learn.boosting.TangentialLoss import TangentialLoss
-from bob.learn.boosting._library import JesorskyLoss
+from bob.learn.boosting._library import JesorskyLoss, NativeExponentialLoss, NativeLogitLoss, NativeTangentialLoss
 
 # include trainers
-from bob.learn.boosting.StumpTrainer import StumpTrainer
 from bob.learn.boosting.Boosting import Boosting
-from bob.learn.boosting._library import LUTTrainer
+from bob.learn.boosting._library import LUTTrainer, StumpTrainer
+from bob.learn.boosting.BinnedStumpTrainer import BinnedStumpTrainer
+from bob.learn.boosting.CascadeTrainer import CascadeTrainer
 
 # include machines
 from bob.learn.boosting._library import WeakMachine, StumpMachine, LUTMachine, BoostedMachine
+from bob.learn.boosting.Cascade import Cascade
 
 # include auxiliary functions
-from bob.learn.boosting._library import weighted_histogram
+from bob.learn.boosting._library import weighted_histogram, weighted_histograms
+from bob.learn.boosting.calibration import calibrate_rejection_thresholds
 
 def get_config():
   """Returns a string containing the configuration information.
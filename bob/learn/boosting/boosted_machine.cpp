@@ -3,7 +3,9 @@
 static auto boostedMachine_doc = bob::extension::ClassDoc(
   "BoostedMachine",
   "A strong machine that holds a weighted combination of weak machines",
-  ".. todo:: Improve documentation."
+  ".. todo:: Improve documentation.\n\n"
+  "The forward functions release the GIL, so that one machine can be used by several Python threads at the same time. "
+  "However, the machine must not be modified, e.g., by :py:meth:`add_weak_machine` or :py:meth:`set_rejection_thresholds`, while another thread uses it."
 )
 .add_constructor(
   bob::extension::FunctionDoc(
@@ -154,11 +156,49 @@ static PyObject* boostedMachine_machines(
 }
 
 
+static auto boostedMachine_rejectionThresholds_doc = bob::extension::VariableDoc(
+  "rejection_thresholds",
+  "float <#machines> or None",
+  "The rejection thresholds of the soft cascade, one for each weak machine, see :py:func:`forward_with_rejection`",
+  "The thresholds can be set using :py:func:`set_rejection_thresholds`, or computed using :py:func:`bob.learn.boosting.calibrate_rejection_thresholds`. "
+  "When no rejection thresholds are set, ``None`` is returned."
+);
+
+static PyObject* boostedMachine_rejectionThresholds(
+  BoostedMachineObject* self,
+  void*
+)
+{
+  auto retval = self->base->getRejectionThresholds();
+  if (!retval.extent(0)) Py_RETURN_NONE;
+  return PyBlitzArrayCxx_AsConstNumpy(retval);
+}
+
+
+static auto boostedMachine_compiled_doc = bob::extension::VariableDoc(
+  "compiled",
+  "bool",
+  "Is this machine compiled into a single look-up table?",
+  "When all weak machines are :py:class:`LUTMachine`'s, the LUTs of all weak machines are packed into one flat table, in which the weights are already multiplied into the LUT entries. "
+  "This compilation is done automatically when weak machines are added or when the machine is loaded. "
+  "Compiled machines compute the same predictions, but they are much faster, since the weak machines are not called."
+);
+
+static PyObject* boostedMachine_compiled(
+  BoostedMachineObject* self,
+  void*
+)
+{
+  if (self->base->isCompiled()) Py_RETURN_TRUE;
+  Py_RETURN_FALSE;
+}
+
+
 
 static auto boostedMachine_add_doc = bob::extension::FunctionDoc(
   "add_weak_machine",
   "Adds the given weak machine and its weight(s) to the list of weak machines",
-  NULL,
+  "This function must not be called while another thread uses this machine, e.g., in :py:meth:`forward`.",
   true
 )
 .add_prototype("machine, weight")
@@ -252,32 +292,64 @@ static auto boostedMachine_forward_doc = bob::extension::FunctionDoc(
   "3. ``(uint16 <#samples,#inputs>, float <#samples>, float<#samples>)`` will compute the uni-variate prediction and the labels for several feature vectors.\n"
   "4. ``(uint16 <#inputs>, float <#outputs>)`` will compute the multi-variate prediction for a single feature vector.\n"
   "5. ``(uint16 <#samples,#inputs>, float <#samples,#outputs>)`` will compute the multi-variate prediction for several feature vectors.\n"
-  "6. ``(uint16 <#samples,#inputs>, float <#samples,#outputs>, float <#samples,#outputs>)`` will compute the multi-variate prediction and the labels for several feature vectors.",
+  "6. ``(uint16 <#samples,#inputs>, float <#samples,#outputs>, float <#samples,#outputs>)`` will compute the multi-variate prediction and the labels for several feature vectors.\n\n"
+  "Instead of uint16, the features can also be of type uint8, float32 or float64, which are processed without conversion or copy. "
+  "Floating point features are supported only by machines that consist of :py:class:`StumpMachine`'s.\n\n"
+  "When several feature vectors are given, the samples are processed in blocks that fit into the cache, and the blocks can be processed in parallel, see ``number_of_threads``. "
+  "The predictions are identical for any number of threads. "
+  "The GIL is released during the computation, so that the same machine can also be used from several Python threads at the same time.",
   true
 )
 .add_prototype("features", "prediction")
-.add_prototype("features, predictions")
-.add_prototype("features, predictions, labels")
-.add_parameter("features", "uint16 <#inputs> or uint16 <#samples, #inputs>", "The feature vector(s) the prediction should be computed for.")
+.add_prototype("features, predictions, [number_of_threads]")
+.add_prototype("features, predictions, labels, [number_of_threads]")
+.add_parameter("features", "uint8, uint16, float32 or float64 <#inputs> or <#samples, #inputs>", "The feature vector(s) the prediction should be computed for.")
 .add_parameter("predictions", "float <#samples> or float <#outputs> or float <#samples, #outputs>", "The predicted values -- see below.")
 .add_parameter("labels", "float <#samples> or float <#samples, #outputs>", "The predicted labels:\n\n* for the uni-variate case, -1 or +1 is assigned according to threshold 0\n* for the multi-variate case, +1 is assigned for the highest value, and 0 for all others")
+.add_parameter("number_of_threads", "int", "[Default: ``1``] The number of threads used to compute the predictions of several feature vectors")
 .add_return("prediction", "float", "The predicted value - in case a single feature is provided and a single output is required")
 ;
 
-template <int N1, int N2> void _forward(BoostedMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions, PyBlitzArrayObject* labels){
-  const auto f = PyBlitzArrayCxx_AsBlitz<uint16_t,N1>(features);
+template <typename T, int N1, int N2> void _forward(BoostedMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions, PyBlitzArrayObject* labels, int numberOfThreads){
+  const auto f = PyBlitzArrayCxx_AsBlitz<T,N1>(features);
   auto p = PyBlitzArrayCxx_AsBlitz<double,N2>(predictions);
   if (labels){
     auto l = PyBlitzArrayCxx_AsBlitz<double,N2>(labels);
-    self->base->forward(*f, *p, *l);
-  } else
-    self->base->forward(*f, *p);
+    ReleaseGIL gil;
+    self->base->forward(*f, *p, *l, numberOfThreads);
+  } else {
+    ReleaseGIL gil;
+    self->base->forward(*f, *p, numberOfThreads);
+  }
 }
-void _forward(BoostedMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions){
-  const auto f = PyBlitzArrayCxx_AsBlitz<uint16_t,1>(features);
+template <typename T> void _forward(BoostedMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions){
+  const auto f = PyBlitzArrayCxx_AsBlitz<T,1>(features);
   auto p = PyBlitzArrayCxx_AsBlitz<double,1>(predictions);
+  ReleaseGIL gil;
   self->base->forward(*f, *p);
 }
+template <typename T> PyObject* _forward(BoostedMachineObject* self, PyBlitzArrayObject* features){
+  const auto f = PyBlitzArrayCxx_AsBlitz<T,1>(features);
+  double prediction;
+  {
+    ReleaseGIL gil;
+    prediction = self->base->forward(*f);
+  }
+  return Py_BuildValue("d", prediction);
+}
+
+// calls the forward function for the given numbers of dimensions; returns false if these are not supported
+template <typename T> bool _forward(BoostedMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions, PyBlitzArrayObject* labels, int numberOfThreads){
+  if (features->ndim == 1 && predictions->ndim == 1)
+    _forward<T>(self, features, predictions);
+  else if (features->ndim == 2 && predictions->ndim == 1)
+    _forward<T,2,1>(self, features, predictions, labels, numberOfThreads);
+  else if (features->ndim == 2 && predictions->ndim == 2)
+    _forward<T,2,2>(self, features, predictions, labels, numberOfThreads);
+  else
+    return false;
+  return true;
+}
 
 
 static PyObject* boostedMachine_forward(
@@ -287,39 +359,46 @@ static PyObject* boostedMachine_forward(
 )
 {
   // get list of arguments
-  char* kwlist[] = {c("features"), c("predictions"), c("labels"), NULL};
+  char* kwlist[] = {c("features"), c("predictions"), c("labels"), c("number_of_threads"), NULL};
 
   PyBlitzArrayObject* p_features = 0,* p_predictions = 0,* p_labels = 0;
+  int number_of_threads = 1;
 
   if (!PyArg_ParseTupleAndKeywords(
           args, kwargs,
-          "O&|O&O&", kwlist,
+          "O&|O&O&i", kwlist,
           &PyBlitzArray_Converter, &p_features,
           &PyBlitzArray_Converter, &p_predictions,
-          &PyBlitzArray_Converter, &p_labels
+          &PyBlitzArray_Converter, &p_labels,
+          &number_of_threads
       )
   )
     return NULL;
 
-  auto _1 = make_safe(p_features), _2 = make_xsafe(p_predictions);
+  auto _1 = make_safe(p_features), _2 = make_xsafe(p_predictions), _3 = make_xsafe(p_labels);
+
+  if (number_of_threads < 1){
+    boostedMachine_forward_doc.print_usage();
+    PyErr_Format(PyExc_ValueError, "The number of threads must be at least 1, but you used %d", number_of_threads);
+    return NULL;
+  }
 
   try{
     if (!p_predictions){
       // uni-variate, single feature
-      const auto features = PyBlitzArrayCxx_AsBlitz<uint16_t,1>(p_features, kwlist[0]);
-      if (!features){
-        boostedMachine_forward_doc.print_usage();
-        PyErr_SetString(PyExc_TypeError, "When a single parameter is specified, only 1D arrays of type uint16 are supported.");
-        return NULL;
+      if (p_features->ndim == 1){
+        switch (p_features->type_num){
+          case NPY_UINT8: return _forward<uint8_t>(self, p_features);
+          case NPY_UINT16: return _forward<uint16_t>(self, p_features);
+          case NPY_FLOAT32: return _forward<float>(self, p_features);
+          case NPY_FLOAT64: return _forward<double>(self, p_features);
+        }
       }
-      return Py_BuildValue("d", self->base->forward(*features));
-    }
-
-    if (p_features->type_num != NPY_UINT16){
       boostedMachine_forward_doc.print_usage();
-      PyErr_SetString(PyExc_TypeError, "The parameter 'features' only supports 1D or 2D arrays of type uint16");
+      PyErr_SetString(PyExc_TypeError, "When a single parameter is specified, only 1D arrays of type uint8, uint16, float32 or float64 are supported.");
       return NULL;
     }
+
     if (p_predictions->type_num != NPY_FLOAT64){
       boostedMachine_forward_doc.print_usage();
       PyErr_SetString(PyExc_TypeError, "The parameter 'predictions' only supports 1D or 2D arrays of type float");
@@ -331,13 +410,18 @@ static PyObject* boostedMachine_forward(
       return NULL;
     }
 
-    if (p_features->ndim == 1 && p_predictions->ndim == 1)
-      _forward(self, p_features, p_predictions);
-    else if (p_features->ndim == 2 && p_predictions->ndim == 1)
-      _forward<2,1>(self, p_features, p_predictions, p_labels);
-    else if (p_features->ndim == 2 && p_predictions->ndim == 2)
-      _forward<2,2>(self, p_features, p_predictions, p_labels);
-    else {
+    bool supported;
+    switch (p_features->type_num){
+      case NPY_UINT8: supported = _forward<uint8_t>(self, p_features, p_predictions, p_labels, number_of_threads); break;
+      case NPY_UINT16: supported = _forward<uint16_t>(self, p_features, p_predictions, p_labels, number_of_threads); break;
+      case NPY_FLOAT32: supported = _forward<float>(self, p_features, p_predictions, p_labels, number_of_threads); break;
+      case NPY_FLOAT64: supported = _forward<double>(self, p_features, p_predictions, p_labels, number_of_threads); break;
+      default:
+        boostedMachine_forward_doc.print_usage();
+        PyErr_SetString(PyExc_TypeError, "The parameter 'features' only supports 1D or 2D arrays of type uint8, uint16, float32 or float64");
+        return NULL;
+    }
+    if (!supported){
       boostedMachine_forward_doc.print_usage();
       PyErr_Format(PyExc_TypeError, "The number of dimensions of %s (%d) and %s (%d) are not supported", kwlist[0], (int)p_features->ndim, kwlist[1], (int)p_predictions->ndim);
       return NULL;
@@ -353,6 +437,328 @@ static PyObject* boostedMachine_forward(
   }
 }
 
+static auto boostedMachine_stagedForward_doc = bob::extension::FunctionDoc(
+  "staged_forward",
+  "Returns the predictions of the first weak machines for several numbers of rounds in a single pass",
+  "For each of the given ``rounds``, the prediction of the machine that consists of the first ``rounds[r]`` weak machines is computed, which is useful to select the number of weak machines on validation data. "
+  "The weak machines are accumulated in the order in which they were added, so that the predictions might differ from :py:func:`forward` of the :py:func:`truncate`'d machine in the last digits.",
+  true
+)
+.add_prototype("features, [rounds], [number_of_threads]", "predictions")
+.add_parameter("features", "uint8, uint16, float32 or float64 <#samples, #inputs>", "The feature vectors the predictions should be computed for")
+.add_parameter("rounds", "int32 <#rounds>", "[Default: ``1, 2, ..., #machines``] The ascending numbers of weak machines that the predictions should be computed for")
+.add_parameter("number_of_threads", "int", "[Default: ``1``] The number of threads used to compute the predictions")
+.add_return("predictions", "float <#samples, #rounds> or float <#samples, #rounds, #outputs>", "The predictions of the given numbers of weak machines; for uni-variate machines, a 2D array is returned")
+;
+
+template <typename T> PyObject* _stagedForward(BoostedMachineObject* self, PyBlitzArrayObject* p_features, const blitz::Array<int32_t,1>& rounds, int numberOfThreads){
+  const auto features = PyBlitzArrayCxx_AsBlitz<T,2>(p_features);
+  if (self->base->numberOfOutputs() <= 1){
+    blitz::Array<double,2> predictions(features->extent(0), rounds.extent(0));
+    {
+      ReleaseGIL gil;
+      self->base->stagedForward(*features, rounds, predictions, numberOfThreads);
+    }
+    return PyBlitzArrayCxx_AsNumpy(predictions);
+  } else {
+    blitz::Array<double,3> predictions(features->extent(0), rounds.extent(0), self->base->numberOfOutputs());
+    {
+      ReleaseGIL gil;
+      self->base->stagedForward(*features, rounds, predictions, numberOfThreads);
+    }
+    return PyBlitzArrayCxx_AsNumpy(predictions);
+  }
+}
+
+static PyObject* boostedMachine_stagedForward(
+  BoostedMachineObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  char* kwlist[] = {c("features"), c("rounds"), c("number_of_threads"), NULL};
+
+  PyBlitzArrayObject* p_features = 0,* p_rounds = 0;
+  int number_of_threads = 1;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kwargs,
+          "O&|O&i", kwlist,
+          &PyBlitzArray_Converter, &p_features,
+          &PyBlitzArray_Converter, &p_rounds,
+          &number_of_threads
+      )
+  ){
+    boostedMachine_stagedForward_doc.print_usage();
+    return NULL;
+  }
+
+  auto _1 = make_safe(p_features), _2 = make_xsafe(p_rounds);
+
+  if (number_of_threads < 1){
+    boostedMachine_stagedForward_doc.print_usage();
+    PyErr_Format(PyExc_ValueError, "The number of threads must be at least 1, but you used %d", number_of_threads);
+    return NULL;
+  }
+
+  if (p_features->ndim != 2 || (p_features->type_num != NPY_UINT8 && p_features->type_num != NPY_UINT16 && p_features->type_num != NPY_FLOAT32 && p_features->type_num != NPY_FLOAT64)){
+    boostedMachine_stagedForward_doc.print_usage();
+    PyErr_Format(PyExc_TypeError, "The parameter '%s' only supports 2D arrays of type uint8, uint16, float32 or float64", kwlist[0]);
+    return NULL;
+  }
+
+  blitz::Array<int32_t,1> rounds;
+  if (p_rounds){
+    const auto r = PyBlitzArrayCxx_AsBlitz<int32_t,1>(p_rounds, kwlist[1]);
+    if (!r){
+      boostedMachine_stagedForward_doc.print_usage();
+      return NULL;
+    }
+    rounds.reference(*r);
+  } else {
+    rounds.resize(self->base->getWeakMachines().size());
+    for (int r = 0; r < rounds.extent(0); ++r)
+      rounds(r) = r + 1;
+  }
+
+  try{
+    switch (p_features->type_num){
+      case NPY_UINT8: return _stagedForward<uint8_t>(self, p_features, rounds, number_of_threads);
+      case NPY_UINT16: return _stagedForward<uint16_t>(self, p_features, rounds, number_of_threads);
+      case NPY_FLOAT32: return _stagedForward<float>(self, p_features, rounds, number_of_threads);
+      default: return _stagedForward<double>(self, p_features, rounds, number_of_threads);
+    }
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_RuntimeError, ex.what());
+    return NULL;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "%s cannot compute the staged predictions - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return NULL;
+  }
+}
+
+
+static auto boostedMachine_truncate_doc = bob::extension::FunctionDoc(
+  "truncate",
+  "Returns a new strong machine that contains the first weak machines of this machine",
+  "The weak machines are shared between both machines, i.e., they are not copied. "
+  "The weights and the rejection thresholds of the selected weak machines are copied.",
+  true
+)
+.add_prototype("number_of_machines", "machine")
+.add_parameter("number_of_machines", "int", "The number of weak machines to keep")
+.add_return("machine", ":py:class:`BoostedMachine`", "The truncated machine")
+;
+
+static PyObject* boostedMachine_truncate(
+  BoostedMachineObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  char* kwlist[] = {c("number_of_machines"), NULL};
+
+  int number_of_machines;
+  if (!PyArg_ParseTupleAndKeywords(args, kwargs, "i", kwlist, &number_of_machines)){
+    boostedMachine_truncate_doc.print_usage();
+    return NULL;
+  }
+
+  try{
+    auto truncated = self->base->truncate(number_of_machines);
+    PyObject* machine = BoostedMachineType.tp_alloc(&BoostedMachineType, 0);
+    if (!machine) return NULL;
+    reinterpret_cast<BoostedMachineObject*>(machine)->base = truncated;
+    return machine;
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_ValueError, ex.what());
+    return NULL;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "%s cannot truncate the machine - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return NULL;
+  }
+}
+
+
+static auto boostedMachine_setRejectionThresholds_doc = bob::extension::FunctionDoc(
+  "set_rejection_thresholds",
+  "Sets the rejection thresholds of the soft cascade, see :py:func:`forward_with_rejection`",
+  "Rejection thresholds can only be used for uni-variate machines. "
+  "When weak machines are added later on, their rejection thresholds are set to ``-inf``, i.e., they do not reject any sample.",
+  true
+)
+.add_prototype("thresholds")
+.add_parameter("thresholds", "float <#machines> or None", "The rejection thresholds, one for each weak machine; ``None`` removes the rejection thresholds")
+;
+
+static PyObject* boostedMachine_setRejectionThresholds(
+  BoostedMachineObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  char* kwlist[] = {c("thresholds"), NULL};
+
+  PyObject* p_thresholds = 0;
+  if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", kwlist, &p_thresholds)){
+    boostedMachine_setRejectionThresholds_doc.print_usage();
+    return NULL;
+  }
+
+  try{
+    if (p_thresholds == Py_None){
+      self->base->setRejectionThresholds(blitz::Array<double,1>());
+      Py_RETURN_NONE;
+    }
+    PyBlitzArrayObject* thresholds = 0;
+    if (!PyBlitzArray_Converter(p_thresholds, &thresholds)){
+      boostedMachine_setRejectionThresholds_doc.print_usage();
+      return NULL;
+    }
+    auto _1 = make_safe(thresholds);
+    const auto t = PyBlitzArrayCxx_AsBlitz<double,1>(thresholds, kwlist[0]);
+    if (!t){
+      boostedMachine_setRejectionThresholds_doc.print_usage();
+      return NULL;
+    }
+    self->base->setRejectionThresholds(*t);
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_RuntimeError, ex.what());
+    return NULL;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "%s cannot set rejection thresholds - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return NULL;
+  }
+  Py_RETURN_NONE;
+}
+
+
+static auto boostedMachine_forwardWithRejection_doc = bob::extension::FunctionDoc(
+  "forward_with_rejection",
+  "Returns the soft cascade prediction and the exit stage for the given feature vector(s)",
+  "In contrast to :py:func:`forward`, the weak machines are evaluated in the order in which they were added. "
+  "After each weak machine, the partial sum is compared to the :py:attr:`rejection_thresholds` of this weak machine. "
+  "When the partial sum drops below the threshold, the evaluation stops, and the partial sum is returned as the prediction. "
+  "The exit stage is the index of the weak machine that rejected the sample, or the number of weak machines if the sample was not rejected.\n\n"
+  "When no rejection thresholds are set, all weak machines are evaluated, and the predictions are identical to :py:func:`forward` (up to the rounding of the summation order).\n\n"
+  ".. note:: The soft cascade can only be used for uni-variate machines.",
+  true
+)
+.add_prototype("features", "prediction, exit_stage")
+.add_prototype("features, predictions, exit_stages, [number_of_threads]")
+.add_parameter("features", "uint8, uint16, float32 or float64 <#inputs> or <#samples, #inputs>", "The feature vector(s) the prediction should be computed for")
+.add_parameter("predictions", "float <#samples>", "The predictions (partial sums at the exit stages) of the given feature vectors will be written into this array")
+.add_parameter("exit_stages", "int32 <#samples>", "The exit stages of the given feature vectors will be written into this array")
+.add_parameter("number_of_threads", "int", "[Default: ``1``] The number of threads used to compute the predictions of several feature vectors")
+.add_return("prediction", "float", "The prediction of a single feature vector")
+.add_return("exit_stage", "int", "The exit stage of a single feature vector")
+;
+
+template <typename T> PyObject* _forwardWithRejection(BoostedMachineObject* self, PyBlitzArrayObject* features){
+  const auto f = PyBlitzArrayCxx_AsBlitz<T,1>(features);
+  int exit_stage;
+  double prediction;
+  {
+    ReleaseGIL gil;
+    prediction = self->base->forwardWithRejection(*f, exit_stage);
+  }
+  return Py_BuildValue("(di)", prediction, exit_stage);
+}
+
+template <typename T> void _forwardWithRejection(BoostedMachineObject* self, PyBlitzArrayObject* features, blitz::Array<double,1>& predictions, blitz::Array<int32_t,1>& stages, int numberOfThreads){
+  const auto f = PyBlitzArrayCxx_AsBlitz<T,2>(features);
+  ReleaseGIL gil;
+  self->base->forwardWithRejection(*f, predictions, stages, numberOfThreads);
+}
+
+static PyObject* boostedMachine_forwardWithRejection(
+  BoostedMachineObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  char* kwlist[] = {c("features"), c("predictions"), c("exit_stages"), c("number_of_threads"), NULL};
+
+  PyBlitzArrayObject* p_features = 0,* p_predictions = 0,* p_stages = 0;
+  int number_of_threads = 1;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kwargs,
+          "O&|O&O&i", kwlist,
+          &PyBlitzArray_Converter, &p_features,
+          &PyBlitzArray_Converter, &p_predictions,
+          &PyBlitzArray_Converter, &p_stages,
+          &number_of_threads
+      )
+  )
+    return NULL;
+
+  auto _1 = make_safe(p_features), _2 = make_xsafe(p_predictions), _3 = make_xsafe(p_stages);
+
+  if (number_of_threads < 1){
+    boostedMachine_forwardWithRejection_doc.print_usage();
+    PyErr_Format(PyExc_ValueError, "The number of threads must be at least 1, but you used %d", number_of_threads);
+    return NULL;
+  }
+
+  try{
+    if (!p_predictions){
+      // single feature
+      if (p_features->ndim == 1){
+        switch (p_features->type_num){
+          case NPY_UINT8: return _forwardWithRejection<uint8_t>(self, p_features);
+          case NPY_UINT16: return _forwardWithRejection<uint16_t>(self, p_features);
+          case NPY_FLOAT32: return _forwardWithRejection<float>(self, p_features);
+          case NPY_FLOAT64: return _forwardWithRejection<double>(self, p_features);
+        }
+      }
+      boostedMachine_forwardWithRejection_doc.print_usage();
+      PyErr_Format(PyExc_TypeError, "When a single parameter is specified, only 1D arrays of type uint8, uint16, float32 or float64 are supported for '%s'", kwlist[0]);
+      return NULL;
+    }
+
+    if (!p_stages){
+      boostedMachine_forwardWithRejection_doc.print_usage();
+      PyErr_Format(PyExc_TypeError, "When '%s' are given, also '%s' must be specified", kwlist[1], kwlist[2]);
+      return NULL;
+    }
+    if (p_features->ndim != 2 || (p_features->type_num != NPY_UINT8 && p_features->type_num != NPY_UINT16 && p_features->type_num != NPY_FLOAT32 && p_features->type_num != NPY_FLOAT64)){
+      boostedMachine_forwardWithRejection_doc.print_usage();
+      PyErr_Format(PyExc_TypeError, "The parameter '%s' only supports 1D or 2D arrays of type uint8, uint16, float32 or float64", kwlist[0]);
+      return NULL;
+    }
+    auto predictions = PyBlitzArrayCxx_AsBlitz<double,1>(p_predictions, kwlist[1]);
+    auto stages = PyBlitzArrayCxx_AsBlitz<int32_t,1>(p_stages, kwlist[2]);
+    if (!predictions || !stages){
+      boostedMachine_forwardWithRejection_doc.print_usage();
+      return NULL;
+    }
+    if (predictions->extent(0) != p_features->shape[0] || stages->extent(0) != p_features->shape[0]){
+      boostedMachine_forwardWithRejection_doc.print_usage();
+      PyErr_Format(PyExc_ValueError, "The parameters '%s' and '%s' must have the same number of samples as '%s'", kwlist[1], kwlist[2], kwlist[0]);
+      return NULL;
+    }
+    switch (p_features->type_num){
+      case NPY_UINT8: _forwardWithRejection<uint8_t>(self, p_features, *predictions, *stages, number_of_threads); break;
+      case NPY_UINT16: _forwardWithRejection<uint16_t>(self, p_features, *predictions, *stages, number_of_threads); break;
+      case NPY_FLOAT32: _forwardWithRejection<float>(self, p_features, *predictions, *stages, number_of_threads); break;
+      default: _forwardWithRejection<double>(self, p_features, *predictions, *stages, number_of_threads); break;
+    }
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_RuntimeError, ex.what());
+    return NULL;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "%s cannot compute the soft cascade prediction - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return NULL;
+  }
+  Py_RETURN_NONE;
+}
+
+
 static auto boostedMachine_getIndices_doc = bob::extension::FunctionDoc(
   "feature_indices",
   "Returns the feature index that will be used in this weak machine",
@@ -489,6 +895,20 @@ static PyGetSetDef boostedMachine_Getters[] = {
     boostedMachine_machines_doc.doc(),
     NULL
   },
+  {
+    boostedMachine_compiled_doc.name(),
+    (getter)boostedMachine_compiled,
+    NULL,
+    boostedMachine_compiled_doc.doc(),
+    NULL
+  },
+  {
+    boostedMachine_rejectionThresholds_doc.name(),
+    (getter)boostedMachine_rejectionThresholds,
+    NULL,
+    boostedMachine_rejectionThresholds_doc.doc(),
+    NULL
+  },
   {NULL}
 };
 
@@ -505,6 +925,30 @@ static PyMethodDef boostedMachine_Methods[] = {
     METH_VARARGS | METH_KEYWORDS,
     boostedMachine_forward_doc.doc(),
   },
+  {
+    boostedMachine_stagedForward_doc.name(),
+    (PyCFunction)boostedMachine_stagedForward,
+    METH_VARARGS | METH_KEYWORDS,
+    boostedMachine_stagedForward_doc.doc(),
+  },
+  {
+    boostedMachine_truncate_doc.name(),
+    (PyCFunction)boostedMachine_truncate,
+    METH_VARARGS | METH_KEYWORDS,
+    boostedMachine_truncate_doc.doc(),
+  },
+  {
+    boostedMachine_setRejectionThresholds_doc.name(),
+    (PyCFunction)boostedMachine_setRejectionThresholds,
+    METH_VARARGS | METH_KEYWORDS,
+    boostedMachine_setRejectionThresholds_doc.doc(),
+  },
+  {
+    boostedMachine_forwardWithRejection_doc.name(),
+    (PyCFunction)boostedMachine_forwardWithRejection,
+    METH_VARARGS | METH_KEYWORDS,
+    boostedMachine_forwardWithRejection_doc.doc(),
+  },
   {
     boostedMachine_getIndices_doc.name(),
     (PyCFunction)boostedMachine_getIndices,
@@ -0,0 +1,44 @@
+import numpy
+
+def calibrate_rejection_thresholds(machine, positives, detection_rate = 0.99):
+  """Calibrates the rejection thresholds of the soft cascade of the given strong machine.
+
+  First, the positive validation samples that are kept by the soft cascade are selected, i.e., the ``detection_rate`` fraction of samples with the highest (complete) predictions.
+  Afterwards, the rejection threshold of each weak machine is set to the minimum partial sum of the kept samples (direct backward pruning).
+  Hence, all kept samples pass all stages of the soft cascade, while all other samples are rejected at the latest by the last weak machine.
+
+  The thresholds are set in the given ``machine`` using :py:meth:`bob.learn.boosting.BoostedMachine.set_rejection_thresholds`, and they are stored together with the machine.
+
+  Keyword parameters
+    machine (:py:class:`bob.learn.boosting.BoostedMachine`): The uni-variate strong machine to calibrate
+
+    positives (uint8 or uint16 <#samples, #inputs>): The features of the positive validation samples
+
+    detection_rate (float): The fraction of positive samples that should pass the soft cascade, in the interval (0, 1]
+
+  Returns
+    float <#machines>: The rejection thresholds, one for each weak machine
+  """
+  if detection_rate <= 0. or detection_rate > 1.:
+    raise ValueError("The detection rate must be in the interval (0, 1], but you used %f" % detection_rate)
+  if machine.outputs != 1:
+    raise ValueError("The rejection thresholds can only be calibrated for uni-variate machines")
+  number_of_samples = positives.shape[0]
+  if not number_of_samples:
+    raise ValueError("At least one positive sample is required to calibrate the rejection thresholds")
+  if not len(machine.weak_machines):
+    raise ValueError("The machine does not contain any weak machine")
+
+  # compute the partial sums of all samples after each weak machine, in the order in which the weak machines were added
+  partial_sums = machine.staged_forward(positives)
+  scores = partial_sums[:,-1]
+
+  # select the samples with the highest final predictions
+  number_of_kept = int(numpy.ceil(detection_rate * number_of_samples))
+  minimum_score = numpy.sort(scores)[::-1][number_of_kept-1]
+  kept = scores >= minimum_score
+
+  # the tightest thresholds that keep all selected samples
+  thresholds = numpy.min(partial_sums[kept], axis=0)
+  machine.set_rejection_thresholds(thresholds)
+  return thresholds
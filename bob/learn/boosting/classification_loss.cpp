@@ -0,0 +1,284 @@
+#include "main.h"
+
+// The bindings of the native classification losses differ only in the class name and the documentation.
+// Hence, they are implemented as templates on the C++ loss function; the documentation is given in ClassificationLossDoc<Loss>.
+
+// The documentation of a classification loss, which is filled from the names and the formulas of the loss
+struct LossDoc{
+  LossDoc(const std::string& name, const std::string& pythonName, const std::string& lossName, const std::string& usage, const std::string& lossFormula, const std::string& gradientFormula) :
+    cls(
+      bob::extension::ClassDoc(
+        name,
+        "Computes the " + lossName + " loss and its derivative.",
+        "The " + lossName + " loss is used for " + usage + " "
+        "For a target :math:`a` and a score :math:`b`, the loss and its derivative with respect to the score are computed for each sample and each output:\n\n"
+        ".. math:: " + lossFormula + "\n\n"
+        ".. math:: " + gradientFormula + "\n\n"
+        "This is the native implementation of :py:class:`" + pythonName + "`, which can be used as a drop-in replacement in :py:class:`Boosting`. "
+        "The GIL is released during the computations, which can optionally use several threads, each processing a range of samples."
+      )
+      .add_constructor(
+        bob::extension::FunctionDoc(
+          "__init__",
+          "Initializes a " + name + " object.",
+          "",
+          true
+        )
+        .add_prototype("[number_of_threads]", "")
+        .add_parameter("number_of_threads", "int", "[default: 1] The number of threads that are used to compute the loss values and gradients")
+      )
+    ),
+    loss(
+      bob::extension::FunctionDoc(
+        "loss",
+        "Computes the " + lossName + " loss between the targets and the scores.",
+        "This function computes the " + lossName + " loss for all given targets and scores, using the loss formula as explained above :py:class:`" + name + "`",
+        true
+      )
+      .add_prototype("targets, scores", "errors")
+      .add_parameter("targets", "float <#samples, #outputs>", "The target values that should be achieved during boosting")
+      .add_parameter("scores", "float <#samples, #outputs>", "The score values that are currently achieved")
+      .add_return("errors", "float <#samples, #outputs>", "The resulting " + lossName + " loss values for each sample and output")
+    ),
+    lossGradient(
+      bob::extension::FunctionDoc(
+        "loss_gradient",
+        "Computes the derivative of the " + lossName + " loss between the targets and the scores.",
+        "This function computes the derivative of the " + lossName + " loss with respect to the scores for all given targets and scores, using the formula as explained above :py:class:`" + name + "`",
+        true
+      )
+      .add_prototype("targets, scores", "gradient")
+      .add_parameter("targets", "float <#samples, #outputs>", "The target values that should be achieved during boosting")
+      .add_parameter("scores", "float <#samples, #outputs>", "The score values that are currently achieved")
+      .add_return("gradient", "float <#samples, #outputs>", "The derivative of the " + lossName + " loss for each sample and output")
+    )
+  {}
+
+  bob::extension::ClassDoc cls;
+  bob::extension::FunctionDoc loss;
+  bob::extension::FunctionDoc lossGradient;
+};
+
+template <typename Loss> struct ClassificationLossDoc{
+  static LossDoc doc;
+};
+
+template <> LossDoc ClassificationLossDoc<bob::learn::boosting::ExponentialLoss>::doc(
+  "NativeExponentialLoss",
+  "ExponentialLoss",
+  "exponential",
+  "binary classification with target values in :math:`\\{+1, -1\\}`.",
+  "l(a, b) = e^{-a\\cdot b}",
+  "\\frac{\\partial l}{\\partial b}(a, b) = -a\\cdot e^{-a\\cdot b}"
+);
+
+template <> LossDoc ClassificationLossDoc<bob::learn::boosting::LogitLoss>::doc(
+  "NativeLogitLoss",
+  "LogitLoss",
+  "logit",
+  "(multi-variate) binary classification with target values in :math:`\\{+1, -1\\}`.",
+  "l(a, b) = \\log(1 + e^{-a\\cdot b})",
+  "\\frac{\\partial l}{\\partial b}(a, b) = \\frac{-a\\cdot e^{-a\\cdot b}}{1 + e^{-a\\cdot b}}"
+);
+
+template <> LossDoc ClassificationLossDoc<bob::learn::boosting::TangentialLoss>::doc(
+  "NativeTangentialLoss",
+  "TangentialLoss",
+  "tangent",
+  "(multi-variate) binary classification with target values in :math:`\\{+1, -1\\}`, see http://www.svcl.ucsd.edu/projects/LossDesign/TangentBoost.html.",
+  "l(a, b) = (2\\arctan(a\\cdot b) - 1)^2",
+  "\\frac{\\partial l}{\\partial b}(a, b) = \\frac{4a\\cdot(2\\arctan(a\\cdot b) - 1)}{1 + (a\\cdot b)^2}"
+);
+
+
+// Some functions
+template <typename Loss>
+static int classificationLoss_init(
+  ClassificationLossObject<Loss>* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  LossDoc& doc = ClassificationLossDoc<Loss>::doc;
+  // get list of arguments
+  char* kwlist[] = {c("number_of_threads"), NULL};
+
+  int number_of_threads = 1;
+  if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|i", kwlist, &number_of_threads)){
+    doc.cls.print_usage();
+    return -1;
+  }
+
+  if (number_of_threads < 1){
+    PyErr_Format(PyExc_ValueError, "%s: the number of threads must be at least 1, but it is %d", doc.cls.name(), number_of_threads);
+    return -1;
+  }
+
+  self->base.reset(new Loss(number_of_threads));
+  self->parent.base = self->base;
+  return 0;
+}
+
+template <typename Loss>
+static void classificationLoss_exit(
+  ClassificationLossObject<Loss>* self
+)
+{
+  self->base.reset();
+  self->parent.base.reset();
+  Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+
+// computes the loss values or (if gradient is true) the loss gradient for all samples
+template <typename Loss>
+static PyObject* _lossOrGradient(
+  ClassificationLossObject<Loss>* self,
+  PyObject* args,
+  PyObject* kwargs,
+  bool gradient
+)
+{
+  bob::extension::FunctionDoc& doc = gradient ? ClassificationLossDoc<Loss>::doc.lossGradient : ClassificationLossDoc<Loss>::doc.loss;
+  // get list of arguments
+  char* kwlist[] = {c("targets"), c("scores"), NULL};
+
+  PyBlitzArrayObject* p_targets = 0,* p_scores = 0;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kwargs,
+          "O&O&", kwlist,
+          &PyBlitzArray_Converter, &p_targets,
+          &PyBlitzArray_Converter, &p_scores)
+  ){
+    doc.print_usage();
+    return NULL;
+  }
+
+  auto _1 = make_safe(p_targets), _2 = make_safe(p_scores);
+
+  // prepare C++ data
+  const auto targets = PyBlitzArrayCxx_AsBlitz<double,2>(p_targets, "targets");
+  const auto scores = PyBlitzArrayCxx_AsBlitz<double,2>(p_scores, "scores");
+
+  if (!targets || !scores){
+    return NULL;
+  }
+
+  if (targets->extent(0) != scores->extent(0) || targets->extent(1) != scores->extent(1)){
+    PyErr_Format(PyExc_ValueError, "%s: the shapes of the targets (%d, %d) and the scores (%d, %d) differ", doc.name(), targets->extent(0), targets->extent(1), scores->extent(0), scores->extent(1));
+    return NULL;
+  }
+
+  blitz::Array<double,2> result(targets->shape());
+
+  // actually call the function
+  {
+    ReleaseGIL gil;
+    if (gradient){
+      self->base->lossGradient(*targets, *scores, result);
+    } else {
+      self->base->loss(*targets, *scores, result);
+    }
+  }
+
+  return PyBlitzArrayCxx_AsNumpy(result);
+}
+
+template <typename Loss>
+static PyObject* classificationLoss_loss(
+  ClassificationLossObject<Loss>* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  return _lossOrGradient(self, args, kwargs, false);
+}
+
+template <typename Loss>
+static PyObject* classificationLoss_lossGradient(
+  ClassificationLossObject<Loss>* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  return _lossOrGradient(self, args, kwargs, true);
+}
+
+
+// bind the class
+template <typename Loss>
+static bool init_ClassificationLoss(PyObject* module, PyTypeObject& type)
+{
+  LossDoc& doc = ClassificationLossDoc<Loss>::doc;
+
+  // one method table for each of the loss types
+  static PyMethodDef methods[] = {
+    {
+      doc.loss.name(),
+      (PyCFunction)classificationLoss_loss<Loss>,
+      METH_VARARGS | METH_KEYWORDS,
+      doc.loss.doc(),
+    },
+    {
+      doc.lossGradient.name(),
+      (PyCFunction)classificationLoss_lossGradient<Loss>,
+      METH_VARARGS | METH_KEYWORDS,
+      doc.lossGradient.doc(),
+    },
+    {NULL}
+  };
+
+  // initialize the type struct
+  type.tp_name = doc.cls.name();
+  type.tp_basicsize = sizeof(ClassificationLossObject<Loss>);
+  type.tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_BASETYPE;
+  type.tp_doc = doc.cls.doc();
+  type.tp_base = &LossFunctionType;
+
+  // set the functions
+  type.tp_new = PyType_GenericNew;
+  type.tp_init = reinterpret_cast<initproc>(classificationLoss_init<Loss>);
+  type.tp_dealloc = reinterpret_cast<destructor>(classificationLoss_exit<Loss>);
+  type.tp_methods = methods;
+
+  // check that everyting is fine
+  if (PyType_Ready(&type) < 0)
+    return false;
+
+  // add the type to the module
+  Py_INCREF(&type);
+  return PyModule_AddObject(module, doc.cls.name(), (PyObject*)&type) >= 0;
+}
+
+
+// Define the Type objects; will be filled later
+PyTypeObject ExponentialLossType = {
+  PyVarObject_HEAD_INIT(0,0)
+  0
+};
+
+PyTypeObject LogitLossType = {
+  PyVarObject_HEAD_INIT(0,0)
+  0
+};
+
+PyTypeObject TangentialLossType = {
+  PyVarObject_HEAD_INIT(0,0)
+  0
+};
+
+bool init_ExponentialLoss(PyObject* module)
+{
+  return init_ClassificationLoss<bob::learn::boosting::ExponentialLoss>(module, ExponentialLossType);
+}
+
+bool init_LogitLoss(PyObject* module)
+{
+  return init_ClassificationLoss<bob::learn::boosting::LogitLoss>(module, LogitLossType);
+}
+
+bool init_TangentialLoss(PyObject* module)
+{
+  return init_ClassificationLoss<bob::learn::boosting::TangentialLoss>(module, TangentialLossType);
+}
@@ -1,93 +1,299 @@
 #include <bob.learn.boosting/BoostedMachine.h>
+#include <bob.learn.boosting/LUTMachine.h>
 #include <bob.learn.boosting/Functions.h>
+#include <bob.learn.boosting/Parallel.h>
+#include <algorithm>
+#include <limits>
 #include <sstream>
 #include <set>
+#include <vector>
 
 bob::learn::boosting::BoostedMachine::BoostedMachine() :
   m_weak_machines(),
-  m_weights()
+  m_weights(),
+  m_rejectionThresholds(),
+  m_compiled(true)
 {
 }
 
 bob::learn::boosting::BoostedMachine::BoostedMachine(bob::io::base::HDF5File& file) :
   m_weak_machines(),
-  m_weights()
+  m_weights(),
+  m_rejectionThresholds(),
+  m_compiled(true)
 {
   load(file);
 }
 
 void bob::learn::boosting::BoostedMachine::add_weak_machine(const boost::shared_ptr<WeakMachine> weak_machine, const double weight){
+  const bool sameOutputs = m_weak_machines.empty() || m_weights.extent(1) == 1;
   m_weak_machines.push_back(weak_machine);
   m_weights.resizeAndPreserve(m_weak_machines.size(), 1);
   m_weights(m_weights.extent(0)-1, 0) = weight;
   _weights.reference(m_weights(blitz::Range::all(), 0));
+  _extendRejectionThresholds();
+  _addUsedIndices(*weak_machine);
+  if (!sameOutputs) _compile();
+  else if (m_compiled) m_compiled = _compile(m_weak_machines.size()-1);
 }
 
 
 void bob::learn::boosting::BoostedMachine::add_weak_machine(const boost::shared_ptr<WeakMachine> weak_machine, const blitz::Array<double,1> weights){
+  const bool sameOutputs = m_weak_machines.empty() || weights.extent(0) == m_weights.extent(1);
   m_weak_machines.push_back(weak_machine);
   m_weights.resizeAndPreserve(m_weak_machines.size(), weights.extent(0));
   m_weights(m_weights.extent(0)-1, blitz::Range::all()) = weights;
   _weights.reference(m_weights(blitz::Range::all(), 0));
+  _extendRejectionThresholds();
+  _addUsedIndices(*weak_machine);
+  if (!sameOutputs) _compile();
+  else if (m_compiled) m_compiled = _compile(m_weak_machines.size()-1);
 }
 
 
-double bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,1>& features) const{
+void bob::learn::boosting::BoostedMachine::_extendRejectionThresholds(){
+  // newly added weak machines do not reject any sample
+  if (m_rejectionThresholds.extent(0)){
+    m_rejectionThresholds.resizeAndPreserve(m_weak_machines.size());
+    m_rejectionThresholds(m_rejectionThresholds.extent(0)-1) = -std::numeric_limits<double>::infinity();
+  }
+}
+
+
+void bob::learn::boosting::BoostedMachine::_addUsedIndices(const WeakMachine& weak_machine){
+  const blitz::Array<int32_t,1> indices = weak_machine.getIndices();
+  m_usedIndices.insert(indices.begin(), indices.end());
+}
+
+
+void bob::learn::boosting::BoostedMachine::_compile(){
+  m_usedIndices.clear();
+  for (auto it = m_weak_machines.begin(); it != m_weak_machines.end(); ++it){
+    _addUsedIndices(**it);
+  }
+
+  m_compiledTable.clear();
+  m_compiledOffsets.clear();
+  m_compiledIndices.clear();
+  m_compiled = true;
+  for (int i = 0; i < (int)m_weak_machines.size() && m_compiled; ++i){
+    m_compiled = _compile(i);
+  }
+}
+
+bool bob::learn::boosting::BoostedMachine::_compile(int machineIndex){
+  // only LUT machines with one LUT per output can be compiled
+  const LUTMachine* machine = dynamic_cast<const LUTMachine*>(m_weak_machines[machineIndex].get());
+  if (!machine) return false;
+  const blitz::Array<double,2> lut = machine->getLut();
+  const blitz::Array<int32_t,1> indices = machine->getLutIndices();
+  if (lut.extent(1) != m_weights.extent(1)) return false;
+
+  // append the LUT of each output, pre-multiplied with the weight of the output
+  for (int o = 0; o < lut.extent(1); ++o){
+    const double weight = m_weights(machineIndex, o);
+    m_compiledOffsets.push_back(m_compiledTable.size());
+    m_compiledIndices.push_back(indices(o));
+    for (int k = 0; k < lut.extent(0); ++k){
+      m_compiledTable.push_back(weight * lut(k, o));
+    }
+  }
+  return true;
+}
+
+
+template <typename T>
+double bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,1>& features) const{
   // univariate, single feature
   double sum = 0.;
-  //TODO: optimize using STL
+  if (_isCompiled<T>()){
+    // the first output of each weak machine is used
+    const int numberOfOutputs = this->numberOfOutputs();
+    for (int i = m_weak_machines.size(); i--;){
+      const int k = i * numberOfOutputs;
+      sum += m_compiledTable[m_compiledOffsets[k] + features(m_compiledIndices[k])];
+    }
+    return sum;
+  }
   for (int i = m_weak_machines.size(); i--;){
     sum += _weights(i) * m_weak_machines[i]->forward(features);
   }
   return sum;
 }
 
-void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,1>& features, blitz::Array<double,1> predictions) const{
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,1>& features, blitz::Array<double,1>& predictions) const{
   // multi-variate, single feature
   // initialize the predictions since they will be overwritten
-  _predictions1.resize(predictions.shape());
+  // Note: no slices of the member arrays are created, since blitz reference counting is not thread-safe
   predictions = 0.;
+  if (_isCompiled<T>() && predictions.extent(0) == numberOfOutputs()){
+    const int numberOfOutputs = predictions.extent(0);
+    for (int i = m_weak_machines.size(); i--;){
+      for (int o = numberOfOutputs; o--;){
+        const int k = i * numberOfOutputs + o;
+        predictions(o) += m_compiledTable[m_compiledOffsets[k] + features(m_compiledIndices[k])];
+      }
+    }
+    return;
+  }
+  blitz::Array<double,1> weakPredictions(predictions.shape());
   for (int i = m_weak_machines.size(); i--;){
     // predict locally
-    m_weak_machines[i]->forward(features, _predictions1);
-    predictions(blitz::Range::all()) += m_weights(i, blitz::Range::all()) * _predictions1(blitz::Range::all());
+    m_weak_machines[i]->forward(features, weakPredictions);
+    for (int o = predictions.extent(0); o--;)
+      predictions(o) += m_weights(i, o) * weakPredictions(o);
   }
 }
 
-void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,1> predictions) const{
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,1>& predictions) const{
   // univariate, multiple features
+  if (_isCompiled<T>()){
+    // one gather-and-add loop per sample
+    // the first output of each weak machine is used
+    const int stride = features.stride(1), numberOfOutputs = this->numberOfOutputs();
+    for (int j = predictions.extent(0); j--;){
+      const T* sample = &features(j, 0);
+      double sum = 0.;
+      for (int i = m_weak_machines.size(); i--;){
+        const int k = i * numberOfOutputs;
+        sum += m_compiledTable[m_compiledOffsets[k] + sample[m_compiledIndices[k] * stride]];
+      }
+      predictions(j) = sum;
+    }
+    return;
+  }
   // initialize the predictions since they will be overwritten
-  _predictions1.resize(predictions.shape());
-  predictions = 0.;
+  blitz::Array<double,1> weakPredictions(predictions.extent(0));
+  for (int j = predictions.extent(0); j--;)
+    predictions(j) = 0.;
   for (int i = m_weak_machines.size(); i--;){
     // predict locally
-    m_weak_machines[i]->forward(features, _predictions1);
-    predictions(blitz::Range::all()) += _weights(i) * _predictions1(blitz::Range::all());
+    m_weak_machines[i]->forward(features, weakPredictions);
+    const double weight = _weights(i);
+    for (int j = predictions.extent(0); j--;)
+      predictions(j) += weight * weakPredictions(j);
   }
 }
 
-void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,2> predictions) const{
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,2>& predictions) const{
+  // multi-variate, multiple features
+  if (_isCompiled<T>() && predictions.extent(1) == numberOfOutputs()){
+    // one gather-and-add loop per sample
+    const int stride = features.stride(1), numberOfOutputs = predictions.extent(1);
+    std::vector<double> sums(numberOfOutputs);
+    for (int j = predictions.extent(0); j--;){
+      const T* sample = &features(j, 0);
+      std::fill(sums.begin(), sums.end(), 0.);
+      for (int i = m_weak_machines.size(); i--;){
+        for (int o = numberOfOutputs; o--;){
+          const int k = i * numberOfOutputs + o;
+          sums[o] += m_compiledTable[m_compiledOffsets[k] + sample[m_compiledIndices[k] * stride]];
+        }
+      }
+      for (int o = numberOfOutputs; o--;)
+        predictions(j, o) = sums[o];
+    }
+    return;
+  }
   // initialize the predictions since they will be overwritten
-  _predictions2.resize(predictions.shape());
-  predictions = 0.;
+  blitz::Array<double,2> weakPredictions(predictions.extent(0), predictions.extent(1));
+  for (int j = predictions.extent(0); j--;)
+    for (int o = predictions.extent(1); o--;)
+      predictions(j, o) = 0.;
   for (int i = m_weak_machines.size(); i--;){
     // predict locally
-    m_weak_machines[i]->forward(features, _predictions2);
+    m_weak_machines[i]->forward(features, weakPredictions);
     for (int j = predictions.extent(0); j--;)
-      predictions(j, blitz::Range::all()) += m_weights(i, blitz::Range::all()) * _predictions2(j, blitz::Range::all());
+      for (int o = predictions.extent(1); o--;)
+        predictions(j, o) += m_weights(i, o) * weakPredictions(j, o);
   }
 }
 
+// returns the rows [first, last) of the given array
+static blitz::Array<double,1> rows(blitz::Array<double,1>& array, int first, int last){
+  return array(blitz::Range(first, last-1));
+}
+template <typename T>
+static blitz::Array<T,2> rows(blitz::Array<T,2>& array, int first, int last){
+  return array(blitz::Range(first, last-1), blitz::Range::all());
+}
+static blitz::Array<double,3> rows(blitz::Array<double,3>& array, int first, int last){
+  return array(blitz::Range(first, last-1), blitz::Range::all(), blitz::Range::all());
+}
+
+// The size of the feature rows (in bytes) that are processed together by all weak machines, so that they are still in the cache for the next weak machine
+static const long BLOCK_BYTES = 1L << 18;
+// The minimum number of samples processed together, to keep the overhead of calling the weak machines small
+static const int MINIMUM_BLOCK_SIZE = 64;
+// The size of a cache line; each feature that is read from a sample brings (at most) one cache line into the cache
+static const long CACHE_LINE_BYTES = 64;
 
-void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels) const{
-  forward(features, predictions);
+template <typename T>
+int bob::learn::boosting::BoostedMachine::_blockSize(const blitz::Array<T,2>& features) const{
+  // compiled machines process the samples one by one anyways
+  if (_isCompiled<T>()) return std::max(1, features.extent(0));
+  // only the features that are read by the weak machines are brought into the cache, but never more than the whole row of the dispatched feature type
+  const long rowBytes = (long)features.extent(1) * (long)sizeof(T);
+  const long readBytes = (long)m_usedIndices.size() * std::max(CACHE_LINE_BYTES, (long)sizeof(T));
+  const long sampleBytes = std::max(1L, std::min(rowBytes, readBytes));
+  return std::max(MINIMUM_BLOCK_SIZE, (int)std::min(BLOCK_BYTES / sampleBytes, (long)features.extent(0)));
+}
+
+// Splits the samples into consecutive blocks of at most the given size, and computes the predictions block by block.
+// The blocks are distributed to the given number of threads.
+// Since blitz reference counting is not thread-safe, the blocks are sliced in the calling thread,
+// and the threads access the elements of the blocks only.
+template <typename Machine, typename T, int N>
+static void blocked_forward(const Machine& machine, const blitz::Array<T,2>& features, blitz::Array<double,N>& predictions, int numberOfThreads, int blockSize){
+  const int numberOfSamples = features.extent(0);
+  const int numberOfBlocks = std::max(1, std::min(numberOfSamples, std::max(numberOfThreads, (numberOfSamples + blockSize - 1) / blockSize)));
+  if (numberOfBlocks == 1){
+    machine(features, predictions);
+    return;
+  }
+  std::vector<blitz::Array<T,2> > featureBlocks(numberOfBlocks);
+  std::vector<blitz::Array<double,N> > predictionBlocks(numberOfBlocks);
+  blitz::Array<T,2> allFeatures(features);
+  for (int b = 0; b < numberOfBlocks; ++b){
+    int first = (int)((long)numberOfSamples * b / numberOfBlocks);
+    int last = (int)((long)numberOfSamples * (b+1) / numberOfBlocks);
+    featureBlocks[b].reference(rows(allFeatures, first, last));
+    predictionBlocks[b].reference(rows(predictions, first, last));
+  }
+  bob::learn::boosting::parallel_for(numberOfBlocks, numberOfThreads, [&](int, int first, int last){
+    for (int b = first; b < last; ++b){
+      machine(featureBlocks[b], predictionBlocks[b]);
+    }
+  });
+}
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,1>& predictions, int numberOfThreads) const{
+  // univariate, multiple features
+  blocked_forward([this](const blitz::Array<T,2>& f, blitz::Array<double,1>& p){_forward(f, p);}, features, predictions, numberOfThreads, _blockSize(features));
+}
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,2>& predictions, int numberOfThreads) const{
+  // multi-variate, multiple features
+  blocked_forward([this](const blitz::Array<T,2>& f, blitz::Array<double,2>& p){_forward(f, p);}, features, predictions, numberOfThreads, _blockSize(features));
+}
+
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,1>& predictions, blitz::Array<double,1>& labels, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
   // get the labels
   for (int i = predictions.extent(0); i--;)
     labels(i) = (predictions(i) > 0) * 2. - 1;
 }
 
-void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels) const{
-  forward(features, predictions);
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,2>& predictions, blitz::Array<double,2>& labels, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
   // get the labels
   labels = -1;
   for (int i = predictions.extent(0); i--;){
@@ -96,6 +302,376 @@ void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2
 }
 
 
+void bob::learn::boosting::BoostedMachine::_checkRounds(const blitz::Array<int32_t,1>& rounds) const{
+  for (int r = 0; r < rounds.extent(0); ++r){
+    if (rounds(r) < 0 || rounds(r) > (int)m_weak_machines.size() || (r && rounds(r) < rounds(r-1))){
+      std::ostringstream ss;
+      ss << "BoostedMachine: the round counts must be sorted in ascending order and lie in the range [0, " << m_weak_machines.size() << "]";
+      throw std::runtime_error(ss.str());
+    }
+  }
+}
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_stagedForward(const blitz::Array<T,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2>& predictions) const{
+  // univariate, multiple features
+  const int numberOfSamples = features.extent(0), numberOfRounds = rounds.extent(0);
+  if (_isCompiled<T>()){
+    // the first output of each weak machine is used
+    const int stride = features.stride(1), numberOfOutputs = this->numberOfOutputs();
+    for (int j = numberOfSamples; j--;){
+      const T* sample = &features(j, 0);
+      double sum = 0.;
+      int r = 0;
+      for (; r < numberOfRounds && rounds(r) == 0; ++r)
+        predictions(j, r) = sum;
+      for (int i = 0; r < numberOfRounds; ++i){
+        const int k = i * numberOfOutputs;
+        sum += m_compiledTable[m_compiledOffsets[k] + sample[m_compiledIndices[k] * stride]];
+        for (; r < numberOfRounds && rounds(r) == i+1; ++r)
+          predictions(j, r) = sum;
+      }
+    }
+    return;
+  }
+  blitz::Array<double,1> sums(numberOfSamples), weakPredictions(numberOfSamples);
+  sums = 0.;
+  int r = 0;
+  for (; r < numberOfRounds && rounds(r) == 0; ++r)
+    for (int j = numberOfSamples; j--;)
+      predictions(j, r) = 0.;
+  for (int i = 0; r < numberOfRounds; ++i){
+    m_weak_machines[i]->forward(features, weakPredictions);
+    const double weight = _weights(i);
+    for (int j = numberOfSamples; j--;)
+      sums(j) += weight * weakPredictions(j);
+    for (; r < numberOfRounds && rounds(r) == i+1; ++r)
+      for (int j = numberOfSamples; j--;)
+        predictions(j, r) = sums(j);
+  }
+}
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_stagedForward(const blitz::Array<T,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3>& predictions) const{
+  // multi-variate, multiple features
+  const int numberOfSamples = features.extent(0), numberOfRounds = rounds.extent(0), numberOfOutputs = predictions.extent(2);
+  if (_isCompiled<T>()){
+    const int stride = features.stride(1);
+    std::vector<double> sums(numberOfOutputs);
+    for (int j = numberOfSamples; j--;){
+      const T* sample = &features(j, 0);
+      std::fill(sums.begin(), sums.end(), 0.);
+      int r = 0;
+      for (; r < numberOfRounds && rounds(r) == 0; ++r)
+        for (int o = numberOfOutputs; o--;)
+          predictions(j, r, o) = 0.;
+      for (int i = 0; r < numberOfRounds; ++i){
+        for (int o = numberOfOutputs; o--;){
+          const int k = i * numberOfOutputs + o;
+          sums[o] += m_compiledTable[m_compiledOffsets[k] + sample[m_compiledIndices[k] * stride]];
+        }
+        for (; r < numberOfRounds && rounds(r) == i+1; ++r)
+          for (int o = numberOfOutputs; o--;)
+            predictions(j, r, o) = sums[o];
+      }
+    }
+    return;
+  }
+  blitz::Array<double,2> sums(numberOfSamples, numberOfOutputs), weakPredictions(numberOfSamples, numberOfOutputs);
+  sums = 0.;
+  int r = 0;
+  for (; r < numberOfRounds && rounds(r) == 0; ++r)
+    for (int j = numberOfSamples; j--;)
+      for (int o = numberOfOutputs; o--;)
+        predictions(j, r, o) = 0.;
+  for (int i = 0; r < numberOfRounds; ++i){
+    m_weak_machines[i]->forward(features, weakPredictions);
+    for (int j = numberOfSamples; j--;)
+      for (int o = numberOfOutputs; o--;)
+        sums(j, o) += m_weights(i, o) * weakPredictions(j, o);
+    for (; r < numberOfRounds && rounds(r) == i+1; ++r)
+      for (int j = numberOfSamples; j--;)
+        for (int o = numberOfOutputs; o--;)
+          predictions(j, r, o) = sums(j, o);
+  }
+}
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_stagedForward(const blitz::Array<T,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2>& predictions, int numberOfThreads) const{
+  _checkRounds(rounds);
+  if (predictions.extent(0) != features.extent(0) || predictions.extent(1) != rounds.extent(0)){
+    throw std::runtime_error("BoostedMachine: the staged predictions must have the shape (#samples, #rounds)");
+  }
+  blocked_forward([&](const blitz::Array<T,2>& f, blitz::Array<double,2>& p){_stagedForward(f, rounds, p);}, features, predictions, numberOfThreads, _blockSize(features));
+}
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_stagedForward(const blitz::Array<T,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3>& predictions, int numberOfThreads) const{
+  _checkRounds(rounds);
+  if (predictions.extent(0) != features.extent(0) || predictions.extent(1) != rounds.extent(0) || predictions.extent(2) != numberOfOutputs()){
+    throw std::runtime_error("BoostedMachine: the staged predictions must have the shape (#samples, #rounds, #outputs)");
+  }
+  blocked_forward([&](const blitz::Array<T,2>& f, blitz::Array<double,3>& p){_stagedForward(f, rounds, p);}, features, predictions, numberOfThreads, _blockSize(features));
+}
+
+boost::shared_ptr<bob::learn::boosting::BoostedMachine> bob::learn::boosting::BoostedMachine::truncate(int numberOfMachines) const{
+  if (numberOfMachines < 0 || numberOfMachines > (int)m_weak_machines.size()){
+    std::ostringstream ss;
+    ss << "BoostedMachine: cannot truncate the machine with " << m_weak_machines.size() << " weak machines to " << numberOfMachines << " weak machines";
+    throw std::runtime_error(ss.str());
+  }
+  boost::shared_ptr<BoostedMachine> machine(new BoostedMachine());
+  if (!numberOfMachines) return machine;
+
+  machine->m_weak_machines.assign(m_weak_machines.begin(), m_weak_machines.begin() + numberOfMachines);
+  machine->m_weights.resize(numberOfMachines, numberOfOutputs());
+  machine->m_weights = m_weights(blitz::Range(0, numberOfMachines-1), blitz::Range::all());
+  machine->_weights.reference(machine->m_weights(blitz::Range::all(), 0));
+  if (m_rejectionThresholds.extent(0)){
+    machine->m_rejectionThresholds.resize(numberOfMachines);
+    machine->m_rejectionThresholds = m_rejectionThresholds(blitz::Range(0, numberOfMachines-1));
+  }
+  machine->_compile();
+  return machine;
+}
+
+void bob::learn::boosting::BoostedMachine::setRejectionThresholds(const blitz::Array<double,1>& thresholds){
+  if (thresholds.extent(0) && thresholds.extent(0) != (int)m_weak_machines.size()){
+    std::ostringstream ss;
+    ss << "BoostedMachine: the number of rejection thresholds (" << thresholds.extent(0) << ") differs from the number of weak machines (" << m_weak_machines.size() << ")";
+    throw std::runtime_error(ss.str());
+  }
+  if (thresholds.extent(0) && numberOfOutputs() != 1){
+    throw std::runtime_error("BoostedMachine: rejection thresholds can only be used in the uni-variate case");
+  }
+  m_rejectionThresholds.resize(thresholds.extent(0));
+  m_rejectionThresholds = thresholds;
+}
+
+// Accumulates the weighted predictions of the weak machines (as returned by weakPrediction(i)) in the order in which the weak machines were added,
+// and stops as soon as the partial sum drops below the rejection threshold of the current weak machine
+template <typename Prediction>
+static double cascade(int numberOfMachines, const blitz::Array<double,1>& thresholds, Prediction weakPrediction, int& exitStage){
+  const int numberOfStages = thresholds.extent(0);
+  double sum = 0.;
+  for (int i = 0; i < numberOfMachines; ++i){
+    sum += weakPrediction(i);
+    if (i < numberOfStages && sum < thresholds(i)){
+      exitStage = i;
+      return sum;
+    }
+  }
+  exitStage = numberOfMachines;
+  return sum;
+}
+
+template <typename T>
+double bob::learn::boosting::BoostedMachine::_forwardWithRejection(const blitz::Array<T,1>& features, int& exitStage) const{
+  if (numberOfOutputs() > 1){
+    throw std::runtime_error("BoostedMachine: the soft cascade can only be used in the uni-variate case");
+  }
+  if (_isCompiled<T>()){
+    return cascade(m_weak_machines.size(), m_rejectionThresholds, [&](int i){return m_compiledTable[m_compiledOffsets[i] + features(m_compiledIndices[i])];}, exitStage);
+  }
+  return cascade(m_weak_machines.size(), m_rejectionThresholds, [&](int i){return _weights(i) * m_weak_machines[i]->forward(features);}, exitStage);
+}
+
+template <typename T>
+void bob::learn::boosting::BoostedMachine::_forwardWithRejection(const blitz::Array<T,2>& features, blitz::Array<double,1>& predictions, blitz::Array<int32_t,1>& exitStages, int numberOfThreads) const{
+  if (numberOfOutputs() > 1){
+    throw std::runtime_error("BoostedMachine: the soft cascade can only be used in the uni-variate case");
+  }
+  // the samples are evaluated one by one, so that the evaluation can stop early for each of them
+  const int numberOfFeatures = features.extent(1), stride = features.stride(1);
+  parallel_for(features.extent(0), numberOfThreads, [&](int, int first, int last){
+    // a buffer for non-contiguous samples
+    blitz::Array<T,1> buffer(stride == 1 ? 0 : numberOfFeatures);
+    for (int j = first; j < last; ++j){
+      const T* sample = &features(j, 0);
+      int exitStage;
+      if (_isCompiled<T>()){
+        predictions(j) = cascade(m_weak_machines.size(), m_rejectionThresholds, [&](int i){return m_compiledTable[m_compiledOffsets[i] + sample[m_compiledIndices[i] * stride]];}, exitStage);
+      } else {
+        // the weak machines require the sample as a blitz array; since blitz reference counting is not thread-safe,
+        // we create a view with its own reference counter (or a copy, if the sample is not contiguous)
+        blitz::Array<T,1> view;
+        if (stride == 1){
+          view.reference(blitz::Array<T,1>(const_cast<T*>(sample), blitz::shape(numberOfFeatures), blitz::neverDeleteData));
+        } else {
+          for (int k = numberOfFeatures; k--;)
+            buffer(k) = sample[k * stride];
+          view.reference(buffer);
+        }
+        predictions(j) = cascade(m_weak_machines.size(), m_rejectionThresholds, [&](int i){return _weights(i) * m_weak_machines[i]->forward(view);}, exitStage);
+      }
+      exitStages(j) = exitStage;
+    }
+  });
+}
+
+
+// The public forward functions are implemented for uint8, uint16, float32 and float64 features, so that the features do not need to be converted
+double bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint8_t,1>& features) const{
+  return _forward(features);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint8_t,1>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint8_t,2>& features, blitz::Array<double,1> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint8_t,2>& features, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint8_t,2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint8_t,2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<uint8_t,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<uint8_t,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+double bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<uint8_t,1>& features, int& exitStage) const{
+  return _forwardWithRejection(features, exitStage);
+}
+
+void bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<uint8_t,2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads) const{
+  _forwardWithRejection(features, predictions, exitStages, numberOfThreads);
+}
+
+double bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,1>& features) const{
+  return _forward(features);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,1>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,1> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<uint16_t,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<uint16_t,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+double bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<uint16_t,1>& features, int& exitStage) const{
+  return _forwardWithRejection(features, exitStage);
+}
+
+void bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<uint16_t,2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads) const{
+  _forwardWithRejection(features, predictions, exitStages, numberOfThreads);
+}
+
+double bob::learn::boosting::BoostedMachine::forward(const blitz::Array<float,1>& features) const{
+  return _forward(features);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<float,1>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<float,2>& features, blitz::Array<double,1> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<float,2>& features, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<float,2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<float,2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<float,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<float,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+double bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<float,1>& features, int& exitStage) const{
+  return _forwardWithRejection(features, exitStage);
+}
+
+void bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<float,2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads) const{
+  _forwardWithRejection(features, predictions, exitStages, numberOfThreads);
+}
+
+double bob::learn::boosting::BoostedMachine::forward(const blitz::Array<double,1>& features) const{
+  return _forward(features);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<double,1>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<double,2>& features, blitz::Array<double,1> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<double,2>& features, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _forward(features, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<double,2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::forward(const blitz::Array<double,2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads) const{
+  _forward(features, predictions, labels, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<double,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+void bob::learn::boosting::BoostedMachine::stagedForward(const blitz::Array<double,2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads) const{
+  _stagedForward(features, rounds, predictions, numberOfThreads);
+}
+
+double bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<double,1>& features, int& exitStage) const{
+  return _forwardWithRejection(features, exitStage);
+}
+
+void bob::learn::boosting::BoostedMachine::forwardWithRejection(const blitz::Array<double,2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads) const{
+  _forwardWithRejection(features, predictions, exitStages, numberOfThreads);
+}
+
+
 blitz::Array<int,1> bob::learn::boosting::BoostedMachine::getIndices(int start, int end) const{
   std::set<int32_t> indices;
   if (end < 0) end = m_weak_machines.size();
@@ -113,6 +689,9 @@ blitz::Array<int,1> bob::learn::boosting::BoostedMachine::getIndices(int start,
 void bob::learn::boosting::BoostedMachine::save(bob::io::base::HDF5File& file) const{
   file.setAttribute(".", "version", 2);
   file.setArray("Weights", m_weights);
+  if (m_rejectionThresholds.extent(0)){
+    file.setArray("RejectionThresholds", m_rejectionThresholds);
+  }
   for (int i = 0; i < m_weights.extent(0); ++i){
     std::ostringstream fns;
     fns << "WeakMachine_" << i;
@@ -147,6 +726,15 @@ void bob::learn::boosting::BoostedMachine::load(bob::io::base::HDF5File& file){
   if (m_weak_machines.empty()){
     throw std::runtime_error("Could not read weak machines.");
   }
+
+  // the rejection thresholds of the soft cascade are optional
+  // (they are checked against the weak machines, since a corrupt file would otherwise be read out of bounds)
+  m_rejectionThresholds.resize(0);
+  if (file.contains("RejectionThresholds")){
+    setRejectionThresholds(file.readArray<double,1>("RejectionThresholds"));
+  }
+
+  _compile();
 }
 
 
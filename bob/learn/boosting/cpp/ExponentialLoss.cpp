@@ -0,0 +1,23 @@
+#include <bob.learn.boosting/ExponentialLoss.h>
+#include <math.h>
+
+void bob::learn::boosting::ExponentialLoss::sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors) const{
+  for (int j = 0; j < targets.extent(0); ++j){
+    errors(j) = exp(-(targets(j) * scores(j)));
+  }
+}
+
+void bob::learn::boosting::ExponentialLoss::sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& gradient) const{
+  for (int j = 0; j < targets.extent(0); ++j){
+    gradient(j) = -targets(j) * exp(-(targets(j) * scores(j)));
+  }
+}
+
+void bob::learn::boosting::ExponentialLoss::sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const{
+  // the transcendental functions are evaluated only once for the loss and the gradient
+  for (int j = 0; j < targets.extent(0); ++j){
+    const double e = exp(-(targets(j) * scores(j)));
+    errors(j) = e;
+    gradient(j) = -targets(j) * e;
+  }
+}
@@ -10,40 +10,69 @@ double bob::learn::boosting::JesorskyLoss::interEyeDistance(const double y1, con
   return sqrt(sqr(y1 - y2) + sqr(x1 - x2));
 }
 
-void bob::learn::boosting::JesorskyLoss::loss(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& errors) const{
-  // compute one error for each sample
-  errors = 0.;
-  for (int i = targets.extent(0); i--;){
-    // compute inter-eye-distance
-    double scale = 1./interEyeDistance(targets(i,0), targets(i,1), targets(i,2), targets(i,3));
-    // compute error for all positions
-    // which are assumed to be 2D points
-    for (int j = 0; j < targets.extent(1); j += 2){
-      double dx = scores(i, j) - targets(i, j);
-      double dy = scores(i, j+1) - targets(i, j+1);
-      // sum errors
-      errors(i,0) += sqrt(sqr(dx) + sqr(dy)) * scale;
+boost::shared_ptr<const blitz::Array<double,1> > bob::learn::boosting::JesorskyLoss::sampleScales(const blitz::Array<double,2>& targets) const{
+  // the targets usually stay the same during the whole training, so that the inter-eye-distances are computed only once
+  boost::mutex::scoped_lock lock(m_mutex);
+  bool cached = m_scales && m_eyes.extent(0) == targets.extent(0);
+  for (int i = 0; cached && i < targets.extent(0); ++i){
+    cached = m_eyes(i,0) == targets(i,0) && m_eyes(i,1) == targets(i,1) && m_eyes(i,2) == targets(i,2) && m_eyes(i,3) == targets(i,3);
+  }
+
+  if (!cached){
+    // compute the inverse inter-eye-distance for each sample
+    blitz::Array<double,1>* scales = new blitz::Array<double,1>(targets.extent(0));
+    m_eyes.resize(targets.extent(0), 4);
+    for (int i = 0; i < targets.extent(0); ++i){
+      for (int j = 0; j < 4; ++j){
+        m_eyes(i,j) = targets(i,j);
+      }
+      (*scales)(i) = 1./interEyeDistance(targets(i,0), targets(i,1), targets(i,2), targets(i,3));
     }
+    m_scales.reset(scales);
   }
+  // a copy of the pointer is returned, so that the scales stay valid when the cache is replaced in another thread
+  return m_scales;
 }
 
-void bob::learn::boosting::JesorskyLoss::lossGradient(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& gradient) const{
-//    # allocate memory for the gradients
-//    gradient = numpy.ndarray(targets.shape, numpy.float)
-  for (int i = targets.extent(0); i--;){
-    // compute inter-eye-distance
-    double scale = 1./interEyeDistance(targets(i,0), targets(i,1), targets(i,2), targets(i,3));
-    // compute error for all positions
-    // which are assumed to be 2D points
-    for (int j = 0; j < targets.extent(1); j += 2){
-      double dx = scores(i, j) - targets(i, j);
-      double dy = scores(i, j+1) - targets(i, j+1);
-      double error = scale / sqrt(sqr(dx) + sqr(dy));
-      // set gradient
-      gradient(i, j) = dx * error;
-      gradient(i, j+1) = dy * error;
-    }
+// The functions below compute the errors for all positions, which are assumed to be 2D points.
+// The loops are free of branches and use contiguous data, so that the compiler can vectorize them.
+
+void bob::learn::boosting::JesorskyLoss::sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& errors) const{
+  // compute one error for the sample
+  const double* t = targets.data(),* s = scores.data();
+  double error = 0.;
+  for (int j = 0; j < targets.extent(0); j += 2){
+    // sum errors
+    error += sqrt(sqr(s[j] - t[j]) + sqr(s[j+1] - t[j+1]));
   }
+  errors(0) = error * scale;
 }
 
+void bob::learn::boosting::JesorskyLoss::sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& gradient) const{
+  const double* t = targets.data(),* s = scores.data();
+  double* g = gradient.data();
+  for (int j = 0; j < targets.extent(0); j += 2){
+    const double dx = s[j] - t[j];
+    const double dy = s[j+1] - t[j+1];
+    const double error = scale / sqrt(sqr(dx) + sqr(dy));
+    // set gradient
+    g[j] = dx * error;
+    g[j+1] = dy * error;
+  }
+}
 
+void bob::learn::boosting::JesorskyLoss::sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const{
+  // compute the distances of all positions only once for the loss and the gradient
+  const double* t = targets.data(),* s = scores.data();
+  double* g = gradient.data();
+  double error = 0.;
+  for (int j = 0; j < targets.extent(0); j += 2){
+    const double dx = s[j] - t[j];
+    const double dy = s[j+1] - t[j+1];
+    const double distance = sqrt(sqr(dx) + sqr(dy));
+    error += distance;
+    g[j] = dx * (scale / distance);
+    g[j+1] = dy * (scale / distance);
+  }
+  errors(0) = error * scale;
+}
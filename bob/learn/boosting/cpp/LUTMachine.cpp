@@ -41,7 +41,9 @@ bob::learn::boosting::LUTMachine::LUTMachine(bob::io::base::HDF5File& file):
   load(file);
 }
 
-double bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,1>& features) const{
+// The forward functions are implemented for uint8 and uint16 features, so that 8-bit features do not need to be converted
+template <typename T>
+double bob::learn::boosting::LUTMachine::_forward(const blitz::Array<T,1>& features) const{
   // univariate, single feature
   assert ( features.extent(0) > _index );
   assert ( features((int)_index) < _look_up_table.extent(0) );
@@ -49,7 +51,8 @@ double bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,1>&
 }
 
 
-void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,1>& features, blitz::Array<double,1> predictions) const{
+template <typename T>
+void bob::learn::boosting::LUTMachine::_forward(const blitz::Array<T,1>& features, blitz::Array<double,1>& predictions) const{
   // multi-variate, single feature
   assert ( m_indices.extent(0) == predictions.extent(0) );
   for (int j = 0; j < m_indices.extent(0); ++j){
@@ -60,7 +63,8 @@ void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,1>& f
   }
 }
 
-void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,1> predictions) const{
+template <typename T>
+void bob::learn::boosting::LUTMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,1>& predictions) const{
   // univariate, several features
   assert ( predictions.extent(0) == features.extent(0) );
   assert ( features.extent(1) > _index );
@@ -71,7 +75,8 @@ void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,2>& f
   }
 }
 
-void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,2> predictions) const{
+template <typename T>
+void bob::learn::boosting::LUTMachine::_forward(const blitz::Array<T,2>& features, blitz::Array<double,2>& predictions) const{
   // multi-variate, several features
   assert ( predictions.extent(0) == features.extent(0) );
   assert ( predictions.extent(1) == m_indices.extent(0) );
@@ -87,6 +92,38 @@ void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,2>& f
   }
 }
 
+double bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint8_t,1>& features) const{
+  return _forward(features);
+}
+
+void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint8_t,1>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint8_t,2>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint8_t,2>& features, blitz::Array<double,2> predictions) const{
+  _forward(features, predictions);
+}
+
+double bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,1>& features) const{
+  return _forward(features);
+}
+
+void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,1>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,1> predictions) const{
+  _forward(features, predictions);
+}
+
+void bob::learn::boosting::LUTMachine::forward(const blitz::Array<uint16_t,2>& features, blitz::Array<double,2> predictions) const{
+  _forward(features, predictions);
+}
+
 blitz::Array<int32_t,1> bob::learn::boosting::LUTMachine::getIndices() const{
   std::set<int32_t> indices;
   for (int i = 0; i < m_indices.extent(0); ++i){
@@ -1,78 +1,236 @@
 #include <bob.learn.boosting/LUTTrainer.h>
 #include <bob.learn.boosting/Functions.h>
+#include <bob.learn.boosting/Parallel.h>
+#include <boost/random/uniform_int_distribution.hpp>
+#include <algorithm>
 #include <limits>
+#include <sstream>
+#include <stdexcept>
+#include <vector>
 
-bob::learn::boosting::LUTTrainer::LUTTrainer(uint16_t maximumFeatureValue, int numberOfOutputs, SelectionStyle selectionType) :
+bob::learn::boosting::LUTTrainer::LUTTrainer(uint16_t maximumFeatureValue, int numberOfOutputs, SelectionStyle selectionType, int numberOfThreads, double featureFraction, uint32_t seed) :
   m_maximumFeatureValue(maximumFeatureValue),
   m_numberOfOutputs(numberOfOutputs),
   m_selectionType(selectionType),
-  _luts(maximumFeatureValue, numberOfOutputs),
-  _selectedIndices(numberOfOutputs),
-  _gradientHistogram(maximumFeatureValue)
+  m_numberOfThreads(numberOfThreads),
+  m_featureFraction(featureFraction),
+  m_generator(seed)
 {
 }
 
-int32_t bob::learn::boosting::LUTTrainer::bestIndex(const blitz::Array<double,1>& array) const{
-  double min = std::numeric_limits<double>::max();
-  int32_t minIndex = -1;
-  for (int i = 0; i < array.extent(0); ++i){
-    if (array(i) < min){
-      min = array(i);
-      minIndex = i;
+std::string bob::learn::boosting::LUTTrainer::randomState() const{
+  boost::mutex::scoped_lock lock(m_mutex);
+  std::ostringstream stream;
+  stream << m_generator;
+  return stream.str();
+}
+
+void bob::learn::boosting::LUTTrainer::setRandomState(const std::string& state){
+  boost::mutex::scoped_lock lock(m_mutex);
+  std::istringstream stream(state);
+  boost::mt19937 generator;
+  stream >> generator;
+  if (stream.fail()){
+    throw std::runtime_error("LUTTrainer: the given random state is invalid");
+  }
+  m_generator = generator;
+}
+
+void bob::learn::boosting::LUTTrainer::_selectFeatures(int featureLength, std::vector<int32_t>& featureIndices) const{
+  featureIndices.clear();
+  const int count = std::max(1, (int)(m_featureFraction * featureLength + 0.5));
+  if (count >= featureLength) return;
+
+  boost::mutex::scoped_lock lock(m_mutex);
+  // draw the features without replacement using a partial Fisher-Yates shuffle
+  // the index buffer is kept between the calls, only the entries that were swapped are reset
+  if ((int)m_indices.size() != featureLength){
+    m_indices.resize(featureLength);
+    for (int i = 0; i < featureLength; ++i){
+      m_indices[i] = i;
     }
   }
-  return minIndex;
+  std::vector<int> swapped(count);
+  for (int i = 0; i < count; ++i){
+    boost::random::uniform_int_distribution<int> distribution(i, featureLength - 1);
+    swapped[i] = distribution(m_generator);
+    std::swap(m_indices[i], m_indices[swapped[i]]);
+  }
+  // sorted indices keep the memory access pattern and the selection of the first of equally good features
+  featureIndices.assign(m_indices.begin(), m_indices.begin() + count);
+  // undo the swaps in reverse order, so that the buffer is the identity again
+  for (int i = count; i--;){
+    std::swap(m_indices[i], m_indices[swapped[i]]);
+  }
+  lock.unlock();
+  std::sort(featureIndices.begin(), featureIndices.end());
 }
 
-void bob::learn::boosting::LUTTrainer::weightedHistogram(const blitz::Array<uint16_t,1>& features, const blitz::Array<double,1>& weights) const{
-  assert(features.extent(0) == weights.extent(0));
-  _gradientHistogram = 0.;
-  for (int i = features.extent(0); i--;){
-    _gradientHistogram((int)features(i)) += weights(i);
+// Computes the weighted histograms of the features featureIndices[0, histograms.extent(0)), using the given samples only, or all samples if sampleIndices is NULL.
+// Samples are accumulated in the same order as in weighted_histograms.
+template <typename T>
+static void selected_histograms(const blitz::Array<T,2>& features, const blitz::Array<double,2>& weights, const blitz::Array<int32_t,1>* sampleIndices, const int32_t* featureIndices, blitz::Array<double,3>& histograms){
+  histograms = 0.;
+  const int featureCount = histograms.extent(0), outputCount = histograms.extent(2);
+  for (int k = sampleIndices ? sampleIndices->extent(0) : features.extent(0); k--;){
+    const int i = sampleIndices ? (*sampleIndices)(k) : k;
+    for (int f = 0; f < featureCount; ++f){
+      const int bin = (int)features(i, featureIndices[f]);
+      for (int o = 0; o < outputCount; ++o){
+        histograms(f, bin, o) += weights(i, o);
+      }
+    }
   }
 }
 
-boost::shared_ptr<bob::learn::boosting::LUTMachine> bob::learn::boosting::LUTTrainer::train(const blitz::Array<uint16_t,2>& trainingFeatures, const blitz::Array<double,2>& lossGradient) const{
-  int featureLength = trainingFeatures.extent(1);
-  _lossSum.resize(featureLength, m_numberOfOutputs);
+// The number of bytes that the histograms of one block of features should occupy, so that they stay in the cache
+static const int FEATURE_BLOCK_BYTES = 256 * 1024;
+
+// The best feature(s) found by one thread: the loss, the selected index and its weighted histogram for each output
+struct Candidate{
+  Candidate(int numberOfBins, int numberOfOutputs) :
+    loss(numberOfOutputs),
+    index(numberOfOutputs),
+    histogram(numberOfBins, numberOfOutputs)
+  {
+    loss = std::numeric_limits<double>::max();
+    index = -1;
+    histogram = 0.;
+  }
+
+  blitz::Array<double,1> loss;
+  blitz::Array<int32_t,1> index;
+  blitz::Array<double,2> histogram;
+};
+
+// The training is implemented for uint8 and uint16 features, so that 8-bit features do not need to be converted
+template <typename T>
+boost::shared_ptr<bob::learn::boosting::LUTMachine> bob::learn::boosting::LUTTrainer::_train(const blitz::Array<T,2>& trainingFeatures, const blitz::Array<double,2>& lossGradient, const blitz::Array<int32_t,1>* sampleIndices) const{
+  const int featureLength = trainingFeatures.extent(1);
+  // the random subset of features that is scanned; empty if all features are scanned
+  std::vector<int32_t> featureIndices;
+  _selectFeatures(featureLength, featureIndices);
+  const int scanLength = featureIndices.empty() ? featureLength : (int)featureIndices.size();
+  const int blockSize = std::max(1, FEATURE_BLOCK_BYTES / (int)(sizeof(double) * m_maximumFeatureValue * m_numberOfOutputs));
+
   // Compute the sum of the gradient based on the feature values or the loss associated with each feature index
-  // Compute the loss for each feature
-  for (int featureIndex = featureLength; featureIndex--;){
-    for (int outputIndex = m_numberOfOutputs; outputIndex--;){
-      weightedHistogram(trainingFeatures(blitz::Range::all(),featureIndex), lossGradient(blitz::Range::all(), outputIndex));
-      _lossSum(featureIndex,outputIndex) = - blitz::sum(blitz::abs(_gradientHistogram));
-    }
+  // The features are split into consecutive ranges, one for each thread.
+  // Each thread computes the histograms of all features and outputs in cache-sized blocks of features, using a single sweep over the samples per block.
+  // Only the histograms of the best feature(s) of each thread are kept, so that the look-up-tables do not need to be recomputed.
+  // When sample indices are given, only these rows of the features and the gradient are accumulated.
+  // When only a subset of the features is scanned, the ranges and blocks are taken from the list of selected features.
+  // Note: blitz reference counting is not thread-safe, so no slices of the shared arrays are created inside the threads
+  // (blitz arrays are copied by reference, so each candidate needs to be created separately)
+  std::vector<boost::shared_ptr<Candidate> > candidates(m_numberOfThreads);
+  for (int thread = 0; thread < m_numberOfThreads; ++thread){
+    candidates[thread].reset(new Candidate(m_maximumFeatureValue, m_numberOfOutputs));
   }
+  parallel_for(scanLength, m_numberOfThreads, [&](int thread, int first, int last){
+    Candidate& candidate = *candidates[thread];
+    blitz::Array<double,3> histograms(std::min(blockSize, last - first), m_maximumFeatureValue, m_numberOfOutputs);
+    blitz::Array<double,1> lossSum(m_numberOfOutputs);
+    for (int blockStart = first; blockStart < last; blockStart += blockSize){
+      const int blockLength = std::min(blockSize, last - blockStart);
+      if (blockLength < histograms.extent(0)){
+        histograms.resize(blockLength, m_maximumFeatureValue, m_numberOfOutputs);
+      }
+      if (!featureIndices.empty()){
+        selected_histograms(trainingFeatures, lossGradient, sampleIndices, featureIndices.data() + blockStart, histograms);
+      } else if (sampleIndices){
+        weighted_histograms(trainingFeatures, lossGradient, *sampleIndices, histograms, blockStart);
+      } else {
+        weighted_histograms(trainingFeatures, lossGradient, histograms, blockStart);
+      }
+
+      for (int f = 0; f < blockLength; ++f){
+        const int featureIndex = featureIndices.empty() ? blockStart + f : featureIndices[blockStart + f];
+        // Compute the loss for each output
+        for (int outputIndex = 0; outputIndex < m_numberOfOutputs; ++outputIndex){
+          double sum = 0.;
+          for (int bin = 0; bin < m_maximumFeatureValue; ++bin){
+            sum += std::abs(histograms(f, bin, outputIndex));
+          }
+          lossSum(outputIndex) = -sum;
+        }
 
-  // Select the most discriminative index (or indices) for classification which minimizes the loss
-  //  and compute the sum of gradient for that index
-  if (m_selectionType == independent){
-    // independent feature selection is used if all the dimension of output use different feature
-    // each of the selected feature minimize a dimension of the loss function
-    for (int outputIndex = m_numberOfOutputs; outputIndex--;){
-      _selectedIndices(outputIndex) = bestIndex(_lossSum(blitz::Range::all(),outputIndex));
+        // Select the most discriminative index (or indices) for classification which minimizes the loss
+        if (m_selectionType == independent){
+          // independent feature selection is used if all the dimension of output use different feature
+          // each of the selected feature minimize a dimension of the loss function
+          for (int outputIndex = 0; outputIndex < m_numberOfOutputs; ++outputIndex){
+            if (lossSum(outputIndex) < candidate.loss(outputIndex)){
+              candidate.loss(outputIndex) = lossSum(outputIndex);
+              candidate.index(outputIndex) = featureIndex;
+              for (int bin = 0; bin < m_maximumFeatureValue; ++bin){
+                candidate.histogram(bin, outputIndex) = histograms(f, bin, outputIndex);
+              }
+            }
+          }
+        } else {
+          // for 'shared' feature selection the loss function is summed over multiple dimensions and
+          // the feature that minimized this cumulative loss is used for all the outputs
+          double sum = 0.;
+          for (int outputIndex = 0; outputIndex < m_numberOfOutputs; ++outputIndex){
+            sum += lossSum(outputIndex);
+          }
+          if (sum < candidate.loss(0)){
+            candidate.loss(0) = sum;
+            for (int outputIndex = 0; outputIndex < m_numberOfOutputs; ++outputIndex){
+              candidate.index(outputIndex) = featureIndex;
+              for (int bin = 0; bin < m_maximumFeatureValue; ++bin){
+                candidate.histogram(bin, outputIndex) = histograms(f, bin, outputIndex);
+              }
+            }
+          }
+        }
+      }
+    }
+  });
+
+  // Combine the results of the threads in the order of the feature ranges,
+  // so that the first of several equally good features is selected -- independent of the number of threads
+  const int lossCount = m_selectionType == independent ? m_numberOfOutputs : 1;
+  Candidate best(m_maximumFeatureValue, m_numberOfOutputs);
+  for (auto it = candidates.begin(); it != candidates.end(); ++it){
+    const Candidate& candidate = **it;
+    for (int outputIndex = 0; outputIndex < lossCount; ++outputIndex){
+      if (candidate.loss(outputIndex) < best.loss(outputIndex)){
+        best.loss(outputIndex) = candidate.loss(outputIndex);
+        if (m_selectionType == independent){
+          best.index(outputIndex) = candidate.index(outputIndex);
+          best.histogram(blitz::Range::all(), outputIndex) = candidate.histogram(blitz::Range::all(), outputIndex);
+        } else {
+          best.index = candidate.index;
+          best.histogram = candidate.histogram;
+        }
+      }
     }
-  } else {
-    // for 'shared' feature selection the loss function is summed over multiple dimensions and
-    // the feature that minimized this cumulative loss is used for all the outputs
-    blitz::secondIndex j;
-    const blitz::Array<double,1> sum(blitz::sum(_lossSum, j));
-    _selectedIndices = bestIndex(sum);
   }
 
-  // compute the look-up-tables for the best index
+  // compute the look-up-tables for the best index from the stored histograms
+  blitz::Array<double,2> luts(m_maximumFeatureValue, m_numberOfOutputs);
   for (int outputIndex = m_numberOfOutputs; outputIndex--;){
-    int selectedIndex = _selectedIndices(outputIndex);
-    weightedHistogram(trainingFeatures(blitz::Range::all(), selectedIndex), lossGradient(blitz::Range::all(), outputIndex));
-
     for (int lutIndex = m_maximumFeatureValue; lutIndex--;){
-      _luts(lutIndex, outputIndex) = (_gradientHistogram(lutIndex) > 0) * 2. - 1.;
+      luts(lutIndex, outputIndex) = (best.histogram(lutIndex, outputIndex) > 0) * 2. - 1.;
     }
   }
 
   // create new weak machine
-  return boost::shared_ptr<LUTMachine>(new LUTMachine(_luts.copy(), _selectedIndices.copy()));
+  return boost::shared_ptr<LUTMachine>(new LUTMachine(luts, best.index));
+}
+
+boost::shared_ptr<bob::learn::boosting::LUTMachine> bob::learn::boosting::LUTTrainer::train(const blitz::Array<uint8_t,2>& trainingFeatures, const blitz::Array<double,2>& lossGradient) const{
+  return _train(trainingFeatures, lossGradient, 0);
+}
 
+boost::shared_ptr<bob::learn::boosting::LUTMachine> bob::learn::boosting::LUTTrainer::train(const blitz::Array<uint8_t,2>& trainingFeatures, const blitz::Array<double,2>& lossGradient, const blitz::Array<int32_t,1>& sampleIndices) const{
+  return _train(trainingFeatures, lossGradient, &sampleIndices);
 }
 
+boost::shared_ptr<bob::learn::boosting::LUTMachine> bob::learn::boosting::LUTTrainer::train(const blitz::Array<uint16_t,2>& trainingFeatures, const blitz::Array<double,2>& lossGradient) const{
+  return _train(trainingFeatures, lossGradient, 0);
+}
 
+boost::shared_ptr<bob::learn::boosting::LUTMachine> bob::learn::boosting::LUTTrainer::train(const blitz::Array<uint16_t,2>& trainingFeatures, const blitz::Array<double,2>& lossGradient, const blitz::Array<int32_t,1>& sampleIndices) const{
+  return _train(trainingFeatures, lossGradient, &sampleIndices);
+}
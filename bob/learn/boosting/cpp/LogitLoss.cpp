@@ -0,0 +1,24 @@
+#include <bob.learn.boosting/LogitLoss.h>
+#include <math.h>
+
+void bob::learn::boosting::LogitLoss::sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors) const{
+  for (int j = 0; j < targets.extent(0); ++j){
+    errors(j) = log(1. + exp(-(targets(j) * scores(j))));
+  }
+}
+
+void bob::learn::boosting::LogitLoss::sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& gradient) const{
+  for (int j = 0; j < targets.extent(0); ++j){
+    const double e = exp(-(targets(j) * scores(j)));
+    gradient(j) = -targets(j) * e * (1. / (1. + e));
+  }
+}
+
+void bob::learn::boosting::LogitLoss::sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const{
+  // the transcendental functions are evaluated only once for the loss and the gradient
+  for (int j = 0; j < targets.extent(0); ++j){
+    const double e = exp(-(targets(j) * scores(j)));
+    errors(j) = log(1. + e);
+    gradient(j) = -targets(j) * e * (1. / (1. + e));
+  }
+}
@@ -1,44 +1,184 @@
 #include <bob.learn.boosting/LossFunction.h>
-#include <math.h>
+#include <bob.learn.boosting/Parallel.h>
+
+// Note: all functions process consecutive ranges of samples in several threads.
+// The threads use element access to the given arrays only (blitz reference counting is not thread-safe);
+// the targets and scores of a single sample are copied into small arrays that are owned by the thread.
+// The partial sums of the threads are combined in ascending order, so that the results do not depend on the scheduling of the threads.
+// The sample scales are computed (or taken from a cache) in the calling thread, before the threads are started.
+
+static inline double sampleScale(const boost::shared_ptr<const blitz::Array<double,1> >& scales, int sample){
+  return scales ? (*scales)(sample) : 1.;
+}
+
+static inline int numberOfBlocks(int numberOfSamples, int numberOfThreads){
+  // the same number of blocks that parallel_for uses
+  return std::max(1, std::min(numberOfThreads, numberOfSamples));
+}
 
 void bob::learn::boosting::LossFunction::lossSum(const blitz::Array<double,1>& alpha, const blitz::Array<double,2>& targets, const blitz::Array<double,2>& previous_scores, const blitz::Array<double,2>& current_scores, blitz::Array<double,1>& loss_sum) const{
-  // compute the scores and loss for the current alpha
-  scores.resize(targets.shape());
-  // TODO: is there any faster way for this?
-  for (int i = scores.extent(0); i--;){
-    for (int j = scores.extent(1); j--;){
-      scores(i,j) = previous_scores(i,j) + alpha(j) * current_scores(i,j);
+  const auto scales = sampleScales(targets);
+  const int numberOfOutputs = targets.extent(1), numberOfLosses = numberOfLossValues(numberOfOutputs);
+  blitz::Array<double,2> partialSums(numberOfBlocks(targets.extent(0), m_numberOfThreads), numberOfLosses);
+  partialSums = 0.;
+
+  parallel_for(targets.extent(0), m_numberOfThreads, [&](int thread, int first, int last){
+    blitz::Array<double,1> target(numberOfOutputs), score(numberOfOutputs), errors(numberOfLosses);
+    for (int i = first; i < last; ++i){
+      // compute the scores for the current alpha
+      for (int j = 0; j < numberOfOutputs; ++j){
+        target(j) = targets(i,j);
+        score(j) = previous_scores(i,j) + alpha(j) * current_scores(i,j);
+      }
+      sampleLoss(target, score, sampleScale(scales, i), errors);
+      // accumulate the loss
+      for (int k = 0; k < numberOfLosses; ++k){
+        partialSums(thread, k) += errors(k);
+      }
     }
-  }
-  errors.resize(targets.extent(0), 1);
-  loss(targets, scores, errors);
+  });
 
-  // compute the sum of the loss
-  blitz::firstIndex i;
-  blitz::secondIndex j;
-  loss_sum = blitz::sum(errors(j,i), j);
+  loss_sum = 0.;
+  for (int t = 0; t < partialSums.extent(0); ++t){
+    for (int k = 0; k < numberOfLosses; ++k){
+      loss_sum(k) += partialSums(t, k);
+    }
+  }
 }
 
 
 void bob::learn::boosting::LossFunction::gradientSum(const blitz::Array<double,1>& alpha, const blitz::Array<double,2>& targets, const blitz::Array<double,2>& previous_scores, const blitz::Array<double,2>& current_scores, blitz::Array<double,1>& gradient_sum) const{
-  // compute the scores and gradient for the current alpha
-  scores.resize(targets.shape());
-  // TODO: is there any faster way for this?
-  for (int i = scores.extent(0); i--;){
-    for (int j = scores.extent(1); j--;){
-      scores(i,j) = previous_scores(i,j) + alpha(j) * current_scores(i,j);
+  const auto scales = sampleScales(targets);
+  const int numberOfOutputs = targets.extent(1);
+  blitz::Array<double,2> partialSums(numberOfBlocks(targets.extent(0), m_numberOfThreads), numberOfOutputs);
+  partialSums = 0.;
+
+  parallel_for(targets.extent(0), m_numberOfThreads, [&](int thread, int first, int last){
+    blitz::Array<double,1> target(numberOfOutputs), score(numberOfOutputs), gradient(numberOfOutputs);
+    for (int i = first; i < last; ++i){
+      // compute the scores for the current alpha
+      for (int j = 0; j < numberOfOutputs; ++j){
+        target(j) = targets(i,j);
+        score(j) = previous_scores(i,j) + alpha(j) * current_scores(i,j);
+      }
+      sampleLossGradient(target, score, sampleScale(scales, i), gradient);
+      // accumulate the loss gradient with respect to alpha
+      for (int j = 0; j < numberOfOutputs; ++j){
+        partialSums(thread, j) += gradient(j) * current_scores(i,j);
+      }
+    }
+  });
+
+  gradient_sum = 0.;
+  for (int t = 0; t < partialSums.extent(0); ++t){
+    for (int j = 0; j < numberOfOutputs; ++j){
+      gradient_sum(j) += partialSums(t, j);
+    }
+  }
+}
+
+
+void bob::learn::boosting::LossFunction::lossAndGradientSum(const blitz::Array<double,1>& alpha, const blitz::Array<double,2>& targets, const blitz::Array<double,2>& previous_scores, const blitz::Array<double,2>& current_scores, blitz::Array<double,1>& loss_sum, blitz::Array<double,1>& gradient_sum) const{
+  const auto scales = sampleScales(targets);
+  const int numberOfOutputs = targets.extent(1), numberOfLosses = numberOfLossValues(numberOfOutputs);
+  const int blocks = numberOfBlocks(targets.extent(0), m_numberOfThreads);
+  blitz::Array<double,2> partialLossSums(blocks, numberOfLosses), partialGradientSums(blocks, numberOfOutputs);
+  partialLossSums = 0.;
+  partialGradientSums = 0.;
+
+  parallel_for(targets.extent(0), m_numberOfThreads, [&](int thread, int first, int last){
+    blitz::Array<double,1> target(numberOfOutputs), score(numberOfOutputs), errors(numberOfLosses), gradient(numberOfOutputs);
+    for (int i = first; i < last; ++i){
+      // compute the scores for the current alpha only once
+      for (int j = 0; j < numberOfOutputs; ++j){
+        target(j) = targets(i,j);
+        score(j) = previous_scores(i,j) + alpha(j) * current_scores(i,j);
+      }
+      sampleLossAndGradient(target, score, sampleScale(scales, i), errors, gradient);
+      // accumulate the loss and the loss gradient, as in lossSum() and gradientSum()
+      for (int k = 0; k < numberOfLosses; ++k){
+        partialLossSums(thread, k) += errors(k);
+      }
+      for (int j = 0; j < numberOfOutputs; ++j){
+        partialGradientSums(thread, j) += gradient(j) * current_scores(i,j);
+      }
+    }
+  });
+
+  loss_sum = 0.;
+  gradient_sum = 0.;
+  for (int t = 0; t < blocks; ++t){
+    for (int k = 0; k < numberOfLosses; ++k){
+      loss_sum(k) += partialLossSums(t, k);
+    }
+    for (int j = 0; j < numberOfOutputs; ++j){
+      gradient_sum(j) += partialGradientSums(t, j);
     }
   }
-//  scores = previous_scores + alpha * current_scores;
+}
+
+
+void bob::learn::boosting::LossFunction::loss(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& errors) const{
+  const auto scales = sampleScales(targets);
+  const int numberOfOutputs = targets.extent(1), numberOfLosses = numberOfLossValues(numberOfOutputs);
+  parallel_for(targets.extent(0), m_numberOfThreads, [&](int, int first, int last){
+    blitz::Array<double,1> target(numberOfOutputs), score(numberOfOutputs), error(numberOfLosses);
+    for (int i = first; i < last; ++i){
+      for (int j = 0; j < numberOfOutputs; ++j){
+        target(j) = targets(i,j);
+        score(j) = scores(i,j);
+      }
+      sampleLoss(target, score, sampleScale(scales, i), error);
+      for (int k = 0; k < numberOfLosses; ++k){
+        errors(i,k) = error(k);
+      }
+    }
+  });
+}
+
+
+void bob::learn::boosting::LossFunction::lossGradient(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& gradient) const{
+  const auto scales = sampleScales(targets);
+  const int numberOfOutputs = targets.extent(1);
+  parallel_for(targets.extent(0), m_numberOfThreads, [&](int, int first, int last){
+    blitz::Array<double,1> target(numberOfOutputs), score(numberOfOutputs), grad(numberOfOutputs);
+    for (int i = first; i < last; ++i){
+      for (int j = 0; j < numberOfOutputs; ++j){
+        target(j) = targets(i,j);
+        score(j) = scores(i,j);
+      }
+      sampleLossGradient(target, score, sampleScale(scales, i), grad);
+      for (int j = 0; j < numberOfOutputs; ++j){
+        gradient(i,j) = grad(j);
+      }
+    }
+  });
+}
 
-  gradients.resize(targets.shape());
-  lossGradient(targets, scores, gradients);
 
-  // take the sum of the loss gradient values
-  const blitz::Array<double, 2> grad(gradients * current_scores);
-  blitz::firstIndex i;
-  blitz::secondIndex j;
-  gradient_sum = blitz::sum(grad(j,i), j);
+void bob::learn::boosting::LossFunction::lossAndGradient(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& errors, blitz::Array<double, 2>& gradient) const{
+  const auto scales = sampleScales(targets);
+  const int numberOfOutputs = targets.extent(1), numberOfLosses = numberOfLossValues(numberOfOutputs);
+  parallel_for(targets.extent(0), m_numberOfThreads, [&](int, int first, int last){
+    blitz::Array<double,1> target(numberOfOutputs), score(numberOfOutputs), error(numberOfLosses), grad(numberOfOutputs);
+    for (int i = first; i < last; ++i){
+      for (int j = 0; j < numberOfOutputs; ++j){
+        target(j) = targets(i,j);
+        score(j) = scores(i,j);
+      }
+      sampleLossAndGradient(target, score, sampleScale(scales, i), error, grad);
+      for (int k = 0; k < numberOfLosses; ++k){
+        errors(i,k) = error(k);
+      }
+      for (int j = 0; j < numberOfOutputs; ++j){
+        gradient(i,j) = grad(j);
+      }
+    }
+  });
 }
 
 
+void bob::learn::boosting::LossFunction::sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const{
+  sampleLoss(targets, scores, scale, errors);
+  sampleLossGradient(targets, scores, scale, gradient);
+}
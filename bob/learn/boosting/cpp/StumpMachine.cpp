@@ -39,6 +39,23 @@ void bob::learn::boosting::StumpMachine::forward(const blitz::Array<double, 2>&
 }
 
 
+double bob::learn::boosting::StumpMachine::forward(const blitz::Array<float, 1>& features) const{
+  return _predict(features((int)m_index));
+}
+
+void bob::learn::boosting::StumpMachine::forward(const blitz::Array<float, 2>& features, blitz::Array<double,1> predictions) const{
+  for (int i = features.extent(0); i--;){
+    predictions(i) = _predict(features(i, (int)m_index));
+  }
+}
+
+void bob::learn::boosting::StumpMachine::forward(const blitz::Array<float, 2>& features, blitz::Array<double,2> predictions) const{
+  for (int i = features.extent(0); i--;){
+    predictions(i,0) = _predict(features(i, (int)m_index));
+  }
+}
+
+
 double bob::learn::boosting::StumpMachine::forward(const blitz::Array<uint16_t, 1>& features) const{
   return _predict(features((int)m_index));
 }
@@ -56,6 +73,23 @@ void bob::learn::boosting::StumpMachine::forward(const blitz::Array<uint16_t, 2>
 }
 
 
+double bob::learn::boosting::StumpMachine::forward(const blitz::Array<uint8_t, 1>& features) const{
+  return _predict(features((int)m_index));
+}
+
+void bob::learn::boosting::StumpMachine::forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,1> predictions) const{
+  for (int i = features.extent(0); i--;){
+    predictions(i) = _predict(features(i, (int)m_index));
+  }
+}
+
+void bob::learn::boosting::StumpMachine::forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,2> predictions) const{
+  for (int i = features.extent(0); i--;){
+    predictions(i,0) = _predict(features(i, (int)m_index));
+  }
+}
+
+
 blitz::Array<int32_t,1> bob::learn::boosting::StumpMachine::getIndices() const{
   blitz::Array<int32_t, 1> ret(1);
   ret = m_index;
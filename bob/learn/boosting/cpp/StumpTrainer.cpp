@@ -0,0 +1,197 @@
+#include <bob.learn.boosting/StumpTrainer.h>
+#include <bob.learn.boosting/Parallel.h>
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
+#include <vector>
+
+bob::learn::boosting::StumpTrainer::StumpTrainer(int numberOfThreads) :
+  m_numberOfThreads(numberOfThreads)
+{
+}
+
+// Computes polarity, threshold and gain of the best split for the sorted values of a single feature and the accordingly sorted negative loss gradient.
+// The cumulative sum of the gradient is computed in-place.
+// Thresholds can only be placed between two different feature values; if all values are identical, we gain nothing.
+static void bestSplit(const double* values, double* gradient, int size, double& polarity, double& threshold, double& gain){
+  polarity = 1.;
+  threshold = 0.;
+  gain = 0.;
+  if (size < 2) return;
+
+  // For all the thresholds compute the dot product, i.e., the sum of the gradients of the samples above the threshold
+  for (int k = 1; k < size; ++k){
+    gradient[k] += gradient[k-1];
+  }
+  const double sum = gradient[size-1];
+
+  // Find the index that maximizes the gain
+  double bestGain = -1.;
+  int bestIndex = -1;
+  for (int k = 0; k < size - 1; ++k){
+    if (values[k] != values[k+1]){
+      const double currentGain = std::abs(sum - gradient[k]);
+      if (currentGain > bestGain){
+        bestGain = currentGain;
+        bestIndex = k;
+      }
+    }
+  }
+  if (bestIndex < 0) return;
+
+  // Find the corresponding threshold value and the polarity
+  threshold = (values[bestIndex] + values[bestIndex+1]) * 0.5;
+  polarity = sum - gradient[bestIndex] > 0. ? -1. : 1.;
+  gain = bestGain;
+}
+
+template <typename T>
+void bob::learn::boosting::StumpTrainer::_prepare(const blitz::Array<T, 2>& trainingFeatures){
+  const int numberOfSamples = trainingFeatures.extent(0), numberOfFeatures = trainingFeatures.extent(1);
+  boost::mutex::scoped_lock lock(m_mutex);
+  m_sortIndices.resize(numberOfFeatures, numberOfSamples);
+  m_distinctValues.assign(numberOfFeatures, std::vector<double>());
+  m_valueEnds.assign(numberOfFeatures, std::vector<int32_t>());
+
+  // compute a stable sort order of each feature, in parallel over the features
+  // (each thread writes the distinct values of its own features only)
+  parallel_for(numberOfFeatures, m_numberOfThreads, [&](int, int first, int last){
+    std::vector<double> values(numberOfSamples);
+    std::vector<int32_t> indices(numberOfSamples);
+    for (int f = first; f < last; ++f){
+      for (int i = 0; i < numberOfSamples; ++i){
+        values[i] = trainingFeatures(i, f);
+        indices[i] = i;
+      }
+      std::stable_sort(indices.begin(), indices.end(), [&](int32_t a, int32_t b){return values[a] < values[b];});
+      std::vector<double>& distinctValues = m_distinctValues[f];
+      std::vector<int32_t>& valueEnds = m_valueEnds[f];
+      for (int k = 0; k < numberOfSamples; ++k){
+        m_sortIndices(f, k) = indices[k];
+        const double value = values[indices[k]];
+        if (distinctValues.empty() || value != distinctValues.back()){
+          distinctValues.push_back(value);
+          valueEnds.push_back(k+1);
+        } else {
+          valueEnds.back() = k+1;
+        }
+      }
+      // release the memory that was reserved for more distinct values
+      std::vector<double>(distinctValues).swap(distinctValues);
+      std::vector<int32_t>(valueEnds).swap(valueEnds);
+    }
+  });
+}
+
+void bob::learn::boosting::StumpTrainer::prepare(const blitz::Array<uint8_t, 2>& trainingFeatures){
+  _prepare(trainingFeatures);
+}
+
+void bob::learn::boosting::StumpTrainer::prepare(const blitz::Array<uint16_t, 2>& trainingFeatures){
+  _prepare(trainingFeatures);
+}
+
+void bob::learn::boosting::StumpTrainer::prepare(const blitz::Array<double, 2>& trainingFeatures){
+  _prepare(trainingFeatures);
+}
+
+// The best stump found by one thread
+struct Stump{
+  Stump() : gain(-1.), threshold(0.), polarity(1.), index(-1) {}
+  double gain, threshold, polarity;
+  int index;
+};
+
+boost::shared_ptr<bob::learn::boosting::StumpMachine> bob::learn::boosting::StumpTrainer::train(const blitz::Array<double, 1>& lossGradient) const{
+  return _train(lossGradient, 0);
+}
+
+boost::shared_ptr<bob::learn::boosting::StumpMachine> bob::learn::boosting::StumpTrainer::train(const blitz::Array<double, 1>& lossGradient, const blitz::Array<int32_t, 1>& sampleIndices) const{
+  return _train(lossGradient, &sampleIndices);
+}
+
+boost::shared_ptr<bob::learn::boosting::StumpMachine> bob::learn::boosting::StumpTrainer::_train(const blitz::Array<double, 1>& lossGradient, const blitz::Array<int32_t, 1>* sampleIndices) const{
+  boost::mutex::scoped_lock lock(m_mutex);
+  const int numberOfSamples = m_sortIndices.extent(1), numberOfFeatures = m_sortIndices.extent(0);
+  if (!numberOfFeatures){
+    throw std::runtime_error("StumpTrainer: please call prepare() with the training features before calling train()");
+  }
+  if (lossGradient.extent(0) != numberOfSamples){
+    throw std::runtime_error("StumpTrainer: the number of samples of the loss gradient and of the prepared training features differ");
+  }
+
+  // mark the selected samples, so that the sorted features can be filtered without sorting them again
+  std::vector<char> selected;
+  if (sampleIndices){
+    selected.resize(numberOfSamples, 0);
+    for (int k = 0; k < sampleIndices->extent(0); ++k){
+      const int32_t index = (*sampleIndices)(k);
+      if (index < 0 || index >= numberOfSamples){
+        throw std::runtime_error("StumpTrainer: the sample indices must be in the range of the prepared training samples");
+      }
+      selected[index] = 1;
+    }
+  }
+
+  // For each feature find the optimum threshold, polarity and the gain
+  // The features are split into consecutive ranges, one for each thread; each thread keeps the best stump of its range
+  std::vector<Stump> stumps(m_numberOfThreads);
+  parallel_for(numberOfFeatures, m_numberOfThreads, [&](int thread, int first, int last){
+    std::vector<double> gradient(numberOfSamples), values(numberOfSamples);
+    Stump& best = stumps[thread];
+    for (int f = first; f < last; ++f){
+      // gather the sorted values and the negative loss gradient in the sort order of the feature, using the selected samples only (if given)
+      const std::vector<double>& distinctValues = m_distinctValues[f];
+      const std::vector<int32_t>& valueEnds = m_valueEnds[f];
+      int size = 0, valueIndex = 0;
+      for (int k = 0; k < numberOfSamples; ++k){
+        while (k >= valueEnds[valueIndex]) ++valueIndex;
+        const int32_t index = m_sortIndices(f, k);
+        if (!sampleIndices || selected[index]){
+          values[size] = distinctValues[valueIndex];
+          gradient[size++] = -lossGradient(index);
+        }
+      }
+      double polarity, threshold, gain;
+      bestSplit(values.data(), gradient.data(), size, polarity, threshold, gain);
+      if (gain > best.gain){
+        best.gain = gain;
+        best.threshold = threshold;
+        best.polarity = polarity;
+        best.index = f;
+      }
+    }
+  });
+
+  // Find the optimum id, taking the first of several equally good features -- independent of the number of threads
+  Stump best;
+  for (auto it = stumps.begin(); it != stumps.end(); ++it){
+    if (it->gain > best.gain){
+      best = *it;
+    }
+  }
+
+  return boost::shared_ptr<StumpMachine>(new StumpMachine(best.threshold, best.polarity, best.index));
+}
+
+void bob::learn::boosting::StumpTrainer::computeThreshold(const blitz::Array<double, 1>& features, const blitz::Array<double, 1>& gradient, double& polarity, double& threshold, double& gain) const{
+  const int numberOfSamples = features.extent(0);
+  if (gradient.extent(0) != numberOfSamples){
+    throw std::runtime_error("StumpTrainer: the number of samples of the features and the gradient differ");
+  }
+
+  // Sort the feature and rearrange the corresponding weights and feature values
+  std::vector<int32_t> indices(numberOfSamples);
+  for (int i = 0; i < numberOfSamples; ++i){
+    indices[i] = i;
+  }
+  std::stable_sort(indices.begin(), indices.end(), [&](int32_t a, int32_t b){return features(a) < features(b);});
+
+  std::vector<double> sortedFeatures(numberOfSamples), sortedGradient(numberOfSamples);
+  for (int k = 0; k < numberOfSamples; ++k){
+    sortedFeatures[k] = features(indices[k]);
+    sortedGradient[k] = gradient(indices[k]);
+  }
+
+  bestSplit(sortedFeatures.data(), sortedGradient.data(), numberOfSamples, polarity, threshold, gain);
+}
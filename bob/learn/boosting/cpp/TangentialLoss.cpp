@@ -0,0 +1,26 @@
+#include <bob.learn.boosting/TangentialLoss.h>
+#include <math.h>
+
+void bob::learn::boosting::TangentialLoss::sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors) const{
+  for (int j = 0; j < targets.extent(0); ++j){
+    const double a = 2. * atan(targets(j) * scores(j)) - 1.;
+    errors(j) = a * a;
+  }
+}
+
+void bob::learn::boosting::TangentialLoss::sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& gradient) const{
+  for (int j = 0; j < targets.extent(0); ++j){
+    const double m = targets(j) * scores(j);
+    gradient(j) = targets(j) * (4. * (2. * atan(m) - 1.)) / (1. + m * m);
+  }
+}
+
+void bob::learn::boosting::TangentialLoss::sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const{
+  // the transcendental functions are evaluated only once for the loss and the gradient
+  for (int j = 0; j < targets.extent(0); ++j){
+    const double m = targets(j) * scores(j);
+    const double a = 2. * atan(m) - 1.;
+    errors(j) = a * a;
+    gradient(j) = targets(j) * (4. * a) / (1. + m * m);
+  }
+}
@@ -74,7 +74,7 @@ def command_line_arguments(command_line_options):
 def align(input, output, digits, multi_variate = False):
   if multi_variate:
     # just one classifier, with multi-variate output
-    input = numpy.vstack(input).astype(numpy.uint16)
+    input = numpy.vstack(input)
     # create output data
     target = - numpy.ones((input.shape[0], len(output)))
     output = numpy.hstack(output)
@@ -88,7 +88,7 @@ def align(input, output, digits, multi_variate = False):
     for i, d1 in enumerate(digits):
       for j, d2 in enumerate(digits[i+1:]):
         key = "%d-vs-%d" % (d1, d2)
-        cur_input = numpy.vstack([input[i], input[j+1]]).astype(numpy.uint16)
+        cur_input = numpy.vstack([input[i], input[j+1]])
         target = numpy.ones((cur_input.shape[0]))
         target[output[i].shape[0]:target.shape[0]] = -1
         problems[key] = (cur_input, target)
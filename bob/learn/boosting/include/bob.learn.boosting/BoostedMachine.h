@@ -5,8 +5,25 @@
 
 #include <bob.learn.boosting/WeakMachine.h>
 
+#include <limits>
+#include <set>
+
 namespace bob { namespace learn { namespace boosting {
 
+  /**
+   * The strong machine, which is a weighted combination of weak machines.
+   *
+   * All forward functions are thread-safe, i.e., a single machine can be used by several threads at the same time.
+   * The machine must not be modified (e.g., by add_weak_machine(), setRejectionThresholds() or load()) while it is used by another thread,
+   * since this re-allocates the weak machines, weights and look-up tables that are read by the forward functions.
+   *
+   * When all weak machines are LUT machines, the machine is compiled automatically into a single flat look-up table,
+   * in which the weights are already multiplied into the LUT entries.
+   * Then, the predictions are computed with a single gather-and-add loop per sample, without calling the weak machines.
+   *
+   * The features can be of type uint8, uint16, float or double, where the arrays are not copied or converted.
+   * Floating point features are only supported by weak machines that implement them, e.g., the StumpMachine.
+   */
   class BoostedMachine{
     public:
       BoostedMachine();
@@ -18,22 +35,80 @@ namespace bob { namespace learn { namespace boosting {
       void add_weak_machine(const boost::shared_ptr<WeakMachine> weak_machine, const blitz::Array<double,1> weights);
 
       // predicts the output for the given single feature
+      double forward(const blitz::Array<uint8_t, 1>& features) const;
       double forward(const blitz::Array<uint16_t, 1>& features) const;
+      double forward(const blitz::Array<float, 1>& features) const;
+      double forward(const blitz::Array<double, 1>& features) const;
 
       // predicts the output for the given single feature (multi-variate case)
+      void forward(const blitz::Array<uint8_t, 1>& features, blitz::Array<double,1> predictions) const;
       void forward(const blitz::Array<uint16_t, 1>& features, blitz::Array<double,1> predictions) const;
+      void forward(const blitz::Array<float, 1>& features, blitz::Array<double,1> predictions) const;
+      void forward(const blitz::Array<double, 1>& features, blitz::Array<double,1> predictions) const;
 
       // predicts the output for multiple features (uni-variate case)
-      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,1> predictions) const;
+      // the samples are processed in cache-sized blocks, which are distributed to the given number of threads
+      void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,1> predictions, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,1> predictions, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<float, 2>& features, blitz::Array<double,1> predictions, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<double, 2>& features, blitz::Array<double,1> predictions, int numberOfThreads = 1) const;
 
       // predicts the output for multiple features (multi-variate case)
-      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,2> predictions) const;
+      void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<float, 2>& features, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<double, 2>& features, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
 
       // predicts the output and the labels for the given features (uni-variate case)
-      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels) const;
+      void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<float, 2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<double, 2>& features, blitz::Array<double,1> predictions, blitz::Array<double,1> labels, int numberOfThreads = 1) const;
 
       // predicts the output and the labels for the given features (multi-variate case)
-      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels) const;
+      void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<float, 2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads = 1) const;
+      void forward(const blitz::Array<double, 2>& features, blitz::Array<double,2> predictions, blitz::Array<double,2> labels, int numberOfThreads = 1) const;
+
+      // computes the predictions of the first rounds(r) weak machines for each of the given (ascending) round counts in a single pass;
+      // the weak machines are accumulated in the order in which they were added (uni-variate case: predictions(sample, r))
+      void stagedForward(const blitz::Array<uint8_t, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
+      void stagedForward(const blitz::Array<uint16_t, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
+      void stagedForward(const blitz::Array<float, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
+      void stagedForward(const blitz::Array<double, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2> predictions, int numberOfThreads = 1) const;
+
+      // computes the staged predictions for the multi-variate case: predictions(sample, r, output)
+      void stagedForward(const blitz::Array<uint8_t, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads = 1) const;
+      void stagedForward(const blitz::Array<uint16_t, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads = 1) const;
+      void stagedForward(const blitz::Array<float, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads = 1) const;
+      void stagedForward(const blitz::Array<double, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3> predictions, int numberOfThreads = 1) const;
+
+      // returns a new machine that contains the first numberOfMachines weak machines of this machine;
+      // the weak machines are shared between both machines
+      boost::shared_ptr<BoostedMachine> truncate(int numberOfMachines) const;
+
+      // sets the rejection thresholds of the soft cascade, one for each weak machine (uni-variate case only);
+      // an empty array removes the rejection thresholds
+      void setRejectionThresholds(const blitz::Array<double,1>& thresholds);
+
+      // returns the rejection thresholds of the soft cascade, which might be empty
+      const blitz::Array<double,1> getRejectionThresholds() const {return m_rejectionThresholds;}
+
+      // predicts the output for the given single feature with a soft cascade:
+      // the weak machines are evaluated in the order in which they were added, and the evaluation stops,
+      // when the partial sum drops below the rejection threshold of the current weak machine;
+      // the index of this weak machine is returned as the exit stage, or the number of weak machines if the sample was not rejected
+      double forwardWithRejection(const blitz::Array<uint8_t, 1>& features, int& exitStage) const;
+      double forwardWithRejection(const blitz::Array<uint16_t, 1>& features, int& exitStage) const;
+      double forwardWithRejection(const blitz::Array<float, 1>& features, int& exitStage) const;
+      double forwardWithRejection(const blitz::Array<double, 1>& features, int& exitStage) const;
+
+      // predicts the output and the exit stages of multiple features with a soft cascade
+      void forwardWithRejection(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads = 1) const;
+      void forwardWithRejection(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads = 1) const;
+      void forwardWithRejection(const blitz::Array<float, 2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads = 1) const;
+      void forwardWithRejection(const blitz::Array<double, 2>& features, blitz::Array<double,1> predictions, blitz::Array<int32_t,1> exitStages, int numberOfThreads = 1) const;
 
       // the number of outputs of the machine (multi-variate); 1 for the uni-variate case
       int numberOfOutputs() const {return m_weights.extent(1);}
@@ -47,6 +122,9 @@ namespace bob { namespace learn { namespace boosting {
       // returns the weak machines
       const std::vector<boost::shared_ptr<WeakMachine> >& getWeakMachines() const {return m_weak_machines;}
 
+      // returns whether the machine is compiled into a flat look-up table, i.e., whether all weak machines are LUT machines
+      bool isCompiled() const {return m_compiled;}
+
       // writes the machine to file
       void save(bob::io::base::HDF5File& file) const;
 
@@ -55,6 +133,45 @@ namespace bob { namespace learn { namespace boosting {
 
 
     private:
+      // the implementations of the public functions above for all feature types
+      template <typename T> double _forward(const blitz::Array<T, 1>& features) const;
+      template <typename T> void _forward(const blitz::Array<T, 1>& features, blitz::Array<double,1>& predictions) const;
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,1>& predictions, int numberOfThreads) const;
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,2>& predictions, int numberOfThreads) const;
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,1>& predictions, blitz::Array<double,1>& labels, int numberOfThreads) const;
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,2>& predictions, blitz::Array<double,2>& labels, int numberOfThreads) const;
+      template <typename T> void _stagedForward(const blitz::Array<T, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2>& predictions, int numberOfThreads) const;
+      template <typename T> void _stagedForward(const blitz::Array<T, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3>& predictions, int numberOfThreads) const;
+      template <typename T> double _forwardWithRejection(const blitz::Array<T, 1>& features, int& exitStage) const;
+      template <typename T> void _forwardWithRejection(const blitz::Array<T, 2>& features, blitz::Array<double,1>& predictions, blitz::Array<int32_t,1>& exitStages, int numberOfThreads) const;
+
+      // predicts the output for a block of samples; only element access is used for the given arrays
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,1>& predictions) const;
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,2>& predictions) const;
+
+      // computes the staged predictions for a block of samples
+      template <typename T> void _stagedForward(const blitz::Array<T, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,2>& predictions) const;
+      template <typename T> void _stagedForward(const blitz::Array<T, 2>& features, const blitz::Array<int32_t,1>& rounds, blitz::Array<double,3>& predictions) const;
+      // the flat look-up table can only be used for integral features
+      template <typename T> bool _isCompiled() const {return m_compiled && std::numeric_limits<T>::is_integer;}
+
+      // checks that the given round counts are valid
+      void _checkRounds(const blitz::Array<int32_t,1>& rounds) const;
+
+      // the number of samples that are processed together by all weak machines
+      template <typename T> int _blockSize(const blitz::Array<T, 2>& features) const;
+
+      // adds a rejection threshold for the last weak machine, if rejection thresholds are set
+      void _extendRejectionThresholds();
+
+      // adds the feature indices of the given weak machine to the indices used by this machine
+      void _addUsedIndices(const WeakMachine& weak_machine);
+
+      // (re-)compiles the flat look-up table and collects the used feature indices of all weak machines
+      void _compile();
+      // adds the given weak machine to the flat look-up table; returns false if this machine cannot be compiled
+      bool _compile(int machineIndex);
+
       // The weak machines
       std::vector<boost::shared_ptr<WeakMachine> > m_weak_machines;
       // the (multi-variate) weights of the machines
@@ -62,9 +179,19 @@ namespace bob { namespace learn { namespace boosting {
       // a shortcut to speed up uni-variate access
       blitz::Array<double,1> _weights;
 
-      // shortcut to avoid allocating memory for each call of 'forward'
-      mutable blitz::Array<double,1> _predictions1;
-      mutable blitz::Array<double,2> _predictions2;
+      // the rejection thresholds of the soft cascade, one for each weak machine
+      blitz::Array<double,1> m_rejectionThresholds;
+
+      // the distinct feature indices that are read by all weak machines, which determine the block size of the samples
+      std::set<int32_t> m_usedIndices;
+
+      // is the flat look-up table below valid?
+      bool m_compiled;
+      // the look-up tables of all weak machines and outputs, with the weights multiplied in
+      std::vector<double> m_compiledTable;
+      // for each weak machine and output: the offset of its look-up table in m_compiledTable and the index of its feature
+      std::vector<size_t> m_compiledOffsets;
+      std::vector<int32_t> m_compiledIndices;
   };
 
 } } } // namespaces
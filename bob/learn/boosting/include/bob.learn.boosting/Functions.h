@@ -6,8 +6,9 @@
 
 namespace bob { namespace learn { namespace boosting {
 
-  // This is a fast implementation of the weighted histogram
-  inline void weighted_histogram(const blitz::Array<uint16_t,1>& features, const blitz::Array<double,1>& weights, blitz::Array<double,1>& histogram){
+  // This is a fast implementation of the weighted histogram (for uint8 or uint16 features)
+  template <typename T>
+  inline void weighted_histogram(const blitz::Array<T,1>& features, const blitz::Array<double,1>& weights, blitz::Array<double,1>& histogram){
     assert(features.extent(0) == weights.extent(0));
     histogram = 0.;
     for (int i = features.extent(0); i--;){
@@ -15,6 +16,47 @@ namespace bob { namespace learn { namespace boosting {
     }
   }
 
+  // Computes the weighted histograms for several features and all outputs in a single row-major sweep over the samples.
+  // The histograms of the features [firstFeature, firstFeature + histograms.extent(0)) are stored in histograms(feature, bin, output).
+  // Samples are accumulated in the same order as in weighted_histogram, so that both functions compute identical values.
+  template <typename T>
+  inline void weighted_histograms(const blitz::Array<T,2>& features, const blitz::Array<double,2>& weights, blitz::Array<double,3>& histograms, int firstFeature = 0){
+    assert(features.extent(0) == weights.extent(0));
+    assert(histograms.extent(2) == weights.extent(1));
+    assert(firstFeature + histograms.extent(0) <= features.extent(1));
+    histograms = 0.;
+    const int featureCount = histograms.extent(0), outputCount = histograms.extent(2);
+    for (int i = features.extent(0); i--;){
+      for (int f = 0; f < featureCount; ++f){
+        const int bin = (int)features(i, firstFeature + f);
+        for (int o = 0; o < outputCount; ++o){
+          histograms(f, bin, o) += weights(i, o);
+        }
+      }
+    }
+  }
+
+  // Computes the weighted histograms as above, using only the samples with the given (row) indices.
+  // The indices are not copied, so that the features do not need to be copied for a subset of the samples.
+  // For the indices 0, ..., #samples-1 the histograms are identical to the ones computed for all samples.
+  template <typename T>
+  inline void weighted_histograms(const blitz::Array<T,2>& features, const blitz::Array<double,2>& weights, const blitz::Array<int32_t,1>& sampleIndices, blitz::Array<double,3>& histograms, int firstFeature = 0){
+    assert(features.extent(0) == weights.extent(0));
+    assert(histograms.extent(2) == weights.extent(1));
+    assert(firstFeature + histograms.extent(0) <= features.extent(1));
+    histograms = 0.;
+    const int featureCount = histograms.extent(0), outputCount = histograms.extent(2);
+    for (int k = sampleIndices.extent(0); k--;){
+      const int i = sampleIndices(k);
+      for (int f = 0; f < featureCount; ++f){
+        const int bin = (int)features(i, firstFeature + f);
+        for (int o = 0; o < outputCount; ++o){
+          histograms(f, bin, o) += weights(i, o);
+        }
+      }
+    }
+  }
+
   inline boost::shared_ptr<WeakMachine> loadWeakMachine(bob::io::base::HDF5File& file){
     std::string machine_type;
     file.getAttribute(".", "MachineType", machine_type);
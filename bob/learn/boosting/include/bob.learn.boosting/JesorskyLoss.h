@@ -2,6 +2,7 @@
 #define BOB_LEARN_BOOSTING_JESORSKY_LOSS_H
 
 #include <blitz/array.h>
+#include <boost/thread/mutex.hpp>
 #include <bob.learn.boosting/LossFunction.h>
 
 namespace bob { namespace learn { namespace boosting {
@@ -15,16 +16,27 @@ namespace bob { namespace learn { namespace boosting {
   class JesorskyLoss : public LossFunction{
     public:
       // Create an LUT machine using the given LUT and the given index
-      JesorskyLoss(){}
+      JesorskyLoss(int numberOfThreads = 1) : LossFunction(numberOfThreads) {}
       virtual ~JesorskyLoss(){}
 
-      void loss(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& errors) const;
+    protected:
+      // the inverse inter-eye-distances of the targets, which are cached as long as the eye positions of the targets do not change
+      boost::shared_ptr<const blitz::Array<double,1> > sampleScales(const blitz::Array<double,2>& targets) const;
 
-      void lossGradient(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& gradient) const;
+      void sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& errors) const;
+
+      void sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& gradient) const;
+
+      void sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const;
 
     private:
 
       double interEyeDistance(const double y1, const double x1, const double y2, const double x2) const;
+
+      // the cache of the sample scales, and the eye positions of the targets that they were computed for
+      mutable boost::mutex m_mutex;
+      mutable boost::shared_ptr<const blitz::Array<double,1> > m_scales;
+      mutable blitz::Array<double,2> m_eyes;
   };
 
 } } } // namespaces
@@ -21,12 +21,16 @@ namespace bob { namespace learn { namespace boosting {
       LUTMachine(bob::io::base::HDF5File& file);
 
       // uni-variate single-feature classification of the input feature vector
+      virtual double forward(const blitz::Array<uint8_t, 1>& features) const;
       virtual double forward(const blitz::Array<uint16_t, 1>& features) const;
       // multi-variate single-feature classification of the input feature vector
+      virtual void forward(const blitz::Array<uint8_t, 1>& features, blitz::Array<double,1> predictions) const;
       virtual void forward(const blitz::Array<uint16_t, 1>& features, blitz::Array<double,1> predictions) const;
       // uni-variate classification of several input feature vector
+      virtual void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,1> predictions) const;
       virtual void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,1> predictions) const;
       // multi-variate classification of several input feature vector
+      virtual void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,2> predictions) const;
       virtual void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,2> predictions) const;
 
       // The indices into the feature vector used by this machine
@@ -39,7 +43,16 @@ namespace bob { namespace learn { namespace boosting {
       // The multi-variate look-up-table used in this machine
       const blitz::Array<double, 2> getLut() const{return m_look_up_tables;}
 
+      // The feature indices used in each of the output dimensions
+      const blitz::Array<int32_t, 1> getLutIndices() const{return m_indices;}
+
     private:
+      // the implementations of the forward functions for uint8 and uint16 features
+      template <typename T> double _forward(const blitz::Array<T, 1>& features) const;
+      template <typename T> void _forward(const blitz::Array<T, 1>& features, blitz::Array<double,1>& predictions) const;
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,1>& predictions) const;
+      template <typename T> void _forward(const blitz::Array<T, 2>& features, blitz::Array<double,2>& predictions) const;
+
       // the LUT for the multi-variate case
       blitz::Array<double,2> m_look_up_tables;
       // The feature indices used in each of the output dimensions
@@ -2,6 +2,10 @@
 #define BOB_LEARN_BOOSTING_LUT_TRAINER_H
 
 #include <bob.learn.boosting/LUTMachine.h>
+#include <boost/random/mersenne_twister.hpp>
+#include <boost/thread/mutex.hpp>
+#include <string>
+#include <vector>
 
 
 namespace bob { namespace learn { namespace boosting {
@@ -20,28 +24,45 @@ namespace bob { namespace learn { namespace boosting {
       } SelectionStyle;
 
       // Create an LUT machine using the given LUT and the given index
-      LUTTrainer(uint16_t maximumFeatureValue, int numberOfOutputs = 1, SelectionStyle selectionType = independent);
+      // If featureFraction < 1, only a random subset of the features is scanned in each call to train(), which is selected using a random generator with the given seed
+      LUTTrainer(uint16_t maximumFeatureValue, int numberOfOutputs = 1, SelectionStyle selectionType = independent, int numberOfThreads = 1, double featureFraction = 1., uint32_t seed = 0);
 
+      // Trains the LUT machine using uint8 or uint16 features
+      boost::shared_ptr<LUTMachine> train(const blitz::Array<uint8_t, 2>& training_features, const blitz::Array<double,2>& loss_gradient) const;
       boost::shared_ptr<LUTMachine> train(const blitz::Array<uint16_t, 2>& training_features, const blitz::Array<double,2>& loss_gradient) const;
 
+      // Trains the LUT machine using only the training samples with the given indices
+      boost::shared_ptr<LUTMachine> train(const blitz::Array<uint8_t, 2>& training_features, const blitz::Array<double,2>& loss_gradient, const blitz::Array<int32_t,1>& sample_indices) const;
+      boost::shared_ptr<LUTMachine> train(const blitz::Array<uint16_t, 2>& training_features, const blitz::Array<double,2>& loss_gradient, const blitz::Array<int32_t,1>& sample_indices) const;
+
       uint16_t maximumFeatureValue() const {return m_maximumFeatureValue;}
       int numberOfOutputs() const {return m_numberOfOutputs;}
       SelectionStyle selectionType() const {return m_selectionType;}
+      int numberOfThreads() const {return m_numberOfThreads;}
+      double featureFraction() const {return m_featureFraction;}
+
+      // The state of the random generator that selects the features, e.g., to store it and continue the same sequence of feature subsets later
+      std::string randomState() const;
+      void setRandomState(const std::string& state);
 
     private:
-      int32_t bestIndex(const blitz::Array<double,1>& array) const;
-      void weightedHistogram(const blitz::Array<uint16_t,1>& features, const blitz::Array<double,1>& weights) const;
+      // selects the (sorted) random subset of the features that is scanned in the current call to train()
+      void _selectFeatures(int featureLength, std::vector<int32_t>& featureIndices) const;
+
+      // trains the machine with all samples, if sample_indices is NULL
+      template <typename T>
+      boost::shared_ptr<LUTMachine> _train(const blitz::Array<T, 2>& training_features, const blitz::Array<double,2>& loss_gradient, const blitz::Array<int32_t,1>* sample_indices) const;
 
       uint16_t m_maximumFeatureValue;
       int m_numberOfOutputs;
       SelectionStyle m_selectionType;
-
-      // pre-allocated arrays for faster access
-      mutable blitz::Array<double,2> _luts;
-      mutable blitz::Array<int32_t,1> _selectedIndices;
-      mutable blitz::Array<double,1> _gradientHistogram;
-      mutable blitz::Array<double,2> _lossSum;
-
+      int m_numberOfThreads;
+      double m_featureFraction;
+      // the random generator is advanced in each call to train()
+      // train() might be called concurrently, so the generator and the index buffer are guarded by a mutex
+      mutable boost::mt19937 m_generator;
+      mutable std::vector<int32_t> m_indices;
+      mutable boost::mutex m_mutex;
   };
 
 } } } // namespaces
@@ -0,0 +1,33 @@
+#ifndef BOB_LEARN_BOOSTING_LOGIT_LOSS_H
+#define BOB_LEARN_BOOSTING_LOGIT_LOSS_H
+
+#include <blitz/array.h>
+#include <bob.learn.boosting/LossFunction.h>
+
+namespace bob { namespace learn { namespace boosting {
+
+  /**
+   * The logit loss log(1 + exp(-target * score)) for (multi-variate) binary classification.
+   *
+   * One loss value is computed for each sample and output.
+   */
+  class LogitLoss : public LossFunction{
+    public:
+      // Create the loss function, which uses the given number of threads to compute the loss values and gradients
+      LogitLoss(int numberOfThreads = 1) : LossFunction(numberOfThreads) {}
+      virtual ~LogitLoss(){}
+
+      // one loss value is computed for each output
+      int numberOfLossValues(int numberOfOutputs) const {return numberOfOutputs;}
+
+    protected:
+      void sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors) const;
+
+      void sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& gradient) const;
+
+      void sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const;
+  };
+
+} } } // namespaces
+
+#endif // BOB_LEARN_BOOSTING_LOGIT_LOSS_H
@@ -2,25 +2,54 @@
 #define BOB_LEARN_BOOSTING_LOSS_FUNCTION_H
 
 #include <blitz/array.h>
+#include <boost/shared_ptr.hpp>
 
 namespace bob { namespace learn { namespace boosting {
 
+  /**
+   * The base class of all loss functions.
+   *
+   * Derived classes implement the loss and its gradient for a single sample, see sampleLoss() and sampleLossGradient().
+   * All functions of this class process the samples in a single pass, and do not store any state.
+   * Hence, one loss function can be used in several threads at the same time (derived classes that cache the sample scales need to guard their cache).
+   * Additionally, the samples can be split into consecutive ranges, which are processed in the given number of threads.
+   */
   class LossFunction{
     public:
+      virtual ~LossFunction(){}
+
+      // the sums are accumulated per output in a single pass over the samples, without storing the scores, loss values or gradients of all samples
       void lossSum(const blitz::Array<double,1>& alpha, const blitz::Array<double,2>& targets, const blitz::Array<double,2>& previous_scores, const blitz::Array<double,2>& current_scores, blitz::Array<double,1>& loss_sum) const;
       void gradientSum(const blitz::Array<double,1>& alpha, const blitz::Array<double,2>& targets, const blitz::Array<double,2>& previous_scores, const blitz::Array<double,2>& current_scores, blitz::Array<double,1>& gradient_sum) const;
+      // computes lossSum() and gradientSum() for the same alpha at once, so that the scores and the intermediate values are computed only once
+      void lossAndGradientSum(const blitz::Array<double,1>& alpha, const blitz::Array<double,2>& targets, const blitz::Array<double,2>& previous_scores, const blitz::Array<double,2>& current_scores, blitz::Array<double,1>& loss_sum, blitz::Array<double,1>& gradient_sum) const;
+
+      // computes the loss values and/or the loss gradient for all samples
+      void loss(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& errors) const;
+      void lossGradient(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& gradient) const;
+      void lossAndGradient(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& errors, blitz::Array<double, 2>& gradient) const;
+
+      // the number of loss values that loss() computes per sample; by default, a single loss value is computed for all outputs
+      virtual int numberOfLossValues(int numberOfOutputs) const {return 1;}
 
-      virtual void loss(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& errors) const = 0;
-      virtual void lossGradient(const blitz::Array<double, 2>& targets, const blitz::Array<double, 2>& scores, blitz::Array<double, 2>& gradient) const = 0;
+      int numberOfThreads() const {return m_numberOfThreads;}
 
     protected:
       // This class is not instanceable
-      LossFunction(){}
+      LossFunction(int numberOfThreads = 1) : m_numberOfThreads(numberOfThreads) {}
+
+      // computes a scale for each sample, which depends on the targets only and is passed to the sample functions (e.g., to normalize the loss of each sample)
+      // by default, no scales are computed (NULL is returned), and the scale 1 is passed to the sample functions
+      virtual boost::shared_ptr<const blitz::Array<double,1> > sampleScales(const blitz::Array<double,2>& targets) const {return boost::shared_ptr<const blitz::Array<double,1> >();}
+
+      // computes the loss values and the loss gradient of a single sample; the arrays are contiguous and of length #outputs (errors: numberOfLossValues())
+      virtual void sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& errors) const = 0;
+      virtual void sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& gradient) const = 0;
+      // computes sampleLoss() and sampleLossGradient() at once; derived classes should overwrite this function to share intermediate values
+      virtual void sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double scale, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const;
 
     private:
-      mutable blitz::Array<double,2> scores;
-      mutable blitz::Array<double,2> errors;
-      mutable blitz::Array<double,2> gradients;
+      int m_numberOfThreads;
   };
 
 } } } // namespaces
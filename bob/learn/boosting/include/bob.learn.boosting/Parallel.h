@@ -0,0 +1,47 @@
+#ifndef BOB_LEARN_BOOSTING_PARALLEL_H
+#define BOB_LEARN_BOOSTING_PARALLEL_H
+
+#include <boost/thread.hpp>
+#include <algorithm>
+#include <exception>
+#include <vector>
+
+namespace bob { namespace learn { namespace boosting {
+
+  // Splits the range [0, size) into (at most) numberOfThreads consecutive blocks of similar size.
+  // The given function is called as function(threadIndex, first, last) for each of the blocks, each in its own thread.
+  // The blocks are assigned to the threads in ascending order, so that the results can be combined deterministically.
+  // When only a single thread is requested, the function is called in the current thread.
+  // Exceptions thrown by the function are re-thrown in the current thread, after all threads have finished.
+  template <typename Function>
+  inline void parallel_for(int size, int numberOfThreads, Function function){
+    numberOfThreads = std::max(1, std::min(numberOfThreads, size));
+    if (numberOfThreads == 1){
+      function(0, 0, size);
+      return;
+    }
+
+    boost::thread_group threads;
+    std::vector<std::exception_ptr> exceptions(numberOfThreads);
+    for (int t = 0; t < numberOfThreads; ++t){
+      int first = (int)((long)size * t / numberOfThreads);
+      int last = (int)((long)size * (t+1) / numberOfThreads);
+      threads.create_thread([=, &exceptions](){
+        try{
+          function(t, first, last);
+        } catch (...){
+          exceptions[t] = std::current_exception();
+        }
+      });
+    }
+    threads.join_all();
+
+    // re-throw the exception of the first block that failed
+    for (auto it = exceptions.begin(); it != exceptions.end(); ++it){
+      if (*it) std::rethrow_exception(*it);
+    }
+  }
+
+} } } // namespaces
+
+#endif // BOB_LEARN_BOOSTING_PARALLEL_H
@@ -21,15 +21,21 @@ namespace bob { namespace learn { namespace boosting {
 
       // forwarding of a single feature
       virtual double forward(const blitz::Array<uint16_t, 1>& features) const;
+      virtual double forward(const blitz::Array<uint8_t, 1>& features) const;
+      virtual double forward(const blitz::Array<float, 1>& features) const;
       virtual double forward(const blitz::Array<double, 1>& features) const;
 
       // forwarding of multiple features
+      virtual void forward(const blitz::Array<float, 2>& features, blitz::Array<double,1> predictions) const;
       virtual void forward(const blitz::Array<double, 2>& features, blitz::Array<double,1> predictions) const;
       virtual void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,1> predictions) const;
+      virtual void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,1> predictions) const;
 
       // forwarding of multiple features
+      virtual void forward(const blitz::Array<float, 2>& features, blitz::Array<double,2> predictions) const;
       virtual void forward(const blitz::Array<double, 2>& features, blitz::Array<double,2> predictions) const;
       virtual void forward(const blitz::Array<uint16_t, 2>& features, blitz::Array<double,2> predictions) const;
+      virtual void forward(const blitz::Array<uint8_t, 2>& features, blitz::Array<double,2> predictions) const;
 
       // the index used by this machine
       virtual blitz::Array<int32_t,1> getIndices() const;
@@ -0,0 +1,66 @@
+#ifndef BOB_LEARN_BOOSTING_STUMP_TRAINER_H
+#define BOB_LEARN_BOOSTING_STUMP_TRAINER_H
+
+#include <bob.learn.boosting/StumpMachine.h>
+#include <boost/thread/mutex.hpp>
+#include <vector>
+
+
+namespace bob { namespace learn { namespace boosting {
+
+  /**
+   * This trainer selects the decision stump with the highest gain, i.e., the highest absolute sum of the negative loss gradient above the threshold.
+   *
+   * The sort order of the training features is computed only once in prepare(), and it is re-used by train() in all rounds of boosting.
+   * This trainer can only be used in a uni-variate environment.
+   *
+   * prepare() and train() can be called concurrently; they are serialized, so that the sort order is never replaced while it is scanned.
+   * Note that train() always uses the features given in the last call to prepare(), which might have been called by another thread.
+   */
+  class StumpTrainer{
+    public:
+      // Create a stump trainer that uses the given number of threads to scan the features
+      StumpTrainer(int numberOfThreads = 1);
+
+      // Computes the sort order of all features, which is used by all subsequent calls to train()
+      void prepare(const blitz::Array<uint8_t, 2>& training_features);
+      void prepare(const blitz::Array<uint16_t, 2>& training_features);
+      void prepare(const blitz::Array<double, 2>& training_features);
+
+      // Trains a stump machine for the features given to prepare() and the given loss gradient
+      boost::shared_ptr<StumpMachine> train(const blitz::Array<double, 1>& loss_gradient) const;
+
+      // Trains a stump machine using only the prepared training samples with the given indices
+      boost::shared_ptr<StumpMachine> train(const blitz::Array<double, 1>& loss_gradient, const blitz::Array<int32_t, 1>& sample_indices) const;
+
+      // Computes polarity, threshold and gain of the best stump for a single feature and the given *negative* loss gradient
+      void computeThreshold(const blitz::Array<double, 1>& features, const blitz::Array<double, 1>& gradient, double& polarity, double& threshold, double& gain) const;
+
+      int numberOfThreads() const {return m_numberOfThreads;}
+      // the number of samples and features given to prepare(); both are 0 if prepare() was not called yet
+      int numberOfSamples() const {boost::mutex::scoped_lock lock(m_mutex); return m_sortIndices.extent(1);}
+      int numberOfFeatures() const {boost::mutex::scoped_lock lock(m_mutex); return m_sortIndices.extent(0);}
+
+    private:
+      template <typename T>
+        void _prepare(const blitz::Array<T, 2>& training_features);
+
+      // trains the stump with all samples, if sample_indices is NULL
+      boost::shared_ptr<StumpMachine> _train(const blitz::Array<double, 1>& loss_gradient, const blitz::Array<int32_t, 1>* sample_indices) const;
+
+      int m_numberOfThreads;
+
+      // the sort order of each feature, shape (#features, #samples)
+      blitz::Array<int32_t, 2> m_sortIndices;
+      // the distinct values of each feature in ascending order, and the (exclusive) end of each value in the sort order
+      // for integral features, these are much smaller than the sort order, so that only the sort indices need to be stored for each sample
+      std::vector<std::vector<double> > m_distinctValues;
+      std::vector<std::vector<int32_t> > m_valueEnds;
+
+      // prepare() and train() might be called concurrently, so the sort order is guarded by a mutex
+      mutable boost::mutex m_mutex;
+  };
+
+} } } // namespaces
+
+#endif // BOB_LEARN_BOOSTING_STUMP_TRAINER_H
@@ -0,0 +1,34 @@
+#ifndef BOB_LEARN_BOOSTING_TANGENTIAL_LOSS_H
+#define BOB_LEARN_BOOSTING_TANGENTIAL_LOSS_H
+
+#include <blitz/array.h>
+#include <bob.learn.boosting/LossFunction.h>
+
+namespace bob { namespace learn { namespace boosting {
+
+  /**
+   * The tangent loss (2 * arctan(target * score) - 1)^2 for (multi-variate) binary classification,
+   * as described in http://www.svcl.ucsd.edu/projects/LossDesign/TangentBoost.html.
+   *
+   * One loss value is computed for each sample and output.
+   */
+  class TangentialLoss : public LossFunction{
+    public:
+      // Create the loss function, which uses the given number of threads to compute the loss values and gradients
+      TangentialLoss(int numberOfThreads = 1) : LossFunction(numberOfThreads) {}
+      virtual ~TangentialLoss(){}
+
+      // one loss value is computed for each output
+      int numberOfLossValues(int numberOfOutputs) const {return numberOfOutputs;}
+
+    protected:
+      void sampleLoss(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors) const;
+
+      void sampleLossGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& gradient) const;
+
+      void sampleLossAndGradient(const blitz::Array<double, 1>& targets, const blitz::Array<double, 1>& scores, double, blitz::Array<double, 1>& errors, blitz::Array<double, 1>& gradient) const;
+  };
+
+} } } // namespaces
+
+#endif // BOB_LEARN_BOOSTING_TANGENTIAL_LOSS_H
@@ -16,15 +16,19 @@ static auto jesorskyLoss_doc = bob::extension::ClassDoc(
   ".. math:: d_i(\\vec a, \\vec b) = \\frac{\\sqrt{(b_{2i} - a_{2i})^2 + (b_{2i+1} - a_{2i+1})^2}} {\\sqrt{(a_0 - a_2)^2 + (a_1 - a_3)^2}}\n\n"
   "and then the derivative is computed for each element of the target vector:\n\n"
   ".. math:: \\nabla(\\vec a, \\vec b) = \\left[d_i\\cdot(b_{2i} - a_{2i}), d_i\\cdot(b_{2i+1} - a_{2i+1}) \\right]_i \n\n"
+  "The inverse inter-eye-distances of the targets are computed only once, and they are cached as long as the eye positions in the targets do not change, e.g., during the whole boosting training. "
+  "The samples can be processed in several threads, and the GIL is released during the computations."
 
 )
 .add_constructor(
   bob::extension::FunctionDoc(
     "__init__",
     "Initializes a JesorskyLoss object.",
-    "The constructor comes with no parameters.",
+    "",
     true
-  ).add_prototype("", "")
+  )
+  .add_prototype("[number_of_threads]", "")
+  .add_parameter("number_of_threads", "int", "[default: 1] The number of threads that are used to compute the loss values and gradients")
 );
 
 
@@ -37,10 +41,20 @@ static int jesorskyLoss_init(
 )
 {
   // get list of arguments
-  char* kwlist[] = {NULL};
-  if (!PyArg_ParseTupleAndKeywords(args, kwargs, "", kwlist)) return -1;
+  char* kwlist[] = {c("number_of_threads"), NULL};
 
-  self->base.reset(new bob::learn::boosting::JesorskyLoss());
+  int number_of_threads = 1;
+  if (!PyArg_ParseTupleAndKeywords(args, kwargs, "|i", kwlist, &number_of_threads)){
+    jesorskyLoss_doc.print_usage();
+    return -1;
+  }
+
+  if (number_of_threads < 1){
+    PyErr_Format(PyExc_ValueError, "JesorskyLoss: the number of threads must be at least 1, but it is %d", number_of_threads);
+    return -1;
+  }
+
+  self->base.reset(new bob::learn::boosting::JesorskyLoss(number_of_threads));
   self->parent.base = self->base;
   return 0;
 }
@@ -101,11 +115,14 @@ static PyObject* jesorskyLoss_loss(
   blitz::Array<double,2> errors(targets->extent(0), 1);
 
   // actually call the function
-  self->base->loss(
-    *targets,
-    *scores,
-    errors
-  );
+  {
+    ReleaseGIL gil;
+    self->base->loss(
+      *targets,
+      *scores,
+      errors
+    );
+  }
 
   return PyBlitzArrayCxx_AsNumpy(errors);
 }
@@ -156,11 +173,14 @@ static PyObject* jesorskyLoss_lossGradient(
   blitz::Array<double,2> gradient(targets->shape());
 
   // actually call the function
-  self->base->lossGradient(
-    *targets,
-    *scores,
-    gradient
-  );
+  {
+    ReleaseGIL gil;
+    self->base->lossGradient(
+      *targets,
+      *scores,
+      gradient
+    );
+  }
 
   return PyBlitzArrayCxx_AsNumpy(gradient);
 }
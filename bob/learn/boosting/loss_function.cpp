@@ -17,7 +17,10 @@ static auto lossFunction_doc = bob::extension::ClassDoc(
   "       ...\n"
   "    )\n\n"
   "where ``current_strong_scores`` are the scores for the current strong machine (without the latest weak machine added) and ``current_weak_scores`` are the scores of the selected weak machine."
-  "Please see the code of :py:class:`bob.boosting.trainer.Boosting` for an example."
+  "Please see the code of :py:class:`bob.boosting.trainer.Boosting` for an example.\n\n"
+  "The sums are accumulated in a single pass over the samples, without storing intermediate values for all samples. "
+  "Since loss functions do not store any state, one loss function can be used in several threads at the same time. "
+  "Additionally, the samples can be processed by several threads, see :py:attr:`number_of_threads`."
 );
 
 
@@ -33,7 +36,7 @@ static auto lossFunction_lossSum_doc = bob::extension::FunctionDoc(
 .add_parameter("targets", "float <#samples, #outputs>", "The target values that should be achieved during boosting")
 .add_parameter("previous_scores", "float <#samples, #outputs>", "The score values that are achieved by the boosted machine after the previous boosting iteration")
 .add_parameter("current_scores", "float <#samples, #outputs>", "The score values that are achieved with the weak machine added in this boosting round")
-.add_return("loss_sum", "float <1>", "The sum over the loss values for the newly combined strong classifier")
+.add_return("loss_sum", "float <#losses>", "The sum over the loss values for the newly combined strong classifier; #losses is 1 for loss functions that compute a single loss value per sample (e.g. :py:class:`JesorskyLoss`), and #outputs otherwise")
 ;
 
 static PyObject* lossFunction_lossSum(
@@ -71,16 +74,19 @@ static PyObject* lossFunction_lossSum(
     return NULL;
   }
 
-  blitz::Array<double,1> loss_sum(1);
+  blitz::Array<double,1> loss_sum(self->base->numberOfLossValues(targets->extent(1)));
 
   // actually call the function
-  self->base->lossSum(
-    *alpha,
-    *targets,
-    *prev_scores,
-    *curr_scores,
-    loss_sum
-  );
+  {
+    ReleaseGIL gil;
+    self->base->lossSum(
+      *alpha,
+      *targets,
+      *prev_scores,
+      *curr_scores,
+      loss_sum
+    );
+  }
 
   return PyBlitzArrayCxx_AsNumpy(loss_sum);
 }
@@ -139,18 +145,161 @@ static PyObject* lossFunction_gradientSum(
   blitz::Array<double,1> gradient_sum(targets->extent(1));
 
   // actually call the function
-  self->base->gradientSum(
-    *alpha,
-    *targets,
-    *prev_scores,
-    *curr_scores,
-    gradient_sum
-  );
+  {
+    ReleaseGIL gil;
+    self->base->gradientSum(
+      *alpha,
+      *targets,
+      *prev_scores,
+      *curr_scores,
+      gradient_sum
+    );
+  }
 
   return PyBlitzArrayCxx_AsNumpy(gradient_sum);
 }
 
 // bind the class
+
+
+static auto lossFunction_lossAndGradientSum_doc = bob::extension::FunctionDoc(
+  "loss_and_gradient_sum",
+  "Computes the sum of the losses and the sum of the loss gradients at once.",
+  "This function computes the same values as :py:func:`loss_sum` and :py:func:`loss_gradient_sum`, but the combined scores and the intermediate values of the loss are computed only once. "
+  "It can be used as the ``func`` parameter of ``scipy.optimize.fmin_l_bfgs_b`` (with ``fprime = None``), when the sum of the returned ``loss_sum`` is used as the function value.",
+  true
+)
+.add_prototype("alpha, targets, previous_scores, current_scores, [loss_sum, gradient_sum]", "loss_sum, gradient_sum")
+.add_parameter("alpha", "float <#outputs>", "The weight for the current_scores that will be optimized in L-BFGS")
+.add_parameter("targets", "float <#samples, #outputs>", "The target values that should be achieved during boosting")
+.add_parameter("previous_scores", "float <#samples, #outputs>", "The score values that are achieved by the boosted machine after the previous boosting iteration")
+.add_parameter("current_scores", "float <#samples, #outputs>", "The score values that are achieved with the weak machine added in this boosting round")
+.add_parameter("loss_sum", "float <#losses>", "If given, the loss sum is written to this array")
+.add_parameter("gradient_sum", "float <#outputs>", "If given, the gradient sum is written to this array")
+.add_return("loss_sum", "float <#losses>", "The sum over the loss values for the newly combined strong classifier")
+.add_return("gradient_sum", "float <#outputs>", "The sum over the loss gradients for the newly combined strong classifier")
+;
+
+static PyObject* lossFunction_lossAndGradientSum(
+  LossFunctionObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  // get list of arguments
+  char* kwlist[] = {c("alpha"), c("targets"), c("previous_scores"), c("current_scores"), c("loss_sum"), c("gradient_sum"), NULL};
+
+  PyBlitzArrayObject* p_alpha = 0,* p_targets = 0,* p_prev_scores = 0,* p_curr_scores = 0,* p_loss_sum = 0,* p_gradient_sum = 0;
+  // the output arrays are kept as given, so that they can be returned
+  PyObject* o_loss_sum = 0,* o_gradient_sum = 0;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kwargs,
+          "O&O&O&O&|OO", kwlist,
+          &PyBlitzArray_Converter, &p_alpha,
+          &PyBlitzArray_Converter, &p_targets,
+          &PyBlitzArray_Converter, &p_prev_scores,
+          &PyBlitzArray_Converter, &p_curr_scores,
+          &o_loss_sum,
+          &o_gradient_sum)
+  ){
+    lossFunction_lossAndGradientSum_doc.print_usage();
+    return NULL;
+  }
+
+  auto _1 = make_safe(p_alpha), _2 = make_safe(p_targets), _3 = make_safe(p_prev_scores), _4 = make_safe(p_curr_scores);
+
+  if ((o_loss_sum && !PyBlitzArray_OutputConverter(o_loss_sum, &p_loss_sum)) || (o_gradient_sum && !PyBlitzArray_OutputConverter(o_gradient_sum, &p_gradient_sum))){
+    Py_XDECREF(p_loss_sum);
+    lossFunction_lossAndGradientSum_doc.print_usage();
+    return NULL;
+  }
+  auto _5 = make_xsafe(p_loss_sum), _6 = make_xsafe(p_gradient_sum);
+
+  // prepare C++ data
+  const auto alpha = PyBlitzArrayCxx_AsBlitz<double,1>(p_alpha, "alpha");
+  const auto targets = PyBlitzArrayCxx_AsBlitz<double,2>(p_targets, "targets");
+  const auto prev_scores = PyBlitzArrayCxx_AsBlitz<double,2>(p_prev_scores, "previous_scores");
+  const auto curr_scores = PyBlitzArrayCxx_AsBlitz<double,2>(p_curr_scores, "current_scores");
+
+  if (!alpha || !targets || !prev_scores || !curr_scores){
+    return NULL;
+  }
+
+  // use the given output arrays, or create new ones
+  const int numberOfLossValues = self->base->numberOfLossValues(targets->extent(1));
+  blitz::Array<double,1> loss_sum, gradient_sum;
+  if (p_loss_sum){
+    const auto out = PyBlitzArrayCxx_AsBlitz<double,1>(p_loss_sum, "loss_sum");
+    if (!out) return NULL;
+    if (out->extent(0) != numberOfLossValues){
+      PyErr_Format(PyExc_ValueError, "loss_and_gradient_sum: the loss_sum must have %d elements, but it has %d", numberOfLossValues, out->extent(0));
+      return NULL;
+    }
+    loss_sum.reference(*out);
+  } else {
+    loss_sum.resize(numberOfLossValues);
+  }
+  if (p_gradient_sum){
+    const auto out = PyBlitzArrayCxx_AsBlitz<double,1>(p_gradient_sum, "gradient_sum");
+    if (!out) return NULL;
+    if (out->extent(0) != targets->extent(1)){
+      PyErr_Format(PyExc_ValueError, "loss_and_gradient_sum: the gradient_sum must have %d elements, but it has %d", targets->extent(1), out->extent(0));
+      return NULL;
+    }
+    gradient_sum.reference(*out);
+  } else {
+    gradient_sum.resize(targets->extent(1));
+  }
+
+  // actually call the function
+  {
+    ReleaseGIL gil;
+    self->base->lossAndGradientSum(
+      *alpha,
+      *targets,
+      *prev_scores,
+      *curr_scores,
+      loss_sum,
+      gradient_sum
+    );
+  }
+
+  // return the given output arrays, or the newly created ones
+  return Py_BuildValue("NN",
+    o_loss_sum ? Py_BuildValue("O", o_loss_sum) : PyBlitzArrayCxx_AsNumpy(loss_sum),
+    o_gradient_sum ? Py_BuildValue("O", o_gradient_sum) : PyBlitzArrayCxx_AsNumpy(gradient_sum)
+  );
+}
+
+
+static auto lossFunction_numberOfThreads_doc = bob::extension::VariableDoc(
+  "number_of_threads",
+  "int",
+  "The number of threads that are used to compute the loss values, the gradients and their sums",
+  "The samples are split into consecutive ranges, which are processed in parallel."
+);
+
+static PyObject* lossFunction_numberOfThreads(
+  LossFunctionObject* self,
+  void*
+)
+{
+  return Py_BuildValue("i", self->base->numberOfThreads());
+}
+
+static PyGetSetDef lossFunction_Getters[] = {
+  {
+    lossFunction_numberOfThreads_doc.name(),
+    (getter)lossFunction_numberOfThreads,
+    0,
+    lossFunction_numberOfThreads_doc.doc(),
+    0
+  },
+  {NULL}
+};
+
+
 static PyMethodDef lossFunction_Methods[] = {
   {
     lossFunction_lossSum_doc.name(),
@@ -164,6 +313,12 @@ static PyMethodDef lossFunction_Methods[] = {
     METH_VARARGS | METH_KEYWORDS,
     lossFunction_gradientSum_doc.doc(),
   },
+  {
+    lossFunction_lossAndGradientSum_doc.name(),
+    (PyCFunction)lossFunction_lossAndGradientSum,
+    METH_VARARGS | METH_KEYWORDS,
+    lossFunction_lossAndGradientSum_doc.doc(),
+  },
   {NULL}
 };
 
@@ -184,6 +339,7 @@ bool init_LossFunction(PyObject* module)
 
   // set the functions
   LossFunctionType.tp_methods = lossFunction_Methods;
+  LossFunctionType.tp_getset = lossFunction_Getters;
 
   // check that everyting is fine
   if (PyType_Ready(&LossFunctionType) < 0)
@@ -162,22 +162,36 @@ static auto lutMachine_forward_doc = bob::extension::FunctionDoc(
   "1. ``(uint16 <#inputs>)`` will compute and return the uni-variate prediction for a single feature vector.\n"
   "2. ``(uint16 <#samples,#inputs>, float <#samples>)`` will compute the uni-variate prediction for several feature vectors.\n"
   "3. ``(uint16 <#inputs>, float <#outputs>)`` will compute the multi-variate prediction for a single feature vector.\n"
-  "4. ``(uint16 <#samples,#inputs>, float <#samples,#outputs>)`` will compute the multi-variate prediction for several feature vectors.\n",
+  "4. ``(uint16 <#samples,#inputs>, float <#samples,#outputs>)`` will compute the multi-variate prediction for several feature vectors.\n\n"
+  "Instead of uint16, the features can also be of type uint8, which are processed without conversion.\n",
   true
 )
 .add_prototype("features", "prediction")
 .add_prototype("features, predictions")
-.add_parameter("features", "uint16 <#inputs> or uint16 <#samples, #inputs>", "The feature vector(s) the prediction should be computed for.")
+.add_parameter("features", "uint8 or uint16 <#inputs> or uint8 or uint16 <#samples, #inputs>", "The feature vector(s) the prediction should be computed for.")
 .add_parameter("predictions", "float <#samples> or float <#outputs> or float <#samples, #outputs>", "The predicted values -- see below.")
 .add_return("prediction", "float", "The predicted value -- in case a single feature is provided and a single output is required")
 ;
 
-template <int N1, int N2> void _forward(LUTMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions){
-  const auto f = PyBlitzArrayCxx_AsBlitz<uint16_t,N1>(features);
+template <typename T, int N1, int N2> void _forward(LUTMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions){
+  const auto f = PyBlitzArrayCxx_AsBlitz<T,N1>(features);
   auto p = PyBlitzArrayCxx_AsBlitz<double,N2>(predictions);
   self->base->forward(*f, *p);
 }
 
+// calls the forward function for the given numbers of dimensions; returns false if these are not supported
+template <typename T> bool _forward(LUTMachineObject* self, PyBlitzArrayObject* features, PyBlitzArrayObject* predictions){
+  if (features->ndim == 2 && predictions->ndim == 1)
+    _forward<T,2,1>(self, features, predictions);
+  else if (features->ndim == 1 && predictions->ndim == 1)
+    _forward<T,1,1>(self, features, predictions);
+  else if (features->ndim == 2 && predictions->ndim == 2)
+    _forward<T,2,2>(self, features, predictions);
+  else
+    return false;
+  return true;
+}
+
 static PyObject* lutMachine_forward(
   LUTMachineObject* self,
   PyObject* args,
@@ -202,27 +216,22 @@ static PyObject* lutMachine_forward(
   try{
     if (!p_predictions){
       // uni-variate, single feature
-      const auto features = PyBlitzArrayCxx_AsBlitz<uint16_t,1>(p_features, kwlist[0]);
-      if (!features){
-        lutMachine_forward_doc.print_usage();
-        PyErr_SetString(PyExc_TypeError, "When a single parameter is specified, only 1D arrays of type uint16 are supported.");
-        return NULL;
-      }
-      return Py_BuildValue("d", self->base->forward(*features));
+      if (p_features->ndim == 1 && p_features->type_num == NPY_UINT8)
+        return Py_BuildValue("d", self->base->forward(*PyBlitzArrayCxx_AsBlitz<uint8_t,1>(p_features)));
+      if (p_features->ndim == 1 && p_features->type_num == NPY_UINT16)
+        return Py_BuildValue("d", self->base->forward(*PyBlitzArrayCxx_AsBlitz<uint16_t,1>(p_features)));
+      lutMachine_forward_doc.print_usage();
+      PyErr_SetString(PyExc_TypeError, "When a single parameter is specified, only 1D arrays of type uint8 or uint16 are supported.");
+      return NULL;
     }
 
-    if (p_features->type_num != NPY_UINT16){
-      PyErr_SetString(PyExc_TypeError, "The parameter 'features' only supports 1D or 2D arrays of type uint16");
+    if (p_features->type_num != NPY_UINT8 && p_features->type_num != NPY_UINT16){
+      PyErr_SetString(PyExc_TypeError, "The parameter 'features' only supports 1D or 2D arrays of type uint8 or uint16");
       return NULL;
     }
 
-    if (p_features->ndim == 2 && p_predictions->ndim == 1)
-      _forward<2,1>(self, p_features, p_predictions);
-    else if (p_features->ndim == 1 && p_predictions->ndim == 1)
-      _forward<1,1>(self, p_features, p_predictions);
-    else if (p_features->ndim == 2 && p_predictions->ndim == 2)
-      _forward<2,2>(self, p_features, p_predictions);
-    else{
+    const bool supported = p_features->type_num == NPY_UINT8 ? _forward<uint8_t>(self, p_features, p_predictions) : _forward<uint16_t>(self, p_features, p_predictions);
+    if (!supported){
       lutMachine_forward_doc.print_usage();
       PyErr_Format(PyExc_TypeError, "The number of dimensions of %s (%d) and %s (%d) are not supported", kwlist[0], (int)p_features->ndim, kwlist[1], (int)p_predictions->ndim);
       return NULL;
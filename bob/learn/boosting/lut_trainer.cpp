@@ -13,10 +13,13 @@ static auto lutTrainer_doc = bob::extension::ClassDoc(
     "",
     true
   )
-  .add_prototype("maximum_feature_value, [number_of_outputs, selection_style]", "")
+  .add_prototype("maximum_feature_value, [number_of_outputs, selection_style, number_of_threads, feature_fraction, seed]", "")
   .add_parameter("maximum_feature_value", "int", "The number of entries in the Look-Up-Tables")
   .add_parameter("number_of_outputs", "int", "The dimensionality of the output vector; defaults to 1 for the uni-variate case")
   .add_parameter("selection_style", "str", "The way, features are selected; possible values: 'shared', 'independent'; only useful for the multi-variate case; defaults to 'independent'")
+  .add_parameter("number_of_threads", "int", "The number of threads that are used to scan the features during training; the same feature is selected independent of the number of threads; defaults to 1")
+  .add_parameter("feature_fraction", "float", "The fraction of features that are scanned in each call to :py:meth:`train`; a new random subset of features is selected in each call; defaults to 1, i.e., all features are scanned")
+  .add_parameter("seed", "int", "The seed of the random generator that selects the subsets of features; the same seed selects the same sequence of subsets; defaults to 0")
 );
 
 
@@ -28,12 +31,15 @@ static int lutTrainer_init(
 )
 {
   try{
-    char*  kwlist[] = {c("maximum_feature_value"), c("number_of_outputs"), c("selection_style"), NULL};
+    char*  kwlist[] = {c("maximum_feature_value"), c("number_of_outputs"), c("selection_style"), c("number_of_threads"), c("feature_fraction"), c("seed"), NULL};
     uint16_t max_feat = 0;
     int num_out = 1;
     const char* style = "independent";
+    int num_threads = 1;
+    double fraction = 1.;
+    unsigned int seed = 0;
     if (!PyArg_ParseTupleAndKeywords(args, kwargs,
-          "H|is", kwlist, &max_feat, &num_out, &style)
+          "H|isidI", kwlist, &max_feat, &num_out, &style, &num_threads, &fraction, &seed)
     ){
       lutTrainer_doc.print_usage();
       return -1;
@@ -48,7 +54,19 @@ static int lutTrainer_init(
       return -1;
     }
 
-    self->base.reset(new bob::learn::boosting::LUTTrainer(max_feat, num_out, s));
+    if (num_threads < 1){
+      lutTrainer_doc.print_usage();
+      PyErr_Format(PyExc_ValueError, "The 'number_of_threads' parameter must be positive, but you used %d", num_threads);
+      return -1;
+    }
+
+    if (fraction <= 0. || fraction > 1.){
+      lutTrainer_doc.print_usage();
+      PyErr_Format(PyExc_ValueError, "The 'feature_fraction' parameter must be in the interval (0, 1], but you used %g", fraction);
+      return -1;
+    }
+
+    self->base.reset(new bob::learn::boosting::LUTTrainer(max_feat, num_out, s, num_threads, fraction, seed));
   } catch (std::exception& ex) {
     PyErr_SetString(PyExc_RuntimeError, ex.what());
     return -1;
@@ -120,18 +138,96 @@ static PyObject* lutTrainer_selection(
 }
 
 
+static auto lutTrainer_threads_doc = bob::extension::VariableDoc(
+  "number_of_threads",
+  "int",
+  "The number of threads that are used to scan the features during training"
+);
+
+static PyObject* lutTrainer_threads(
+  LUTTrainerObject* self,
+  void*
+)
+{
+  return Py_BuildValue("i", self->base->numberOfThreads());
+}
+
+
+static auto lutTrainer_fraction_doc = bob::extension::VariableDoc(
+  "feature_fraction",
+  "float",
+  "The fraction of features that are scanned in each call to :py:meth:`train`"
+);
+
+static PyObject* lutTrainer_fraction(
+  LUTTrainerObject* self,
+  void*
+)
+{
+  return Py_BuildValue("d", self->base->featureFraction());
+}
+
+
+static auto lutTrainer_randomState_doc = bob::extension::VariableDoc(
+  "random_state",
+  "str",
+  "The state of the random generator that selects the subsets of features",
+  "The state can be stored and assigned later, e.g., to a new trainer with the same parameters, to continue the same sequence of feature subsets."
+);
+
+static PyObject* lutTrainer_getRandomState(
+  LUTTrainerObject* self,
+  void*
+)
+{
+  return Py_BuildValue("s", self->base->randomState().c_str());
+}
+
+static int lutTrainer_setRandomState(
+  LUTTrainerObject* self,
+  PyObject* value,
+  void*
+)
+{
+  if (!value){
+    PyErr_Format(PyExc_TypeError, "The '%s' attribute cannot be deleted", lutTrainer_randomState_doc.name());
+    return -1;
+  }
+  const char* state = 0;
+  if (!PyArg_Parse(value, "s", &state)) return -1;
+  try{
+    self->base->setRandomState(state);
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_ValueError, ex.what());
+    return -1;
+  }
+  return 0;
+}
+
+
 static auto lutTrainer_train_doc = bob::extension::FunctionDoc(
   "train",
   "Trains and returns a weak LUT machine",
   ".. todo:: Write documentation for this",
   true
 )
-.add_prototype("training_features, loss_gradient", "lut_machine")
-.add_parameter("training_features", "uint16 <#samples, #inputs>", "The feature vectors to train the weak machine")
+.add_prototype("training_features, loss_gradient, [sample_indices]", "lut_machine")
+.add_parameter("training_features", "uint8 or uint16 <#samples, #inputs>", "The feature vectors to train the weak machine; uint8 features are processed without conversion")
 .add_parameter("loss_gradient", "float <#samples, #outputs>", "The gradient of the loss function for the training features")
+.add_parameter("sample_indices", "int32 <#selected>", "[Default: ``None``] If given, only the training samples with these indices are used to train the weak machine; the features are not copied")
 .add_return("lut_machine", "bob.boosting.machine.LUTMachine", "The weak machine that is obtained in the current round of boosting")
 ;
 
+template <typename T> boost::shared_ptr<bob::learn::boosting::LUTMachine> _train(LUTTrainerObject* self, PyBlitzArrayObject* p_features, const blitz::Array<double,2>& gradient, const blitz::Array<int32_t,1>* indices){
+  const auto features = PyBlitzArrayCxx_AsBlitz<T,2>(p_features);
+  // the GIL is not required while the features are scanned
+  ReleaseGIL gil;
+  if (indices){
+    return self->base->train(*features, gradient, *indices);
+  }
+  return self->base->train(*features, gradient);
+}
+
 static PyObject* lutTrainer_train(
   LUTTrainerObject* self,
   PyObject* args,
@@ -140,31 +236,48 @@ static PyObject* lutTrainer_train(
 {
   try{
     // get list of arguments
-    char* kwlist[] = {c("training_features"), c("loss_gradient"), NULL};
+    char* kwlist[] = {c("training_features"), c("loss_gradient"), c("sample_indices"), NULL};
 
-    PyBlitzArrayObject* p_features = 0,* p_gradient = 0;
+    PyBlitzArrayObject* p_features = 0,* p_gradient = 0,* p_indices = 0;
 
     if (!PyArg_ParseTupleAndKeywords(
             args, kwargs,
-            "O&O&", kwlist,
+            "O&O&|O&", kwlist,
             &PyBlitzArray_Converter, &p_features,
-            &PyBlitzArray_Converter, &p_gradient)
+            &PyBlitzArray_Converter, &p_gradient,
+            &PyBlitzArray_Converter, &p_indices)
     ){
       lutTrainer_train_doc.print_usage();
       return NULL;
     }
 
     auto _1 = make_safe(p_features), _2 = make_safe(p_gradient);
+    auto _3 = make_xsafe(p_indices);
 
-    auto features = PyBlitzArrayCxx_AsBlitz<uint16_t,2>(p_features, kwlist[0]);
+    if (p_features->ndim != 2 || (p_features->type_num != NPY_UINT8 && p_features->type_num != NPY_UINT16)){
+      lutTrainer_train_doc.print_usage();
+      PyErr_Format(PyExc_TypeError, "The parameter '%s' only supports 2D arrays of type uint8 or uint16", kwlist[0]);
+      return NULL;
+    }
     auto gradient = PyBlitzArrayCxx_AsBlitz<double,2>(p_gradient, kwlist[1]);
 
-    if (!features || !gradient){
+    if (!gradient){
       lutTrainer_train_doc.print_usage();
       return NULL;
     }
 
-    auto machine = self->base->train(*features, *gradient);
+    blitz::Array<int32_t,1>* indices = 0;
+    if (p_indices){
+      indices = PyBlitzArrayCxx_AsBlitz<int32_t,1>(p_indices, kwlist[2]);
+      if (!indices || !checkSampleIndices(*indices, p_features->shape[0], kwlist[2])) return NULL;
+    }
+
+    boost::shared_ptr<bob::learn::boosting::LUTMachine> machine;
+    if (p_features->type_num == NPY_UINT8){
+      machine = _train<uint8_t>(self, p_features, *gradient, indices);
+    } else {
+      machine = _train<uint16_t>(self, p_features, *gradient, indices);
+    }
     return createMachine(boost::dynamic_pointer_cast<bob::learn::boosting::WeakMachine>(machine));
 
   } catch (std::exception& ex) {
@@ -202,6 +315,27 @@ static PyGetSetDef lutTrainer_Getters[] = {
     lutTrainer_selection_doc.doc(),
     NULL
   },
+  {
+    lutTrainer_threads_doc.name(),
+    (getter)lutTrainer_threads,
+    NULL,
+    lutTrainer_threads_doc.doc(),
+    NULL
+  },
+  {
+    lutTrainer_fraction_doc.name(),
+    (getter)lutTrainer_fraction,
+    NULL,
+    lutTrainer_fraction_doc.doc(),
+    NULL
+  },
+  {
+    lutTrainer_randomState_doc.name(),
+    (getter)lutTrainer_getRandomState,
+    (setter)lutTrainer_setRandomState,
+    lutTrainer_randomState_doc.doc(),
+    NULL
+  },
   {NULL}
 };
 
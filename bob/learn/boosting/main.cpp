@@ -10,12 +10,12 @@ auto weighted_histogram_doc = bob::extension::FunctionDoc(
   "Computes a weighted histogram from the given features."
 )
 .add_prototype("features, weights, histogram")
-.add_parameter("features", "array_like <1D, uint16>", "The vector of features to compute a histogram for")
+.add_parameter("features", "array_like <1D, uint8 or uint16>", "The vector of features to compute a histogram for")
 .add_parameter("weights", "array_like <1D, float>", "The vector of weights; must be of the same size as the features")
 .add_parameter("histogram", "array_like <1D, float>", "The histogram that will be filled")
 ;
 
-PyObject* weighted_histogram(PyObject* args, PyObject* kwargs){
+PyObject* weighted_histogram(PyObject*, PyObject* args, PyObject* kwargs){
   char* kwlist[] = {c("features"), c("weights"), c("histogram"), NULL};
 
   PyBlitzArrayObject* features,* weights,* histogram;
@@ -29,35 +29,124 @@ PyObject* weighted_histogram(PyObject* args, PyObject* kwargs){
   auto _1 = make_safe(features), _2 = make_safe(weights), _3 = make_safe(histogram);
 
   // tests
-  if (features->type_num != NPY_UINT16 || features->ndim != 1){
-    PyErr_Format(PyExc_RuntimeError, "weighted_histogram: features parameter must be 1D of numpy.uint16");
+  if ((features->type_num != NPY_UINT8 && features->type_num != NPY_UINT16) || features->ndim != 1){
+    PyErr_Format(PyExc_RuntimeError, "weighted_histogram: features parameter must be 1D of numpy.uint8 or numpy.uint16");
     return NULL;
   }
-  if (weights->type_num != NPY_FLOAT16 || weights->ndim != 1){
+  if (weights->type_num != NPY_FLOAT64 || weights->ndim != 1){
     PyErr_Format(PyExc_RuntimeError, "weighted_histogram: weights parameter must be 1D of numpy.float64");
     return NULL;
   }
-  if (histogram->type_num != NPY_FLOAT16 || histogram->ndim != 1){
+  if (histogram->type_num != NPY_FLOAT64 || histogram->ndim != 1){
     PyErr_Format(PyExc_RuntimeError, "weighted_histogram: histogram parameter must be 1D of numpy.float64");
     return NULL;
   }
-  bob::learn::boosting::weighted_histogram(
-    *PyBlitzArrayCxx_AsBlitz<uint16_t,1>(features),
-    *PyBlitzArrayCxx_AsBlitz<double,1>(weights),
-    *PyBlitzArrayCxx_AsBlitz<double,1>(histogram)
-  );
+  if (features->type_num == NPY_UINT8){
+    bob::learn::boosting::weighted_histogram(
+      *PyBlitzArrayCxx_AsBlitz<uint8_t,1>(features),
+      *PyBlitzArrayCxx_AsBlitz<double,1>(weights),
+      *PyBlitzArrayCxx_AsBlitz<double,1>(histogram)
+    );
+  } else {
+    bob::learn::boosting::weighted_histogram(
+      *PyBlitzArrayCxx_AsBlitz<uint16_t,1>(features),
+      *PyBlitzArrayCxx_AsBlitz<double,1>(weights),
+      *PyBlitzArrayCxx_AsBlitz<double,1>(histogram)
+    );
+  }
 
   Py_RETURN_NONE;
 
 }
 
+auto weighted_histograms_doc = bob::extension::FunctionDoc(
+  "weighted_histograms",
+  "Computes the weighted histograms for all features and all outputs at once.",
+  "The histograms are accumulated in a single row-major sweep over the samples, which is much faster than computing one histogram per feature and output."
+)
+.add_prototype("features, weights, [number_of_bins], [sample_indices]", "histograms")
+.add_parameter("features", "array_like <2D, uint8 or uint16>", "The feature vectors, one row per sample")
+.add_parameter("weights", "array_like <2D, float>", "The weights (e.g. the loss gradient) for each sample and output; must have the same number of rows as the features")
+.add_parameter("number_of_bins", "int", "The number of bins of each histogram; must be larger than the maximum feature value; defaults to the maximum feature value + 1")
+.add_parameter("sample_indices", "array_like <1D, int32>", "If given, only the samples (rows) with these indices are accumulated")
+.add_return("histograms", "array_like <3D, float>", "The weighted histograms with shape ``(#features, #bins, #outputs)``")
+;
+
+template <typename T> PyObject* _weighted_histograms(PyBlitzArrayObject* p_features, PyBlitzArrayObject* p_weights, int number_of_bins, PyBlitzArrayObject* p_indices, char** kwlist){
+  const auto features = PyBlitzArrayCxx_AsBlitz<T,2>(p_features, kwlist[0]);
+  const auto weights = PyBlitzArrayCxx_AsBlitz<double,2>(p_weights, kwlist[1]);
+  if (!features || !weights){
+    weighted_histograms_doc.print_usage();
+    return NULL;
+  }
+
+  if (features->extent(0) != weights->extent(0)){
+    PyErr_Format(PyExc_ValueError, "weighted_histograms: features (%d) and weights (%d) must have the same number of samples", features->extent(0), weights->extent(0));
+    return NULL;
+  }
+
+  int maximum = features->size() ? (int)blitz::max(*features) : 0;
+  if (number_of_bins < 0) number_of_bins = maximum + 1;
+  if (number_of_bins <= maximum){
+    PyErr_Format(PyExc_ValueError, "weighted_histograms: the number of bins (%d) must be larger than the maximum feature value (%d)", number_of_bins, maximum);
+    return NULL;
+  }
+
+  blitz::Array<int32_t,1>* indices = 0;
+  if (p_indices){
+    indices = PyBlitzArrayCxx_AsBlitz<int32_t,1>(p_indices, kwlist[3]);
+    if (!indices || !checkSampleIndices(*indices, features->extent(0), kwlist[3])) return NULL;
+  }
+
+  blitz::Array<double,3> histograms(features->extent(1), number_of_bins, weights->extent(1));
+  {
+    ReleaseGIL gil;
+    if (indices){
+      bob::learn::boosting::weighted_histograms(*features, *weights, *indices, histograms);
+    } else {
+      bob::learn::boosting::weighted_histograms(*features, *weights, histograms);
+    }
+  }
+
+  return PyBlitzArrayCxx_AsNumpy(histograms);
+}
+
+PyObject* weighted_histograms(PyObject*, PyObject* args, PyObject* kwargs){
+  char* kwlist[] = {c("features"), c("weights"), c("number_of_bins"), c("sample_indices"), NULL};
+
+  PyBlitzArrayObject* p_features,* p_weights,* p_indices = 0;
+  int number_of_bins = -1;
+  if (!PyArg_ParseTupleAndKeywords(
+    args, kwargs,
+    "O&O&|iO&", kwlist, &PyBlitzArray_Converter, &p_features, &PyBlitzArray_Converter, &p_weights, &number_of_bins, &PyBlitzArray_Converter, &p_indices
+  )){
+    weighted_histograms_doc.print_usage();
+    return NULL;
+  }
+
+  auto _1 = make_safe(p_features), _2 = make_safe(p_weights);
+  auto _3 = make_xsafe(p_indices);
+
+  // uint8 features are processed without conversion
+  if (p_features->type_num == NPY_UINT8){
+    return _weighted_histograms<uint8_t>(p_features, p_weights, number_of_bins, p_indices, kwlist);
+  }
+  return _weighted_histograms<uint16_t>(p_features, p_weights, number_of_bins, p_indices, kwlist);
+}
+
 static PyMethodDef BoostingMethods[] = {
   {
     weighted_histogram_doc.name(),
-    &weighted_histogram,
+    (PyCFunction)&weighted_histogram,
     METH_VARARGS | METH_KEYWORDS,
     weighted_histogram_doc.doc()
   },
+  {
+    weighted_histograms_doc.name(),
+    (PyCFunction)&weighted_histograms,
+    METH_VARARGS | METH_KEYWORDS,
+    weighted_histograms_doc.doc()
+  },
   {NULL}
 };
 
@@ -91,6 +180,9 @@ create_module(void)
 
   if (!init_LossFunction(module)) return NULL;
   if (!init_JesorskyLoss(module)) return NULL;
+  if (!init_ExponentialLoss(module)) return NULL;
+  if (!init_LogitLoss(module)) return NULL;
+  if (!init_TangentialLoss(module)) return NULL;
 
 
   if (!init_WeakMachine(module)) return NULL;
@@ -99,6 +191,7 @@ create_module(void)
   if (!init_BoostedMachine(module)) return NULL;
 
   if (!init_LUTTrainer(module)) return NULL;
+  if (!init_StumpTrainer(module)) return NULL;
 
 
   /* imports C-API dependencies */
@@ -8,18 +8,45 @@
 #include <bob.extension/documentation.h>
 
 #include <boost/shared_ptr.hpp>
+#include <boost/thread/mutex.hpp>
+#include <boost/thread/locks.hpp>
 
 #include <bob.learn.boosting/LossFunction.h>
 #include <bob.learn.boosting/JesorskyLoss.h>
+#include <bob.learn.boosting/ExponentialLoss.h>
+#include <bob.learn.boosting/LogitLoss.h>
+#include <bob.learn.boosting/TangentialLoss.h>
 #include <bob.learn.boosting/WeakMachine.h>
 #include <bob.learn.boosting/StumpMachine.h>
 #include <bob.learn.boosting/LUTMachine.h>
 #include <bob.learn.boosting/BoostedMachine.h>
 #include <bob.learn.boosting/LUTTrainer.h>
+#include <bob.learn.boosting/StumpTrainer.h>
 
 // helper function to convert const char* to char*
 inline char* c(const char* o){return const_cast<char*>(o);}
 
+// helper class that releases the GIL during its lifetime
+// (the GIL is re-acquired in the destructor, i.e., also when an exception is thrown)
+class ReleaseGIL{
+  public:
+    ReleaseGIL() : m_state(PyEval_SaveThread()) {}
+    ~ReleaseGIL() {PyEval_RestoreThread(m_state);}
+  private:
+    PyThreadState* m_state;
+};
+
+// helper function that checks that all sample indices are in range [0, numberOfSamples); raises a ValueError otherwise
+inline bool checkSampleIndices(const blitz::Array<int32_t,1>& sampleIndices, int numberOfSamples, const char* name){
+  for (int k = 0; k < sampleIndices.extent(0); ++k){
+    if (sampleIndices(k) < 0 || sampleIndices(k) >= numberOfSamples){
+      PyErr_Format(PyExc_ValueError, "The parameter '%s' contains the index %d, which is not in the range of the %d training samples", name, (int)sampleIndices(k), numberOfSamples);
+      return false;
+    }
+  }
+  return true;
+}
+
 // Loss function
 typedef struct {
   PyObject_HEAD
@@ -40,6 +67,25 @@ extern PyTypeObject JesorskyLossType;
 
 bool init_JesorskyLoss(PyObject*);
 
+// Classification losses (exponential, logit and tangential loss), which share their bindings
+template <typename Loss>
+struct ClassificationLossObject{
+  LossFunctionObject parent;
+  boost::shared_ptr<Loss> base;
+};
+
+typedef ClassificationLossObject<bob::learn::boosting::ExponentialLoss> ExponentialLossObject;
+typedef ClassificationLossObject<bob::learn::boosting::LogitLoss> LogitLossObject;
+typedef ClassificationLossObject<bob::learn::boosting::TangentialLoss> TangentialLossObject;
+
+extern PyTypeObject ExponentialLossType;
+extern PyTypeObject LogitLossType;
+extern PyTypeObject TangentialLossType;
+
+bool init_ExponentialLoss(PyObject*);
+bool init_LogitLoss(PyObject*);
+bool init_TangentialLoss(PyObject*);
+
 
 // Weak machine
 typedef PyObject*(*CreateFunction)(boost::shared_ptr<bob::learn::boosting::WeakMachine>);
@@ -101,4 +147,19 @@ extern PyTypeObject LUTTrainerType;
 bool init_LUTTrainer(PyObject*);
 
 
+// Stump trainer
+typedef struct {
+  PyObject_HEAD
+  boost::shared_ptr<bob::learn::boosting::StumpTrainer> base;
+  // the training features that were given to the last call of prepare
+  PyBlitzArrayObject* prepared;
+  // serializes the calls of prepare and train, so that train uses the features that it has checked
+  boost::shared_ptr<boost::mutex> lock;
+} StumpTrainerObject;
+
+extern PyTypeObject StumpTrainerType;
+
+bool init_StumpTrainer(PyObject*);
+
+
 #endif // BOB_LEARN_BOOSTING_MAIN_H
@@ -169,22 +169,34 @@ static PyObject* stumpMachine_forward(
   auto _1 = make_safe(p_features), _2 = make_xsafe(p_predictions);
 
   try{
+    const char* n0 = PyBlitzArray_TypenumAsString(NPY_UINT8);
     const char* n1 = PyBlitzArray_TypenumAsString(NPY_UINT16);
     const char* n2 = PyBlitzArray_TypenumAsString(NPY_FLOAT64);
+    const char* n3 = PyBlitzArray_TypenumAsString(NPY_FLOAT32);
     // check for the different ways, the function can be called
-    if (p_features->type_num != NPY_UINT16 && p_features->type_num != NPY_FLOAT64){
-      PyErr_Format(PyExc_TypeError, "The parameter 'features' only supports 1D or 2D arrays of types '%s' or '%s'", n1, n2);
+    if (p_features->type_num != NPY_UINT8 && p_features->type_num != NPY_UINT16 && p_features->type_num != NPY_FLOAT32 && p_features->type_num != NPY_FLOAT64){
+      PyErr_Format(PyExc_TypeError, "The parameter 'features' only supports 1D or 2D arrays of types '%s', '%s', '%s' or '%s'", n0, n1, n3, n2);
       return NULL;
     }
     if (p_features->ndim == 1 && !p_predictions){
       // first way
       double prediction;
       switch (p_features->type_num){
+        case NPY_UINT8:{
+          const auto inputs = PyBlitzArrayCxx_AsBlitz<uint8_t,1>(p_features);
+          prediction = self->base->forward(*inputs);
+          break;
+        }
         case NPY_UINT16:{
           const auto inputs = PyBlitzArrayCxx_AsBlitz<uint16_t,1>(p_features);
           prediction = self->base->forward(*inputs);
           break;
         }
+        case NPY_FLOAT32:{
+          const auto inputs = PyBlitzArrayCxx_AsBlitz<float,1>(p_features);
+          prediction = self->base->forward(*inputs);
+          break;
+        }
         case NPY_FLOAT64:{
           const auto inputs = PyBlitzArrayCxx_AsBlitz<double,1>(p_features);
           prediction = self->base->forward(*inputs);
@@ -203,14 +215,18 @@ static PyObject* stumpMachine_forward(
       switch (p_predictions->ndim){
         case 1:
           switch (p_features->type_num){
+            case NPY_UINT8: _forward<uint8_t,1>(self, p_features, p_predictions); break;
             case NPY_UINT16: _forward<uint16_t,1>(self, p_features, p_predictions); break;
+            case NPY_FLOAT32: _forward<float,1>(self, p_features, p_predictions); break;
             case NPY_FLOAT64: _forward<double,1>(self, p_features, p_predictions); break;
             default: return NULL;
           }
           break;
         case 2:
           switch (p_features->type_num){
+            case NPY_UINT8: _forward<uint8_t,2>(self, p_features, p_predictions); break;
             case NPY_UINT16: _forward<uint16_t,2>(self, p_features, p_predictions); break;
+            case NPY_FLOAT32: _forward<float,2>(self, p_features, p_predictions); break;
             case NPY_FLOAT64: _forward<double,2>(self, p_features, p_predictions); break;
             default: return NULL;
           }
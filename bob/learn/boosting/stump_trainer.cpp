@@ -0,0 +1,424 @@
+#include "main.h"
+
+
+static auto stumpTrainer_doc = bob::extension::ClassDoc(
+  "StumpTrainer",
+  "A trainer for weak stump machines",
+  "The best weak machine is chosen to maximize the dot product of the outputs and the negative loss gradient (gain). "
+  "The sort order of the training features is computed only once (see :py:meth:`prepare`), and re-used in all subsequent calls to :py:meth:`train` with the same training features."
+)
+.add_constructor(
+  bob::extension::FunctionDoc(
+    "__init__",
+    "Initializes a StumpTrainer object",
+    "",
+    true
+  )
+  .add_prototype("[number_of_threads]", "")
+  .add_parameter("number_of_threads", "int", "The number of threads that are used to scan the features during training; the same feature is selected independent of the number of threads; defaults to 1")
+);
+
+
+// Some functions
+static int stumpTrainer_init(
+  StumpTrainerObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  try{
+    char*  kwlist[] = {c("number_of_threads"), NULL};
+    int num_threads = 1;
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs,
+          "|i", kwlist, &num_threads)
+    ){
+      stumpTrainer_doc.print_usage();
+      return -1;
+    }
+
+    if (num_threads < 1){
+      stumpTrainer_doc.print_usage();
+      PyErr_Format(PyExc_ValueError, "The 'number_of_threads' parameter must be positive, but you used %d", num_threads);
+      return -1;
+    }
+
+    self->base.reset(new bob::learn::boosting::StumpTrainer(num_threads));
+    self->lock.reset(new boost::mutex());
+    Py_CLEAR(self->prepared);
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_RuntimeError, ex.what());
+    return -1;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "cannot create new object of type `%s' - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return -1;
+  }
+
+  return 0;
+}
+
+static void stumpTrainer_exit(
+  StumpTrainerObject* self
+)
+{
+  self->base.reset();
+  self->lock.reset();
+  Py_XDECREF(self->prepared);
+  Py_TYPE(self)->tp_free(reinterpret_cast<PyObject*>(self));
+}
+
+
+static auto stumpTrainer_threads_doc = bob::extension::VariableDoc(
+  "number_of_threads",
+  "int",
+  "The number of threads that are used to scan the features during training"
+);
+
+static PyObject* stumpTrainer_threads(
+  StumpTrainerObject* self,
+  void*
+)
+{
+  return Py_BuildValue("i", self->base->numberOfThreads());
+}
+
+
+// locks the trainer until the returned lock is destroyed
+// the GIL is released while waiting, since the thread that holds the lock might need the GIL to finish
+static boost::unique_lock<boost::mutex> _lock(StumpTrainerObject* self){
+  boost::unique_lock<boost::mutex> lock(*self->lock, boost::defer_lock);
+  ReleaseGIL gil;
+  lock.lock();
+  return lock;
+}
+
+// checks whether the given features are the prepared ones, i.e., whether they have the same type, shape, strides and memory
+static bool _isPrepared(StumpTrainerObject* self, PyBlitzArrayObject* p_features){
+  const PyBlitzArrayObject* p_prepared = self->prepared;
+  if (!p_prepared || p_prepared->data != p_features->data || p_prepared->type_num != p_features->type_num || p_prepared->ndim != p_features->ndim) return false;
+  for (Py_ssize_t d = 0; d < p_features->ndim; ++d){
+    if (p_prepared->shape[d] != p_features->shape[d] || p_prepared->stride[d] != p_features->stride[d]) return false;
+  }
+  return true;
+}
+
+// computes the sort order of the given features and keeps a reference to them
+// the trainer must be locked by the caller
+static bool _prepare(StumpTrainerObject* self, PyBlitzArrayObject* p_features){
+  if (p_features->ndim != 2){
+    PyErr_Format(PyExc_TypeError, "The parameter 'training_features' only supports 2D arrays");
+    return false;
+  }
+
+  // features of other types are converted to float
+  // (the sort order stores the feature values, so the converted features are not required after preparation)
+  PyBlitzArrayObject* p_inputs = p_features;
+  boost::shared_ptr<PyBlitzArrayObject> _;
+  if (p_inputs->type_num != NPY_UINT8 && p_inputs->type_num != NPY_UINT16 && p_inputs->type_num != NPY_FLOAT64){
+    p_inputs = reinterpret_cast<PyBlitzArrayObject*>(PyBlitzArray_Cast(p_features, NPY_FLOAT64));
+    if (!p_inputs) return false;
+    _ = make_safe(p_inputs);
+  }
+
+  switch (p_inputs->type_num){
+    case NPY_UINT8:{
+      const auto inputs = PyBlitzArrayCxx_AsBlitz<uint8_t,2>(p_inputs);
+      ReleaseGIL gil;
+      self->base->prepare(*inputs);
+      break;
+    }
+    case NPY_UINT16:{
+      const auto inputs = PyBlitzArrayCxx_AsBlitz<uint16_t,2>(p_inputs);
+      ReleaseGIL gil;
+      self->base->prepare(*inputs);
+      break;
+    }
+    case NPY_FLOAT64:{
+      const auto inputs = PyBlitzArrayCxx_AsBlitz<double,2>(p_inputs);
+      ReleaseGIL gil;
+      self->base->prepare(*inputs);
+      break;
+    }
+  }
+
+  // keep a reference to the prepared features, so that they are identified in the next call to train
+  // (the reference also keeps their memory alive, so that no other features can be allocated at the same address)
+  Py_INCREF(p_features);
+  Py_XDECREF(self->prepared);
+  self->prepared = p_features;
+  return true;
+}
+
+
+static auto stumpTrainer_prepare_doc = bob::extension::FunctionDoc(
+  "prepare",
+  "Computes the sort order of all features",
+  "The sort order is re-used in all subsequent calls to :py:meth:`train` with the same training feature array, i.e., with the same memory, type, shape and strides. "
+  "This function is called automatically by :py:meth:`train` when it receives a different training feature array. "
+  "If the values of the training feature array are modified in-place, please call this function again, since these modifications cannot be detected by :py:meth:`train`.",
+  true
+)
+.add_prototype("training_features")
+.add_parameter("training_features", "uint8, uint16 or float <#samples, #inputs>", "The feature vectors to train the weak machines; features of other types are converted to float")
+;
+
+static PyObject* stumpTrainer_prepare(
+  StumpTrainerObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  try{
+    char* kwlist[] = {c("training_features"), NULL};
+
+    PyBlitzArrayObject* p_features = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O&", kwlist, &PyBlitzArray_Converter, &p_features)){
+      stumpTrainer_prepare_doc.print_usage();
+      return NULL;
+    }
+
+    auto _ = make_safe(p_features);
+
+    auto lock = _lock(self);
+    if (!_prepare(self, p_features)) return NULL;
+    Py_RETURN_NONE;
+
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_RuntimeError, ex.what());
+    return NULL;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "cannot prepare features in `%s' - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return NULL;
+  }
+}
+
+
+// gets the 1D loss gradient from a 1D array or a 2D array with a single column
+static bool _gradient(PyBlitzArrayObject* p_gradient, const char* name, blitz::Array<double,1>& gradient){
+  if (p_gradient->type_num != NPY_FLOAT64 || (p_gradient->ndim != 1 && (p_gradient->ndim != 2 || p_gradient->shape[1] != 1))){
+    PyErr_Format(PyExc_TypeError, "The parameter '%s' only supports 1D arrays or 2D arrays with a single column of type '%s'", name, PyBlitzArray_TypenumAsString(NPY_FLOAT64));
+    return false;
+  }
+  if (p_gradient->ndim == 1){
+    gradient.reference(*PyBlitzArrayCxx_AsBlitz<double,1>(p_gradient));
+  } else {
+    gradient.reference((*PyBlitzArrayCxx_AsBlitz<double,2>(p_gradient))(blitz::Range::all(), 0));
+  }
+  return true;
+}
+
+
+static auto stumpTrainer_train_doc = bob::extension::FunctionDoc(
+  "train",
+  "Trains and returns a weak stump machine",
+  "If the given training features are not the ones that were used in the last call to :py:meth:`prepare`, i.e., if they differ in memory, type, shape or strides, :py:meth:`prepare` is called first.",
+  true
+)
+.add_prototype("training_features, loss_gradient, [sample_indices]", "stump_machine")
+.add_parameter("training_features", "uint8, uint16 or float <#samples, #inputs>", "The feature vectors to train the weak machine; features of other types are converted to float")
+.add_parameter("loss_gradient", "float <#samples> or float <#samples, 1>", "The gradient of the loss function for the training features")
+.add_parameter("sample_indices", "int32 <#selected>", "[Default: ``None``] If given, only the training samples with these indices are used to train the weak machine; the sort order of the features is re-used")
+.add_return("stump_machine", ":py:class:`bob.learn.boosting.StumpMachine`", "The weak machine that is obtained in the current round of boosting")
+;
+
+static PyObject* stumpTrainer_train(
+  StumpTrainerObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  try{
+    // get list of arguments
+    char* kwlist[] = {c("training_features"), c("loss_gradient"), c("sample_indices"), NULL};
+
+    PyBlitzArrayObject* p_features = 0,* p_gradient = 0,* p_indices = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(
+            args, kwargs,
+            "O&O&|O&", kwlist,
+            &PyBlitzArray_Converter, &p_features,
+            &PyBlitzArray_Converter, &p_gradient,
+            &PyBlitzArray_Converter, &p_indices)
+    ){
+      stumpTrainer_train_doc.print_usage();
+      return NULL;
+    }
+
+    auto _1 = make_safe(p_features);
+    auto _2 = make_safe(p_gradient);
+    auto _3 = make_xsafe(p_indices);
+
+    blitz::Array<double,1> gradient;
+    if (!_gradient(p_gradient, kwlist[1], gradient)) return NULL;
+
+    blitz::Array<int32_t,1>* indices = 0;
+    if (p_indices){
+      indices = PyBlitzArrayCxx_AsBlitz<int32_t,1>(p_indices, kwlist[2]);
+      if (!indices || !checkSampleIndices(*indices, gradient.extent(0), kwlist[2])) return NULL;
+    }
+
+    // the lock is held until the machine is trained, so that no other thread replaces the checked sort order
+    auto lock = _lock(self);
+
+    // compute the sort order of the features only when they changed
+    if (!_isPrepared(self, p_features) && !_prepare(self, p_features)) return NULL;
+
+    boost::shared_ptr<bob::learn::boosting::StumpMachine> machine;
+    {
+      // the GIL is not required while the features are scanned
+      ReleaseGIL gil;
+      if (indices){
+        machine = self->base->train(gradient, *indices);
+      } else {
+        machine = self->base->train(gradient);
+      }
+    }
+    return createMachine(boost::dynamic_pointer_cast<bob::learn::boosting::WeakMachine>(machine));
+
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_RuntimeError, ex.what());
+    return NULL;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "cannot create new object of type `%s' - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return NULL;
+  }
+}
+
+
+static auto stumpTrainer_computeThreshold_doc = bob::extension::FunctionDoc(
+  "compute_threshold",
+  "Computes the stump classifier threshold for a single feature",
+  "The threshold is computed for the given feature values using the weak learner algorithm of Viola Jones.",
+  true
+)
+.add_prototype("features, gradient", "polarity, threshold, gain")
+.add_parameter("features", "float <#samples>", "The feature values for a single index")
+.add_parameter("gradient", "float <#samples>", "The negative loss gradient values for the training samples")
+.add_return("polarity", "float", "The polarity or the direction used for stump classification")
+.add_return("threshold", "float", "The threshold that minimizes the error")
+.add_return("gain", "float", "The gain of the classifier")
+;
+
+static PyObject* stumpTrainer_computeThreshold(
+  StumpTrainerObject* self,
+  PyObject* args,
+  PyObject* kwargs
+)
+{
+  try{
+    char* kwlist[] = {c("features"), c("gradient"), NULL};
+
+    PyBlitzArrayObject* p_features = 0,* p_gradient = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(
+            args, kwargs,
+            "O&O&", kwlist,
+            &PyBlitzArray_Converter, &p_features,
+            &PyBlitzArray_Converter, &p_gradient)
+    ){
+      stumpTrainer_computeThreshold_doc.print_usage();
+      return NULL;
+    }
+
+    auto _1 = make_safe(p_features), _2 = make_safe(p_gradient);
+
+    // features and gradients of any type are converted to float
+    PyBlitzArrayObject* p_float_features = reinterpret_cast<PyBlitzArrayObject*>(PyBlitzArray_Cast(p_features, NPY_FLOAT64));
+    if (!p_float_features) return NULL;
+    auto _3 = make_safe(p_float_features);
+    PyBlitzArrayObject* p_float_gradient = reinterpret_cast<PyBlitzArrayObject*>(PyBlitzArray_Cast(p_gradient, NPY_FLOAT64));
+    if (!p_float_gradient) return NULL;
+    auto _4 = make_safe(p_float_gradient);
+
+    auto features = PyBlitzArrayCxx_AsBlitz<double,1>(p_float_features, kwlist[0]);
+    blitz::Array<double,1> gradient;
+    if (!features || !_gradient(p_float_gradient, kwlist[1], gradient)){
+      stumpTrainer_computeThreshold_doc.print_usage();
+      return NULL;
+    }
+
+    double polarity, threshold, gain;
+    self->base->computeThreshold(*features, gradient, polarity, threshold, gain);
+    return Py_BuildValue("ddd", polarity, threshold, gain);
+
+  } catch (std::exception& ex) {
+    PyErr_SetString(PyExc_RuntimeError, ex.what());
+    return NULL;
+  }
+  catch (...) {
+    PyErr_Format(PyExc_RuntimeError, "cannot compute threshold in `%s' - unknown exception thrown", Py_TYPE(self)->tp_name);
+    return NULL;
+  }
+}
+
+
+
+// bind the class
+static PyGetSetDef stumpTrainer_Getters[] = {
+  {
+    stumpTrainer_threads_doc.name(),
+    (getter)stumpTrainer_threads,
+    NULL,
+    stumpTrainer_threads_doc.doc(),
+    NULL
+  },
+  {NULL}
+};
+
+static PyMethodDef stumpTrainer_Methods[] = {
+  {
+    stumpTrainer_prepare_doc.name(),
+    (PyCFunction)stumpTrainer_prepare,
+    METH_VARARGS | METH_KEYWORDS,
+    stumpTrainer_prepare_doc.doc(),
+  },
+  {
+    stumpTrainer_train_doc.name(),
+    (PyCFunction)stumpTrainer_train,
+    METH_VARARGS | METH_KEYWORDS,
+    stumpTrainer_train_doc.doc(),
+  },
+  {
+    stumpTrainer_computeThreshold_doc.name(),
+    (PyCFunction)stumpTrainer_computeThreshold,
+    METH_VARARGS | METH_KEYWORDS,
+    stumpTrainer_computeThreshold_doc.doc(),
+  },
+  {NULL}
+};
+
+
+// Define Stump Trainer Type object; will be filled later
+PyTypeObject StumpTrainerType = {
+  PyVarObject_HEAD_INIT(0,0)
+  0
+};
+
+
+bool init_StumpTrainer(PyObject* module)
+{
+
+  // initialize the StumpTrainerType struct
+  StumpTrainerType.tp_name = stumpTrainer_doc.name();
+  StumpTrainerType.tp_basicsize = sizeof(StumpTrainerObject);
+  StumpTrainerType.tp_flags = Py_TPFLAGS_DEFAULT;
+  StumpTrainerType.tp_doc = stumpTrainer_doc.doc();
+
+  // set the functions
+  StumpTrainerType.tp_new = PyType_GenericNew;
+  StumpTrainerType.tp_init = reinterpret_cast<initproc>(stumpTrainer_init);
+  StumpTrainerType.tp_dealloc = reinterpret_cast<destructor>(stumpTrainer_exit);
+  StumpTrainerType.tp_getset = stumpTrainer_Getters;
+  StumpTrainerType.tp_methods = stumpTrainer_Methods;
+
+  // check that everyting is fine
+  if (PyType_Ready(&StumpTrainerType) < 0)
+    return false;
+
+  // add the type to the module
+  Py_INCREF(&StumpTrainerType);
+  return PyModule_AddObject(module, stumpTrainer_doc.name(), (PyObject*)&StumpTrainerType) >= 0;
+}
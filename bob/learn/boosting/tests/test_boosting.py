@@ -1,4 +1,6 @@
 import unittest
+import os
+import tempfile
 import bob.learn.boosting
 import numpy
 import bob
@@ -179,3 +181,201 @@ class TestBoosting(unittest.TestCase):
     # assert that 294 (out of 360) labels are correctly classified by a single feature position
     self.assertTrue(all([numpy.allclose(numpy.abs(scores[i]), weights) for i in range(labels.shape[0])]))
     self.assertEqual(numpy.count_nonzero(labels == aligned), 294)
+
+
+  def test05_line_search(self):
+    # get test input data
+    digits = [1, 4, 7, 9]
+    inputs, targets = self._data(digits)
+    aligned = self._align_multi(targets, digits)
+
+    # the closed form and Newton line searches should find the same weights as L-BFGS
+    for loss_function, weak_trainer, features, labels in (
+        (bob.learn.boosting.ExponentialLoss(), bob.learn.boosting.StumpTrainer(), inputs[:,:100].astype(numpy.float64), aligned[:,:1]),
+        (bob.learn.boosting.LogitLoss(), bob.learn.boosting.LUTTrainer(256, len(digits), "independent"), inputs.astype(numpy.uint16), aligned),
+    ):
+      reference = bob.learn.boosting.Boosting(weak_trainer, loss_function, 'lbfgs').train(features, labels, number_of_rounds=3)
+      for line_search in ('auto', 'newton'):
+        machine = bob.learn.boosting.Boosting(weak_trainer, loss_function, line_search).train(features, labels, number_of_rounds=3)
+        self.assertTrue(numpy.allclose(machine.weights, reference.weights, rtol=1e-4))
+        self.assertTrue(numpy.all(machine.indices == reference.indices))
+
+    # user-defined line searches can be used as well
+    machine = bob.learn.boosting.Boosting(bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.LogitLoss(), lambda targets, previous, current: numpy.ones(1)).train(inputs.astype(numpy.uint16), aligned[:,:1], number_of_rounds=2)
+    self.assertTrue(numpy.allclose(machine.weights, 1.))
+    self.assertRaises(ValueError, bob.learn.boosting.Boosting, bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.LogitLoss(), 'unknown')
+
+
+  def test06_early_stopping(self):
+    # get training and validation data
+    inputs, targets = self._data(count = 40)
+    aligned = self._align_uni(targets)
+    training, validation = inputs[::2].astype(numpy.uint16), inputs[1::2].astype(numpy.uint16)
+    training_targets, validation_targets = aligned[::2], aligned[1::2]
+
+    loss_function = bob.learn.boosting.LogitLoss()
+    booster = bob.learn.boosting.Boosting(bob.learn.boosting.LUTTrainer(256), loss_function)
+    patience = 3
+
+    # compute the validation loss after each round of a complete training
+    machine = booster.train(training, training_targets, number_of_rounds=30)
+    staged = machine.staged_forward(validation)
+    losses = [numpy.sum(loss_function.loss(validation_targets[:,numpy.newaxis], numpy.zeros((40,1))))]
+    losses += [numpy.sum(loss_function.loss(validation_targets[:,numpy.newaxis], staged[:,r:r+1])) for r in range(staged.shape[1])]
+
+    # find the round with the lowest loss, as early stopping does
+    best, stopped = 0, False
+    for r in range(1, len(losses)):
+      if losses[r] < losses[best]:
+        best = r
+      elif r - best >= patience:
+        stopped = True
+        break
+
+    early = booster.train(training, training_targets, number_of_rounds=30, validation_features=validation, validation_targets=validation_targets, patience=patience)
+    self.assertEqual(len(early.weak_machines), best)
+    self.assertTrue(numpy.allclose(early.weights, machine.weights[:best]))
+    # a given machine is not changed by early stopping
+    given = booster.train(training, training_targets, number_of_rounds=2)
+    continued = booster.train(training, training_targets, number_of_rounds=30, boosted_machine=given, validation_features=validation, validation_targets=validation_targets, patience=patience)
+    self.assertEqual(len(given.weak_machines), 2)
+    self.assertTrue(len(continued.weak_machines) >= 2)
+    self.assertTrue((continued.weights[:2] == given.weights).all())
+
+    # resuming after early stopping returns the early stopped machine
+    self.assertTrue(stopped)
+    checkpoint = tempfile.mkstemp(prefix = "xbbst_", suffix=".hdf5")[1]
+    os.remove(checkpoint)
+    booster.train(training, training_targets, number_of_rounds=30, validation_features=validation, validation_targets=validation_targets, patience=patience, checkpoint_file=checkpoint)
+    resumed = booster.train(training, training_targets, number_of_rounds=40, validation_features=validation, validation_targets=validation_targets, patience=patience, checkpoint_file=checkpoint)
+    os.remove(checkpoint)
+    self.assertEqual(len(resumed.weak_machines), best)
+    self.assertTrue((resumed.weights == early.weights).all())
+
+    self.assertRaises(ValueError, booster.train, training, training_targets, 2, None, validation)
+
+
+  def test07_checkpoint(self):
+    # get training data
+    inputs, targets = self._data()
+    aligned = self._align_uni(targets)
+    inputs = inputs.astype(numpy.uint16)
+
+    booster = bob.learn.boosting.Boosting(bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.ExponentialLoss())
+    machine = booster.train(inputs, aligned, number_of_rounds=8)
+
+    # train the first rounds only and write the checkpoint file
+    checkpoint = tempfile.mkstemp(prefix = "xbbst_", suffix=".hdf5")[1]
+    os.remove(checkpoint)
+    first = booster.train(inputs, aligned, number_of_rounds=5, checkpoint_file=checkpoint, checkpoint_rounds=2)
+    self.assertTrue(os.path.exists(checkpoint))
+    self.assertEqual(len(first.weak_machines), 5)
+
+    # resume the training; the result must be identical to the uninterrupted training
+    resumed = booster.train(inputs, aligned, number_of_rounds=8, checkpoint_file=checkpoint)
+    self.assertEqual(len(resumed.weak_machines), 8)
+    self.assertTrue((resumed.weights == machine.weights).all())
+    self.assertTrue((resumed.indices == machine.indices).all())
+
+    # a machine cannot be given when resuming
+    self.assertRaises(ValueError, booster.train, inputs, aligned, 10, machine, checkpoint_file=checkpoint)
+    os.remove(checkpoint)
+
+    # the random selection of features and samples is resumed as well
+    def random_booster():
+      return bob.learn.boosting.Boosting(bob.learn.boosting.LUTTrainer(256, feature_fraction=0.5, seed=3), bob.learn.boosting.ExponentialLoss(), subsample=0.5)
+    numpy.random.seed(5)
+    machine = random_booster().train(inputs, aligned, number_of_rounds=8)
+    numpy.random.seed(5)
+    random_booster().train(inputs, aligned, number_of_rounds=5, checkpoint_file=checkpoint)
+    numpy.random.seed(6)
+    resumed = random_booster().train(inputs, aligned, number_of_rounds=8, checkpoint_file=checkpoint)
+    self.assertTrue((resumed.weights == machine.weights).all())
+    self.assertTrue((resumed.indices == machine.indices).all())
+    os.remove(checkpoint)
+
+
+  def test08_subsampling(self):
+    # get training data
+    inputs, targets = self._data()
+    aligned = self._align_uni(targets)
+    inputs = inputs.astype(numpy.uint16)
+
+    for sampling in ('uniform', 'goss'):
+      booster = bob.learn.boosting.Boosting(bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.ExponentialLoss(), subsample=0.5, sampling=sampling, random_seed=42)
+      machine1 = booster.train(inputs, aligned, number_of_rounds=5)
+      machine2 = booster.train(inputs, aligned, number_of_rounds=5)
+      self.assertEqual(len(machine1.weak_machines), 5)
+      # the selected samples depend only on the seed
+      self.assertTrue((machine1.weights == machine2.weights).all())
+      self.assertTrue((machine1.indices == machine2.indices).all())
+
+    # goss amplifies a copy of the loss gradient only
+    booster = bob.learn.boosting.Boosting(bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.ExponentialLoss(), subsample=0.5, sampling='goss', random_seed=42)
+    loss_gradient = numpy.random.RandomState(42).randn(40, 1)
+    original = loss_gradient.copy()
+    sample_indices, weak_gradient = booster._select_samples(loss_gradient, 0)
+    self.assertEqual(len(sample_indices), 20)
+    self.assertTrue((loss_gradient == original).all())
+    self.assertTrue((numpy.abs(weak_gradient) >= numpy.abs(original)).all())
+    self.assertFalse((weak_gradient == original).all())
+
+    self.assertRaises(ValueError, bob.learn.boosting.Boosting, bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.ExponentialLoss(), subsample=0.)
+    self.assertRaises(ValueError, bob.learn.boosting.Boosting, bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.ExponentialLoss(), sampling='unknown')
+    # the line search does not support the amplified samples of goss
+    self.assertRaises(ValueError, bob.learn.boosting.Boosting, bob.learn.boosting.LUTTrainer(256), bob.learn.boosting.ExponentialLoss(), subsample=0.5, sampling='goss', subsample_line_search=True)
+
+
+  def test09_weight_trimming(self):
+    # get training data
+    inputs, targets = self._data()
+    aligned = self._align_uni(targets)
+    inputs = inputs.astype(numpy.uint16)
+
+    # record the samples that the weak trainer gets in each round
+    class RecordingTrainer:
+      def __init__(self):
+        self.trainer = bob.learn.boosting.LUTTrainer(256)
+        self.sample_indices = []
+      def train(self, features, loss_gradient, sample_indices = None):
+        self.sample_indices.append(sample_indices)
+        if sample_indices is None:
+          return self.trainer.train(features, loss_gradient)
+        return self.trainer.train(features, loss_gradient, sample_indices)
+
+    trainer = RecordingTrainer()
+    booster = bob.learn.boosting.Boosting(trainer, bob.learn.boosting.ExponentialLoss(), trim_fraction=0.9, trim_refresh_rounds=3)
+    machine = booster.train(inputs, aligned, number_of_rounds=6)
+    self.assertEqual(len(machine.weak_machines), 6)
+
+    # all samples are used in the refresh rounds, and less samples in the other rounds
+    for round, sample_indices in enumerate(trainer.sample_indices):
+      if round % 3 == 0:
+        self.assertTrue(sample_indices is None)
+      else:
+        self.assertTrue(len(sample_indices) < inputs.shape[0])
+        self.assertTrue((numpy.diff(sample_indices) > 0).all())
+
+    self.assertRaises(ValueError, bob.learn.boosting.Boosting, trainer, bob.learn.boosting.ExponentialLoss(), trim_fraction=0.)
+
+
+  def test10_native_losses(self):
+    # get test input data
+    digits = [1, 4, 7, 9]
+    inputs, targets = self._data(digits)
+    aligned = self._align_multi(targets, digits)
+    inputs = inputs.astype(numpy.uint16)
+
+    # the native losses provide neither optimal_alpha nor loss_hessian, so they always use L-BFGS;
+    # they should select the same weak machines with the same weights as the python losses
+    for loss_function, native, labels in (
+        (bob.learn.boosting.ExponentialLoss(), bob.learn.boosting.NativeExponentialLoss(), aligned[:,:1]),
+        (bob.learn.boosting.LogitLoss(), bob.learn.boosting.NativeLogitLoss(number_of_threads = 2), aligned),
+        (bob.learn.boosting.TangentialLoss(), bob.learn.boosting.NativeTangentialLoss(), aligned),
+    ):
+      weak_trainer = bob.learn.boosting.LUTTrainer(256, labels.shape[1])
+      reference = bob.learn.boosting.Boosting(weak_trainer, loss_function, 'lbfgs').train(inputs, labels, number_of_rounds=3)
+      machine = bob.learn.boosting.Boosting(weak_trainer, native).train(inputs, labels, number_of_rounds=3)
+      self.assertEqual(len(machine.weak_machines), 3)
+      self.assertTrue(numpy.all(machine.indices == reference.indices))
+      self.assertTrue(numpy.allclose(machine.weights, reference.weights, rtol=1e-4))
@@ -1,5 +1,6 @@
 import unittest
 import random
+import threading
 import bob.learn.boosting
 import numpy
 
@@ -165,3 +166,92 @@ class TestExponentialLoss(unittest.TestCase):
 
     self.assertTrue((val4 == grad_sum_val).all())
 
+
+
+  def test05_optimal_alpha(self):
+    # Check that the closed form weight minimizes the loss sum
+
+    loss_function = bob.learn.boosting.ExponentialLoss()
+    targets = numpy.array([[1, -1], [-1, 1], [1, 1], [-1, -1], [1, -1]], 'float64')
+    weak_scores = numpy.array([[1, -1], [-1, -1], [1, 1], [1, -1], [1, 1]], 'float64')
+    prev_scores = numpy.array([[0.1, 0.2], [0.3, 0.4], [-0.5, 0.6], [0.7, -0.8], [0.9, 1.0]], 'float64')
+
+    alpha = loss_function.optimal_alpha(targets, prev_scores, weak_scores)
+    self.assertEqual(alpha.shape, (2,))
+
+    # the gradient of the loss sum vanishes at the optimal alpha
+    grad_sum = loss_function.loss_gradient_sum(alpha, targets, prev_scores, weak_scores)
+    self.assertTrue(numpy.allclose(grad_sum, 0.))
+
+    # the second derivative is positive, i.e., alpha is a minimum
+    hess_sum = loss_function.loss_hessian_sum(alpha, targets, prev_scores, weak_scores)
+    self.assertTrue((hess_sum > 0).all())
+
+    # there is no closed form solution for real-valued weak scores or separable data
+    self.assertTrue(loss_function.optimal_alpha(targets, prev_scores, weak_scores * 0.5) is None)
+    self.assertTrue(loss_function.optimal_alpha(targets, prev_scores, targets) is None)
+
+
+  def test06_sample_weights(self):
+    # Check that the updated sample weights are identical to the loss of the updated scores
+
+    loss_function = bob.learn.boosting.ExponentialLoss()
+    targets = numpy.array([[1, -1], [-1, 1], [1, 1], [-1, -1], [1, -1]], 'float64')
+    prev_scores = numpy.array([[0.1, 0.2], [0.3, 0.4], [-0.5, 0.6], [0.7, -0.8], [0.9, 1.0]], 'float64')
+    alpha = numpy.array([0.3, -0.7])
+
+    # check discrete and real-valued weak scores
+    for weak_scores in (numpy.array([[1, -1], [-1, -1], [1, 1], [1, -1], [1, 1]], 'float64'), prev_scores[::-1] * 2.):
+      weights = loss_function.sample_weights(targets, prev_scores)
+      loss_function.update_sample_weights(weights, targets, alpha, weak_scores)
+
+      curr_scores = prev_scores + alpha * weak_scores
+      self.assertTrue(numpy.allclose(weights, loss_function.loss(targets, curr_scores)))
+      self.assertTrue(numpy.allclose(loss_function.loss_gradient_from_weights(targets, weights), loss_function.loss_gradient(targets, curr_scores)))
+
+
+  def test07_native(self):
+    # Check that the native implementation computes the same values as the python implementation
+    loss_function = bob.learn.boosting.ExponentialLoss()
+    targets = numpy.array([[1, -1], [-1, 1], [1, 1], [-1, -1], [1, -1]], 'float64')
+    prev_scores = numpy.array([[0.5, -0.3], [1.2, 0.1], [-2.0, 0.7], [0.4, -1.5], [0., 0.]], 'float64')
+    weak_scores = numpy.array([[1, -1], [1, 1], [-1, 1], [1, -1], [-1, -1]], 'float64')
+    alpha = numpy.array([0.3, -0.2])
+
+    for number_of_threads in (1, 3):
+      native = bob.learn.boosting.NativeExponentialLoss(number_of_threads = number_of_threads)
+      self.assertEqual(native.number_of_threads, number_of_threads)
+
+      self.assertTrue(numpy.allclose(native.loss(targets, prev_scores), loss_function.loss(targets, prev_scores)))
+      self.assertTrue(numpy.allclose(native.loss_gradient(targets, prev_scores), loss_function.loss_gradient(targets, prev_scores)))
+      self.assertTrue(numpy.allclose(native.loss_sum(alpha, targets, prev_scores, weak_scores), loss_function.loss_sum(alpha, targets, prev_scores, weak_scores)))
+      self.assertTrue(numpy.allclose(native.loss_gradient_sum(alpha, targets, prev_scores, weak_scores), loss_function.loss_gradient_sum(alpha, targets, prev_scores, weak_scores)))
+
+      loss_sum, grad_sum = native.loss_and_gradient_sum(alpha, targets, prev_scores, weak_scores)
+      self.assertTrue((loss_sum == native.loss_sum(alpha, targets, prev_scores, weak_scores)).all())
+      self.assertTrue((grad_sum == native.loss_gradient_sum(alpha, targets, prev_scores, weak_scores)).all())
+
+    self.assertRaises(ValueError, bob.learn.boosting.NativeExponentialLoss, 0)
+
+
+  def test08_concurrent(self):
+    # Check that one native loss function can be used by several python threads at the same time, since the GIL is released
+    native = bob.learn.boosting.NativeExponentialLoss(number_of_threads = 2)
+    numpy.random.seed(7)
+    targets = numpy.sign(numpy.random.randn(1000, 2))
+    prev_scores = numpy.random.randn(1000, 2)
+    alphas = [numpy.random.randn(2) for i in range(8)]
+    weak_scores = [numpy.sign(numpy.random.randn(1000, 2)) for i in range(8)]
+    expected = [native.loss_and_gradient_sum(alphas[i], targets, prev_scores, weak_scores[i]) for i in range(8)]
+
+    results = [None] * 8
+    def compute(i):
+      for repetition in range(10):
+        results[i] = native.loss_and_gradient_sum(alphas[i], targets, prev_scores, weak_scores[i])
+    threads = [threading.Thread(target = compute, args = (i,)) for i in range(8)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    for i in range(8):
+      self.assertTrue((results[i][0] == expected[i][0]).all())
+      self.assertTrue((results[i][1] == expected[i][1]).all())
@@ -40,3 +40,54 @@ class TestJesorskyLoss(unittest.TestCase):
     self.assertTrue(grad_sum.shape[0] == num_outputs)
 
 
+
+
+  def test02_loss_and_gradient_sum(self):
+
+    # Check that the combined loss and gradient sums are identical to the separate ones
+
+    loss_function = bob.learn.boosting.JesorskyLoss()
+    targets = numpy.array([[10, 10, 10, 30], [12, 11, 13, 29]], 'float64')
+    alpha = numpy.array([0.5, 0.5, 0.5, 0.5])
+    weak_scores = numpy.array([[0.2, 0.4, 0.5, 0.6], [0.5, 0.5, 0.5, 0.5]], 'float64')
+    prev_scores = numpy.array([[0.1, 0.2, 0.3, 0.4], [0.5, 0.5, 0.5, 0.5]], 'float64')
+
+    loss_sum, grad_sum = loss_function.loss_and_gradient_sum(alpha, targets, prev_scores, weak_scores)
+    self.assertTrue((loss_sum == loss_function.loss_sum(alpha, targets, prev_scores, weak_scores)).all())
+    self.assertTrue((grad_sum == loss_function.loss_gradient_sum(alpha, targets, prev_scores, weak_scores)).all())
+
+    # the results are written into the given arrays
+    loss_out, grad_out = numpy.zeros(1), numpy.zeros(4)
+    result = loss_function.loss_and_gradient_sum(alpha, targets, prev_scores, weak_scores, loss_out, grad_out)
+    self.assertTrue(result[0] is loss_out and result[1] is grad_out)
+    self.assertTrue((grad_out == grad_sum).all())
+    self.assertRaises(ValueError, loss_function.loss_and_gradient_sum, alpha, targets, prev_scores, weak_scores, loss_out, numpy.zeros(3))
+
+
+  def test03_threads_and_cache(self):
+
+    # Check that the results do not depend on the number of threads, and that changed targets are taken into account
+
+    targets = numpy.array([[10, 10, 10, 30, 20, 20], [12, 11, 13, 29, 21, 18], [9, 12, 11, 31, 22, 19]], 'float64')
+    scores = numpy.array([[8, 9, 7, 34, 19, 21], [11, 6, 16, 26, 20, 20], [10, 10, 10, 30, 20, 20]], 'float64')
+    alpha = numpy.array([0.5, 0.5, 0.5, 0.5, 0.5, 0.5])
+    weak_scores = numpy.array([[0.2, 0.4, 0.5, 0.6, 0.1, 0.3], [0.5, 0.5, 0.5, 0.5, 0.5, 0.5], [-0.5, 0.5, -0.5, 0.5, -0.5, 0.5]], 'float64')
+
+    loss_function = bob.learn.boosting.JesorskyLoss()
+    threaded = bob.learn.boosting.JesorskyLoss(number_of_threads = 2)
+    self.assertEqual(loss_function.number_of_threads, 1)
+    self.assertEqual(threaded.number_of_threads, 2)
+
+    self.assertTrue(numpy.allclose(threaded.loss(targets, scores), loss_function.loss(targets, scores)))
+    self.assertTrue(numpy.allclose(threaded.loss_gradient(targets, scores), loss_function.loss_gradient(targets, scores)))
+    self.assertTrue(numpy.allclose(threaded.loss_sum(alpha, targets, scores, weak_scores), loss_function.loss_sum(alpha, targets, scores, weak_scores)))
+    self.assertTrue(numpy.allclose(threaded.loss_gradient_sum(alpha, targets, scores, weak_scores), loss_function.loss_gradient_sum(alpha, targets, scores, weak_scores)))
+
+    # the error of the first sample is normalized by its inter-eye-distance of 20
+    self.assertAlmostEqual(loss_function.loss(targets, scores)[0,0], (numpy.sqrt(5.) + numpy.sqrt(25.) + numpy.sqrt(2.)) / 20.)
+
+    # change the eye positions of the targets in place, so that the cached inter-eye-distances are invalid
+    targets[0,3] = 50
+    self.assertAlmostEqual(loss_function.loss(targets, scores)[0,0], (numpy.sqrt(5.) + numpy.sqrt(3.**2 + 16.**2) + numpy.sqrt(2.)) / 40.)
+
+    self.assertRaises(ValueError, bob.learn.boosting.JesorskyLoss, 0)
@@ -149,3 +149,61 @@ class TestLogitLoss (unittest.TestCase):
     grad = -targets * temp *(1/ (1 + temp))
     val4 = sum(grad * weak_scores)
     self.assertTrue((val4 == grad_sum).all())
+
+
+  def test05_hessian(self):
+    # Check the second derivative of the loss against finite differences of the gradient
+
+    loss_function = bob.learn.boosting.LogitLoss()
+    targets = numpy.array([[1, -1], [-1, 1], [1, 1]], 'float64')
+    score = numpy.array([[0.5, -0.3], [1.2, 0.1], [-2.0, 0.7]], 'float64')
+    eps = 1e-6
+
+    hess_value = loss_function.loss_hessian(targets, score)
+    val1 = (loss_function.loss_gradient(targets, score + eps) - loss_function.loss_gradient(targets, score - eps)) / (2. * eps)
+    self.assertTrue(numpy.allclose(hess_value, val1))
+    self.assertTrue((hess_value > 0).all())
+
+
+  def test06_loss_and_gradient_sum(self):
+    # Check that the combined loss and gradient sums are identical to the separate ones
+
+    loss_function = bob.learn.boosting.LogitLoss()
+    targets = numpy.array([[1, -1], [-1, 1], [1, 1]], 'float64')
+    prev_scores = numpy.array([[0.5, -0.3], [1.2, 0.1], [-2.0, 0.7]], 'float64')
+    weak_scores = numpy.array([[1, -1], [1, 1], [-1, 1]], 'float64')
+    alpha = numpy.array([0.3, -0.2])
+
+    loss_sum, grad_sum = loss_function.loss_and_gradient_sum(alpha, targets, prev_scores, weak_scores)
+    self.assertTrue((loss_sum == loss_function.loss_sum(alpha, targets, prev_scores, weak_scores)).all())
+    self.assertTrue((grad_sum == loss_function.loss_gradient_sum(alpha, targets, prev_scores, weak_scores)).all())
+
+    # the results are written into the given arrays
+    loss_out, grad_out = numpy.zeros(2), numpy.zeros(2)
+    result = loss_function.loss_and_gradient_sum(alpha, targets, prev_scores, weak_scores, loss_out, grad_out)
+    self.assertTrue(result[0] is loss_out and result[1] is grad_out)
+    self.assertTrue((loss_out == loss_sum).all())
+    self.assertTrue((grad_out == grad_sum).all())
+
+
+  def test07_native(self):
+    # Check that the native implementations compute the same values as the python implementations
+    targets = numpy.array([[1, -1], [-1, 1], [1, 1], [-1, -1], [1, -1]], 'float64')
+    prev_scores = numpy.array([[0.5, -0.3], [1.2, 0.1], [-2.0, 0.7], [0.4, -1.5], [0., 0.]], 'float64')
+    weak_scores = numpy.array([[1, -1], [1, 1], [-1, 1], [1, -1], [-1, -1]], 'float64')
+    alpha = numpy.array([0.3, -0.2])
+
+    for loss_function, native_type in ((bob.learn.boosting.LogitLoss(), bob.learn.boosting.NativeLogitLoss), (bob.learn.boosting.TangentialLoss(), bob.learn.boosting.NativeTangentialLoss)):
+      for number_of_threads in (1, 3):
+        native = native_type(number_of_threads)
+
+        self.assertTrue(numpy.allclose(native.loss(targets, prev_scores), loss_function.loss(targets, prev_scores)))
+        self.assertTrue(numpy.allclose(native.loss_gradient(targets, prev_scores), loss_function.loss_gradient(targets, prev_scores)))
+        self.assertTrue(numpy.allclose(native.loss_sum(alpha, targets, prev_scores, weak_scores), loss_function.loss_sum(alpha, targets, prev_scores, weak_scores)))
+        self.assertTrue(numpy.allclose(native.loss_gradient_sum(alpha, targets, prev_scores, weak_scores), loss_function.loss_gradient_sum(alpha, targets, prev_scores, weak_scores)))
+
+        # the results are written into the given arrays
+        loss_out, grad_out = numpy.zeros(2), numpy.zeros(2)
+        result = native.loss_and_gradient_sum(alpha, targets, prev_scores, weak_scores, loss_out, grad_out)
+        self.assertTrue(result[0] is loss_out and result[1] is grad_out)
+        self.assertTrue(numpy.allclose(loss_out, loss_function.loss_sum(alpha, targets, prev_scores, weak_scores)))
@@ -4,6 +4,7 @@ import bob
 import nose
 import os
 import tempfile
+import threading
 import bob.io.base
 
 
@@ -83,5 +84,296 @@ def test_machine():
   nose.tools.eq_(scores[0], 2)
   nose.tools.eq_(labels[0], 1)
 
+
+def test_threaded_forward():
+  # test that the predictions of the boosted machine are identical for any number of threads
+  numpy.random.seed(42)
+  features = numpy.random.randint(0, 16, (1001, 10)).astype(numpy.uint16)
+
+  # uni-variate
+  boosted_machine = bob.learn.boosting.BoostedMachine()
+  for i in range(20):
+    boosted_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(16), i % 10), numpy.random.rand())
+
+  scores = numpy.ndarray((1001,), numpy.float64)
+  labels = numpy.ndarray((1001,), numpy.float64)
+  boosted_machine(features, scores, labels)
+  for number_of_threads in (2, 7, 2000):
+    threaded_scores = numpy.ndarray((1001,), numpy.float64)
+    threaded_labels = numpy.ndarray((1001,), numpy.float64)
+    boosted_machine(features, threaded_scores, threaded_labels, number_of_threads = number_of_threads)
+    assert (scores == threaded_scores).all()
+    assert (labels == threaded_labels).all()
+
+  # single feature vectors can be evaluated by several Python threads at the same time
+  results = [None] * 4
+  def forward(t):
+    results[t] = [boosted_machine(features[i]) for i in range(t, 1001, 4)]
+  threads = [threading.Thread(target=forward, args=(t,)) for t in range(4)]
+  for thread in threads: thread.start()
+  for thread in threads: thread.join()
+  for t in range(4):
+    assert numpy.allclose(results[t], scores[t::4])
+
+  # multi-variate
+  boosted_machine = bob.learn.boosting.BoostedMachine()
+  for i in range(20):
+    indices = numpy.random.randint(0, 10, 3).astype(numpy.int32)
+    boosted_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(16, 3), indices), numpy.random.rand(3))
+
+  scores = numpy.ndarray((1001, 3), numpy.float64)
+  boosted_machine(features, scores)
+  threaded_scores = numpy.ndarray((1001, 3), numpy.float64)
+  boosted_machine(features, threaded_scores, number_of_threads = 4)
+  assert (scores == threaded_scores).all()
+
+  nose.tools.assert_raises(ValueError, boosted_machine, features, scores, number_of_threads = 0)
+
+
+def test_compiled_forward():
+  # test that the compiled machine computes the same predictions as the weak machines
+  numpy.random.seed(7)
+  features = numpy.random.randint(0, 16, (100, 10)).astype(numpy.uint16)
+
+  boosted_machine = bob.learn.boosting.BoostedMachine()
+  assert boosted_machine.compiled
+  weights = numpy.random.rand(20)
+  for i in range(20):
+    boosted_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(16), i % 10), weights[i])
+  assert boosted_machine.compiled
+
+  # compute the reference predictions in the same order as the weak machines are evaluated
+  expected = numpy.zeros(100)
+  weak_scores = numpy.ndarray((100,), numpy.float64)
+  for i in reversed(range(20)):
+    boosted_machine.weak_machines[i](features, weak_scores)
+    expected += weights[i] * weak_scores
+
+  scores = numpy.ndarray((100,), numpy.float64)
+  boosted_machine(features, scores)
+  assert (scores == expected).all()
+  nose.tools.eq_(boosted_machine(features[0]), expected[0])
+
+  # the compiled LUT is restored after loading
+  temp = tempfile.mkstemp(prefix = "xbbst_", suffix=".hdf5")[1]
+  boosted_machine.save(bob.io.base.HDF5File(temp, 'w'))
+  loaded_machine = bob.learn.boosting.BoostedMachine(bob.io.base.HDF5File(temp))
+  os.remove(temp)
+  assert loaded_machine.compiled
+  loaded_machine(features, scores)
+  assert (scores == expected).all()
+
+  # other weak machines cannot be compiled
+  boosted_machine.add_weak_machine(bob.learn.boosting.StumpMachine(7.5, 1., 0), 1.)
+  assert not boosted_machine.compiled
+  boosted_machine(features, scores)
+  assert numpy.allclose(scores, expected + numpy.where(features[:,0] >= 7.5, 1., -1.))
+
+
+def test_blocked_forward():
+  # test that processing large feature arrays in blocks of samples gives identical results
+  numpy.random.seed(13)
+  # use long feature vectors, so that the samples are split into several blocks
+  features = numpy.random.randint(0, 16, (1000, 5000)).astype(numpy.uint16)
+
+  boosted_machine = bob.learn.boosting.BoostedMachine()
+  boosted_machine.add_weak_machine(bob.learn.boosting.StumpMachine(7.5, 1., 0), 0.5)
+  for i in range(10):
+    boosted_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(16), numpy.random.randint(5000)), numpy.random.rand())
+  assert not boosted_machine.compiled
+
+  # compute the reference predictions in the same order as the weak machines are evaluated
+  expected = numpy.zeros(1000)
+  weak_scores = numpy.ndarray((1000,), numpy.float64)
+  for machine, weight in reversed(list(zip(boosted_machine.weak_machines, boosted_machine.weights[:,0]))):
+    machine(features, weak_scores)
+    expected += weight * weak_scores
+
+  for number_of_threads in (1, 3):
+    scores = numpy.ndarray((1000,), numpy.float64)
+    boosted_machine(features, scores, number_of_threads = number_of_threads)
+    assert (scores == expected).all()
+
+
+def test_soft_cascade():
+  # test the early-exit evaluation with rejection thresholds
+  numpy.random.seed(21)
+  features = numpy.random.randint(0, 16, (200, 10)).astype(numpy.uint16)
+
+  boosted_machine = bob.learn.boosting.BoostedMachine()
+  for i in range(20):
+    boosted_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(16), i % 10), numpy.random.rand())
+  assert boosted_machine.rejection_thresholds is None
+
+  # without thresholds, all samples pass all weak machines
+  scores = numpy.ndarray((200,), numpy.float64)
+  predictions = numpy.ndarray((200,), numpy.float64)
+  exit_stages = numpy.ndarray((200,), numpy.int32)
+  boosted_machine(features, scores)
+  boosted_machine.forward_with_rejection(features, predictions, exit_stages)
+  assert numpy.allclose(predictions, scores)
+  assert (exit_stages == 20).all()
+
+  # calibrate the thresholds to keep 90 % of the samples
+  thresholds = bob.learn.boosting.calibrate_rejection_thresholds(boosted_machine, features, 0.9)
+  nose.tools.eq_(thresholds.shape, (20,))
+  assert (boosted_machine.rejection_thresholds == thresholds).all()
+
+  boosted_machine.forward_with_rejection(features, predictions, exit_stages)
+  kept = exit_stages == 20
+  nose.tools.eq_(numpy.count_nonzero(kept), 180)
+  # the kept samples are those with the highest scores
+  assert numpy.min(scores[kept]) >= numpy.max(scores[~kept]) - 1e-8
+  assert (predictions[~kept] < thresholds[exit_stages[~kept]]).all()
+
+  # single sample and threaded evaluation give the same results
+  for i in range(10):
+    nose.tools.eq_(boosted_machine.forward_with_rejection(features[i]), (predictions[i], exit_stages[i]))
+  threaded_predictions = numpy.ndarray((200,), numpy.float64)
+  threaded_stages = numpy.ndarray((200,), numpy.int32)
+  boosted_machine.forward_with_rejection(features, threaded_predictions, threaded_stages, number_of_threads = 3)
+  assert (predictions == threaded_predictions).all()
+  assert (exit_stages == threaded_stages).all()
+
+  # the thresholds are stored and loaded with the machine
+  temp = tempfile.mkstemp(prefix = "xbbst_", suffix=".hdf5")[1]
+  boosted_machine.save(bob.io.base.HDF5File(temp, 'w'))
+  loaded_machine = bob.learn.boosting.BoostedMachine(bob.io.base.HDF5File(temp))
+  assert (loaded_machine.rejection_thresholds == thresholds).all()
+
+  # the number of loaded thresholds must match the number of weak machines
+  hdf5 = bob.io.base.HDF5File(temp, 'a')
+  hdf5.unlink("RejectionThresholds")
+  hdf5.set("RejectionThresholds", thresholds[:-1])
+  del hdf5
+  nose.tools.assert_raises(RuntimeError, bob.learn.boosting.BoostedMachine, bob.io.base.HDF5File(temp))
+  os.remove(temp)
+
+  # removing the thresholds
+  boosted_machine.set_rejection_thresholds(None)
+  assert boosted_machine.rejection_thresholds is None
+  nose.tools.assert_raises(RuntimeError, boosted_machine.set_rejection_thresholds, thresholds[:-1])
+
+
+def test_staged_forward():
+  # test the predictions after each round and the truncated machines
+  numpy.random.seed(3)
+  features = numpy.random.randint(0, 16, (100, 10)).astype(numpy.uint16)
+
+  boosted_machine = bob.learn.boosting.BoostedMachine()
+  for i in range(20):
+    boosted_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(16), i % 10), numpy.random.rand())
+
+  staged = boosted_machine.staged_forward(features)
+  nose.tools.eq_(staged.shape, (100, 20))
+  scores = numpy.ndarray((100,), numpy.float64)
+  boosted_machine(features, scores)
+  assert numpy.allclose(staged[:,-1], scores)
+
+  rounds = numpy.array([0, 1, 5, 5, 12], numpy.int32)
+  selected = boosted_machine.staged_forward(features, rounds, number_of_threads = 2)
+  nose.tools.eq_(selected.shape, (100, 5))
+  assert (selected[:,0] == 0).all()
+  assert (selected[:,1:] == staged[:,rounds[1:]-1]).all()
+
+  for number_of_machines in (1, 5, 12):
+    truncated = boosted_machine.truncate(number_of_machines)
+    nose.tools.eq_(len(truncated.weak_machines), number_of_machines)
+    assert (truncated.weights == boosted_machine.weights[:number_of_machines]).all()
+    truncated(features, scores)
+    assert numpy.allclose(scores, staged[:,number_of_machines-1])
+  # the original machine is not changed by truncating it
+  nose.tools.eq_(len(boosted_machine.weak_machines), 20)
+  boosted_machine(features, scores)
+  assert numpy.allclose(scores, staged[:,-1])
+
+  # multi-variate machines return one prediction per output
+  multi_machine = bob.learn.boosting.BoostedMachine()
+  for i in range(5):
+    multi_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(16, 3), numpy.random.randint(0, 10, 3).astype(numpy.int32)), numpy.random.rand(3))
+  multi_scores = numpy.ndarray((100, 3), numpy.float64)
+  multi_machine(features, multi_scores)
+  nose.tools.eq_(multi_machine.staged_forward(features).shape, (100, 5, 3))
+  assert numpy.allclose(multi_machine.staged_forward(features)[:,-1], multi_scores)
+
+  nose.tools.assert_raises(RuntimeError, boosted_machine.staged_forward, features, numpy.array([2, 1], numpy.int32))
+  nose.tools.assert_raises(ValueError, boosted_machine.truncate, 21)
+
+
+def test_uint8_forward():
+  # test that uint8 features give the same predictions as uint16 features
+  numpy.random.seed(4)
+  features = numpy.random.randint(0, 256, (100, 10)).astype(numpy.uint8)
+  features16 = features.astype(numpy.uint16)
+
+  lut_machine = bob.learn.boosting.BoostedMachine()
+  stump_machine = bob.learn.boosting.BoostedMachine()
+  for i in range(10):
+    lut_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.random.randn(256), i), numpy.random.rand())
+    stump_machine.add_weak_machine(bob.learn.boosting.StumpMachine(numpy.random.randint(0, 256), 1., i), numpy.random.rand())
+
+  for machine in (lut_machine, stump_machine):
+    scores8 = numpy.ndarray((100,), numpy.float64)
+    scores16 = numpy.ndarray((100,), numpy.float64)
+    machine(features, scores8, number_of_threads = 2)
+    machine(features16, scores16)
+    assert (scores8 == scores16).all()
+    nose.tools.eq_(machine(features[0]), machine(features16[0]))
+    assert (machine.staged_forward(features) == machine.staged_forward(features16)).all()
+    stages8 = numpy.ndarray((100,), numpy.int32)
+    stages16 = numpy.ndarray((100,), numpy.int32)
+    machine.forward_with_rejection(features, scores8, stages8)
+    machine.forward_with_rejection(features16, scores16, stages16)
+    assert (scores8 == scores16).all()
+    assert (stages8 == stages16).all()
+
+  # the weak machines support uint8 features as well
+  weak_scores8 = numpy.ndarray((100,), numpy.float64)
+  weak_scores16 = numpy.ndarray((100,), numpy.float64)
+  for weak_machine in lut_machine.weak_machines + stump_machine.weak_machines:
+    weak_machine(features, weak_scores8)
+    weak_machine(features16, weak_scores16)
+    assert (weak_scores8 == weak_scores16).all()
+
+  nose.tools.assert_raises(TypeError, lut_machine, features.astype(numpy.int8), scores8)
+
+
+def test_float_forward():
+  # test that stump machines trained on float features can be evaluated on float32 and float64 features
+  numpy.random.seed(5)
+  features = numpy.random.randn(200, 10)
+  trainer = bob.learn.boosting.StumpTrainer()
+  boosted_machine = bob.learn.boosting.BoostedMachine()
+  for i in range(10):
+    boosted_machine.add_weak_machine(trainer.train(features, numpy.random.randn(200, 1)), numpy.random.rand())
+
+  reference = numpy.zeros((200,))
+  weak_scores = numpy.ndarray((200,), numpy.float64)
+  for weak_machine, weight in zip(boosted_machine.weak_machines, boosted_machine.weights[:,0]):
+    weak_machine(features, weak_scores)
+    reference += weight * weak_scores
+
+  scores = numpy.ndarray((200,), numpy.float64)
+  boosted_machine(features, scores, number_of_threads = 2)
+  assert numpy.allclose(scores, reference)
+  assert numpy.allclose(boosted_machine(features[0]), reference[0])
+  assert numpy.allclose(boosted_machine.staged_forward(features)[:,-1], reference)
+
+  # float32 features give the same results as the same values in float64
+  features32 = features.astype(numpy.float32)
+  scores32 = numpy.ndarray((200,), numpy.float64)
+  boosted_machine(features32, scores32)
+  boosted_machine(features32.astype(numpy.float64), scores)
+  assert (scores32 == scores).all()
+  stages = numpy.ndarray((200,), numpy.int32)
+  boosted_machine.forward_with_rejection(features32, scores32, stages, number_of_threads = 2)
+  assert (scores32 == scores).all()
+
+  # LUT machines do not support float features
+  lut_machine = bob.learn.boosting.BoostedMachine()
+  lut_machine.add_weak_machine(bob.learn.boosting.LUTMachine(numpy.ones((16,1)), numpy.zeros((1,), numpy.int32)), 1.)
+  nose.tools.assert_raises(RuntimeError, lut_machine, features, scores, number_of_threads = 2)
+
+
 if __name__ == '__main__':
   test_machine()
@@ -0,0 +1,34 @@
+import unittest
+import bob.learn.boosting
+import numpy
+
+class TestBinnedStumpTrainer(unittest.TestCase):
+  """Perform test on the binned stump weak trainer"""
+
+  def _gain(self, stump, features, loss):
+    # the sum of the negative gradient of the samples above the threshold
+    return abs(numpy.sum(-loss[features[:,stump.feature_indices()[0]] >= stump.threshold]))
+
+  def test01_binned_gain(self):
+    # with enough bins, the binned stump reaches the same gain as the exact stump
+    features = numpy.random.normal(size=(100, 10))
+    loss = numpy.random.normal(size=100)
+
+    exact = bob.learn.boosting.StumpTrainer().train(features, loss)
+    binned = bob.learn.boosting.BinnedStumpTrainer(number_of_bins=128).train(features, loss)
+    self.assertAlmostEqual(self._gain(binned, features, loss), self._gain(exact, features, loss))
+
+    # with fewer bins, the threshold is one of the bin edges
+    trainer = bob.learn.boosting.BinnedStumpTrainer(number_of_bins=8, binning='uniform')
+    stump = trainer.train(features, loss)
+    index = stump.feature_indices()[0]
+    edges = numpy.linspace(features[:,index].min(), features[:,index].max(), 9)[1:-1]
+    self.assertTrue(numpy.allclose(numpy.min(numpy.abs(edges - stump.threshold)), 0.))
+    self.assertTrue(self._gain(stump, features, loss) <= self._gain(exact, features, loss) + 1e-8)
+
+  def test02_binned_constant(self):
+    # constant features do not gain anything
+    stump = bob.learn.boosting.BinnedStumpTrainer().train(numpy.ones((10, 3)), numpy.ones(10))
+    self.assertEqual(stump.threshold, 0.)
+    self.assertEqual(stump.polarity, 1.)
+    self.assertRaises(ValueError, bob.learn.boosting.BinnedStumpTrainer, 256, 'unknown')
@@ -0,0 +1,59 @@
+import unittest
+import bob.learn.boosting
+import bob.io.base
+import numpy
+import os
+import tempfile
+
+class TestCascadeTrainer(unittest.TestCase):
+  """Perform test on the cascade trainer"""
+
+  def _data(self):
+    numpy.random.seed(1)
+    positives = numpy.random.randint(100, 200, (200, 5)).astype(numpy.uint16)
+    negatives = numpy.random.randint(0, 200, (5000, 5)).astype(numpy.uint16)
+    return positives, negatives
+
+  def test01_cascade_training(self):
+    positives, negatives = self._data()
+    boosting = bob.learn.boosting.Boosting(bob.learn.boosting.StumpTrainer(), bob.learn.boosting.ExponentialLoss())
+    trainer = bob.learn.boosting.CascadeTrainer(boosting, hit_rate = 0.99, false_alarm_rate = 0.3, maximum_rounds = 20, negatives_per_stage = 1000)
+    cascade = trainer.train(positives, negatives, number_of_stages = 3)
+
+    self.assertEqual(len(cascade), 3)
+    self.assertEqual(cascade.thresholds().shape, (3,))
+    for machine in cascade.stages():
+      self.assertTrue(1 <= len(machine.weak_machines) <= 20)
+
+    # each stage keeps at least 99 % of the remaining positives
+    predictions, exit_stages = cascade(positives)
+    self.assertTrue(numpy.mean(exit_stages == 3) >= 0.99 ** 3)
+    # and most of the negatives are rejected
+    predictions, exit_stages = cascade(negatives, number_of_threads = 2)
+    self.assertTrue(numpy.mean(exit_stages == 3) < 0.3)
+    self.assertTrue((numpy.flatnonzero(exit_stages == 3) == cascade.accepted(negatives)).all())
+
+    # single samples are rejected by the same stages
+    for i in range(20):
+      prediction, exit_stage = cascade(negatives[i])
+      self.assertEqual(exit_stage, exit_stages[i])
+      self.assertAlmostEqual(prediction, predictions[i])
+
+  def test02_cascade_io(self):
+    positives, negatives = self._data()
+    boosting = bob.learn.boosting.Boosting(bob.learn.boosting.StumpTrainer(), bob.learn.boosting.ExponentialLoss())
+    cascade = bob.learn.boosting.CascadeTrainer(boosting, maximum_rounds = 10).train(positives, negatives, number_of_stages = 2)
+
+    temp = tempfile.mkstemp(prefix = "xbbst_", suffix=".hdf5")[1]
+    cascade.save(bob.io.base.HDF5File(temp, 'w'))
+    loaded = bob.learn.boosting.Cascade(bob.io.base.HDF5File(temp))
+    os.remove(temp)
+
+    self.assertEqual(len(loaded), len(cascade))
+    self.assertTrue(numpy.allclose(loaded.thresholds(), cascade.thresholds()))
+    predictions, exit_stages = cascade(negatives)
+    loaded_predictions, loaded_exit_stages = loaded(negatives)
+    self.assertTrue(numpy.allclose(predictions, loaded_predictions))
+    self.assertTrue((exit_stages == loaded_exit_stages).all())
+
+    self.assertRaises(ValueError, bob.learn.boosting.Cascade(), negatives)
@@ -104,6 +104,124 @@ class TestLutTrainer(unittest.TestCase):
         self.assertEqual(machine.feature_indices()[0], selected_index)
 
 
+    def test06_lut_threads(self):
+        # test that the multi-threaded feature scan selects the same features as the single-threaded one
+        num_samples = 100
+        max_feature = 20
+        delta = 5
+        range_feature = max_feature + delta
+        features = bob.io.base.load(bob.io.base.test_utils.datafile('testdata.hdf5', 'bob.learn.boosting')).astype(numpy.uint16)
+
+        x_train = numpy.vstack((features, features))
+        x_train[0:num_samples,5] = x_train[0:num_samples,5] + delta
+        y_train = numpy.vstack((numpy.ones([num_samples,1]),-numpy.ones([num_samples,1])))
+        y_train = numpy.hstack((y_train, -y_train, numpy.random.choice([-1., 1.], (2*num_samples,1))))
+        loss_grad = -y_train*(numpy.exp(y_train*numpy.zeros(y_train.shape)))
+
+        for selection_style in ('independent', 'shared'):
+          serial = bob.learn.boosting.LUTTrainer(range_feature, 3, selection_style)
+          parallel = bob.learn.boosting.LUTTrainer(range_feature, 3, selection_style, number_of_threads=4)
+          self.assertEqual(parallel.number_of_threads, 4)
+
+          machine1 = serial.train(x_train, loss_grad)
+          machine2 = parallel.train(x_train, loss_grad)
+
+          self.assertTrue((machine1.feature_indices() == machine2.feature_indices()).all())
+          self.assertTrue((machine1.lut == machine2.lut).all())
+
+
+    def test07_weighted_histograms(self):
+      # test that the bulk weighted histograms are identical to numpy.histogram computed per feature and output
+      max = 20
+      features = numpy.random.randint(0, max, (500, 10)).astype(numpy.uint16)
+      weights = numpy.random.random((500, 3)) - 0.5
+
+      histograms = bob.learn.boosting.weighted_histograms(features, weights, max)
+      self.assertEqual(histograms.shape, (10, max, 3))
+
+      for f in range(10):
+        for o in range(3):
+          reference, _ = numpy.histogram(features[:,f], range(max+1), weights = weights[:,o])
+          self.assertTrue(numpy.allclose(histograms[f,:,o], reference))
+
+      # the default number of bins is given by the maximum feature value
+      self.assertEqual(bob.learn.boosting.weighted_histograms(features, weights).shape[1], features.max()+1)
+      self.assertRaises(ValueError, bob.learn.boosting.weighted_histograms, features, weights, features.max())
+
+
+    def test08_sample_indices(self):
+      # test that training with sample indices is identical to training with the selected samples
+      features = numpy.random.randint(0, 20, (300, 10)).astype(numpy.uint16)
+      loss_grad = numpy.random.random((300, 2)) - 0.5
+      indices = numpy.sort(numpy.random.choice(300, 100, replace=False)).astype(numpy.int32)
+
+      histograms = bob.learn.boosting.weighted_histograms(features, loss_grad, 20, indices)
+      self.assertTrue(numpy.allclose(histograms, bob.learn.boosting.weighted_histograms(features[indices], loss_grad[indices], 20)))
+
+      for selection_style in ('independent', 'shared'):
+        trainer = bob.learn.boosting.LUTTrainer(20, 2, selection_style)
+        machine1 = trainer.train(features[indices], loss_grad[indices])
+        machine2 = trainer.train(features, loss_grad, indices)
+        self.assertTrue((machine1.feature_indices() == machine2.feature_indices()).all())
+        self.assertTrue((machine1.lut == machine2.lut).all())
+
+      self.assertRaises(ValueError, trainer.train, features, loss_grad, numpy.array([0, 300], numpy.int32))
+
+
+    def test09_feature_fraction(self):
+      # test that the random feature subsets are reproducible
+      features = numpy.random.randint(0, 20, (300, 100)).astype(numpy.uint16)
+      loss_grad = numpy.random.random((300, 1)) - 0.5
+
+      trainer1 = bob.learn.boosting.LUTTrainer(20, feature_fraction=0.1, seed=42)
+      trainer2 = bob.learn.boosting.LUTTrainer(20, number_of_threads=4, feature_fraction=0.1, seed=42)
+      self.assertEqual(trainer1.feature_fraction, 0.1)
+      for round in range(5):
+        machine1 = trainer1.train(features, loss_grad)
+        machine2 = trainer2.train(features, loss_grad)
+        self.assertTrue((machine1.feature_indices() == machine2.feature_indices()).all())
+        self.assertTrue((machine1.lut == machine2.lut).all())
+
+      # the random state can be stored and restored, also in another trainer
+      state = trainer1.random_state
+      machine1 = trainer1.train(features, loss_grad)
+      trainer3 = bob.learn.boosting.LUTTrainer(20, feature_fraction=0.1)
+      trainer3.random_state = state
+      self.assertTrue((trainer3.train(features, loss_grad).feature_indices() == machine1.feature_indices()).all())
+      self.assertEqual(trainer3.random_state, trainer1.random_state)
+      self.assertRaises(ValueError, setattr, trainer3, 'random_state', 'invalid')
+
+      # scanning all features selects the best feature
+      full = bob.learn.boosting.LUTTrainer(20, feature_fraction=1.).train(features, loss_grad)
+      self.assertTrue((full.feature_indices() == bob.learn.boosting.LUTTrainer(20).train(features, loss_grad).feature_indices()).all())
+
+      self.assertRaises(ValueError, bob.learn.boosting.LUTTrainer, 20, feature_fraction=0.)
+
+
+    def test10_uint8_features(self):
+      # test that uint8 features are trained without conversion, and give the same results as uint16 features
+      features = numpy.random.randint(0, 256, (300, 10)).astype(numpy.uint8)
+      loss_grad = numpy.random.random((300, 2)) - 0.5
+      indices = numpy.sort(numpy.random.choice(300, 100, replace=False)).astype(numpy.int32)
+
+      histograms = bob.learn.boosting.weighted_histograms(features, loss_grad, 256)
+      self.assertTrue((histograms == bob.learn.boosting.weighted_histograms(features.astype(numpy.uint16), loss_grad, 256)).all())
+
+      for selection_style in ('independent', 'shared'):
+        trainer = bob.learn.boosting.LUTTrainer(256, 2, selection_style, number_of_threads=2)
+        machine1 = trainer.train(features, loss_grad)
+        machine2 = trainer.train(features.astype(numpy.uint16), loss_grad)
+        self.assertTrue((machine1.feature_indices() == machine2.feature_indices()).all())
+        self.assertTrue((machine1.lut == machine2.lut).all())
+
+        machine1 = trainer.train(features, loss_grad, indices)
+        machine2 = trainer.train(features.astype(numpy.uint16), loss_grad, indices)
+        self.assertTrue((machine1.feature_indices() == machine2.feature_indices()).all())
+        self.assertTrue((machine1.lut == machine2.lut).all())
+
+      self.assertRaises(TypeError, trainer.train, features.astype(numpy.int8), loss_grad)
+
+
     def notest05_weighted_histogram(self):
       # test that the weighted histogram implementation in C++ returns the same values as numpy.histogram
 
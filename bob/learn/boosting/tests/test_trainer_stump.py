@@ -1,5 +1,6 @@
 import unittest
 import random
+import threading
 import bob.learn.boosting
 import numpy
 
@@ -215,3 +216,144 @@ class TestStumpTrainer(unittest.TestCase):
     self.assertEqual(trained_polarity, polarity)
 
 
+
+
+  def test08_presorted_features(self):
+    # test that the presorted features give the same results as computing the thresholds for each feature separately
+    trainer = bob.learn.boosting.StumpTrainer()
+
+    features = numpy.random.randint(0, 21, (200, 10)).astype(numpy.float64)
+    trainer.prepare(features)
+
+    for i in range(5):
+      loss = numpy.random.normal(size=(200,1))
+      stump = trainer.train(features, loss)
+
+      results = [trainer.compute_threshold(features[:,f], -loss[:,0]) for f in range(10)]
+      index = numpy.argmax([result[2] for result in results])
+      self.assertEqual(stump.feature_indices(), index)
+      self.assertEqual(stump.polarity, results[index][0])
+      self.assertAlmostEqual(stump.threshold, results[index][1])
+
+
+  def test09_compute_thresh_gain(self):
+    # test the gain of the best threshold against an exhaustive search
+    trainer = bob.learn.boosting.StumpTrainer()
+
+    features = numpy.random.randint(0, 10, 100).astype(numpy.float64)
+    gradient = numpy.random.normal(size=100)
+
+    trained_polarity, trained_threshold, trained_gain = trainer.compute_threshold(features, gradient)
+
+    values = numpy.unique(features)
+    thresholds = (values[:-1] + values[1:]) * 0.5
+    gains = [numpy.sum(gradient[features > threshold]) for threshold in thresholds]
+    best = numpy.argmax(numpy.absolute(gains))
+    self.assertAlmostEqual(trained_gain, abs(gains[best]))
+    self.assertEqual(trained_threshold, thresholds[best])
+    self.assertEqual(trained_polarity, -1 if gains[best] > 0 else 1)
+
+
+  def test10_stump_threads(self):
+    # test that the multi-threaded trainer selects the same stumps for float and uint16 features
+    features = numpy.random.randint(0, 100, (300, 50)).astype(numpy.uint16)
+    loss = numpy.random.normal(size=(300,1))
+
+    serial = bob.learn.boosting.StumpTrainer()
+    parallel = bob.learn.boosting.StumpTrainer(number_of_threads=4)
+    self.assertEqual(parallel.number_of_threads, 4)
+
+    stump1 = serial.train(features.astype(numpy.float64), loss)
+    for stump2 in (parallel.train(features, loss), parallel.train(features.astype(numpy.float64), loss[:,0])):
+      self.assertEqual(stump1.feature_indices(), stump2.feature_indices())
+      self.assertEqual(stump1.threshold, stump2.threshold)
+      self.assertEqual(stump1.polarity, stump2.polarity)
+
+
+  def test11_sample_indices(self):
+    # test that training with sample indices is identical to training with the selected samples
+    features = numpy.random.randint(0, 100, (300, 20)).astype(numpy.uint16)
+    loss = numpy.random.normal(size=(300,1))
+    indices = numpy.sort(numpy.random.choice(300, 100, replace=False)).astype(numpy.int32)
+
+    stump1 = bob.learn.boosting.StumpTrainer().train(features[indices], loss[indices])
+    stump2 = bob.learn.boosting.StumpTrainer(number_of_threads=2).train(features, loss, indices)
+    self.assertEqual(stump1.feature_indices(), stump2.feature_indices())
+    self.assertEqual(stump1.threshold, stump2.threshold)
+    self.assertEqual(stump1.polarity, stump2.polarity)
+
+
+  def test12_reference(self):
+    # test that the native trainer selects the same stumps as the Python reference implementation
+    from bob.learn.boosting.StumpTrainer import StumpTrainer as ReferenceStumpTrainer
+    features = numpy.random.randint(0, 50, (200, 30)).astype(numpy.float64)
+    reference = ReferenceStumpTrainer()
+    native = bob.learn.boosting.StumpTrainer(number_of_threads=2)
+
+    for i in range(3):
+      loss = numpy.random.normal(size=(200,1))
+      stump1 = reference.train(features, loss)
+      stump2 = native.train(features, loss)
+      self.assertEqual(stump1.feature_indices(), stump2.feature_indices())
+      self.assertEqual(stump1.threshold, stump2.threshold)
+      self.assertEqual(stump1.polarity, stump2.polarity)
+
+
+  def test13_concurrent(self):
+    # test that threads sharing one trainer with different features get the same stumps as separate trainers
+    features = [numpy.random.randint(0, 100, (300, 20)).astype(numpy.uint16) for i in range(4)]
+    losses = [numpy.random.normal(size=(300,1)) for i in range(4)]
+    expected = [bob.learn.boosting.StumpTrainer().train(f, l) for f, l in zip(features, losses)]
+
+    trainer = bob.learn.boosting.StumpTrainer(number_of_threads=2)
+    results = [[] for i in range(4)]
+    def train(i):
+      for k in range(5):
+        results[i].append(trainer.train(features[i], losses[i]))
+    threads = [threading.Thread(target=train, args=(i,)) for i in range(4)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+
+    for i in range(4):
+      self.assertEqual(len(results[i]), 5)
+      for stump in results[i]:
+        self.assertEqual(stump.feature_indices(), expected[i].feature_indices())
+        self.assertEqual(stump.threshold, expected[i].threshold)
+        self.assertEqual(stump.polarity, expected[i].polarity)
+
+
+  def test14_feature_types(self):
+    # test that features of other types are converted to float
+    features = numpy.random.randint(-50, 50, (200, 10))
+    loss = numpy.random.normal(size=(200,1))
+    stump1 = bob.learn.boosting.StumpTrainer().train(features.astype(numpy.float64), loss)
+    for dtype in (numpy.float32, numpy.int64):
+      stump2 = bob.learn.boosting.StumpTrainer().train(features.astype(dtype), loss)
+      self.assertEqual(stump1.feature_indices(), stump2.feature_indices())
+      self.assertEqual(stump1.threshold, stump2.threshold)
+      self.assertEqual(stump1.polarity, stump2.polarity)
+
+
+  def test15_modified_features(self):
+    # test that the sort order is not re-used for features with a different shape or for features modified in-place before boosting
+    features = numpy.random.randint(0, 100, (200, 10)).astype(numpy.float64)
+    trainer = bob.learn.boosting.StumpTrainer()
+    trainer.train(features, numpy.random.normal(size=200))
+
+    # the same memory with a different shape
+    features.shape = (400, 5)
+    loss = numpy.random.normal(size=400)
+    stump1 = trainer.train(features, loss)
+    stump2 = bob.learn.boosting.StumpTrainer().train(features.copy(), loss)
+    self.assertEqual(stump1.feature_indices(), stump2.feature_indices())
+    self.assertEqual(stump1.threshold, stump2.threshold)
+    self.assertEqual(stump1.polarity, stump2.polarity)
+
+    # the same array with modified values
+    targets = numpy.where(numpy.random.normal(size=400) > 0, 1., -1.)
+    bob.learn.boosting.Boosting(trainer, bob.learn.boosting.ExponentialLoss()).train(features, targets, 2)
+    features[:] = numpy.random.randint(0, 100, features.shape)
+    machine1 = bob.learn.boosting.Boosting(trainer, bob.learn.boosting.ExponentialLoss()).train(features, targets, 3)
+    machine2 = bob.learn.boosting.Boosting(bob.learn.boosting.StumpTrainer(), bob.learn.boosting.ExponentialLoss()).train(features.copy(), targets, 3)
+    self.assertEqual(list(machine1.indices), list(machine2.indices))
+    self.assertTrue(numpy.allclose(machine1.weights, machine2.weights))
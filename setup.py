@@ -32,7 +32,7 @@ build_requires = load_requirements()
 version = open("version.txt").read().rstrip()
 
 packages = ['boost']
-boost_modules = ['system']
+boost_modules = ['system', 'thread']
 
 # The only thing we do in this file is to call the setup() function with all
 # parameters that define our package.
@@ -87,12 +87,16 @@ setup(
         [
           "bob/learn/boosting/cpp/LossFunction.cpp",
           "bob/learn/boosting/cpp/JesorskyLoss.cpp",
+          "bob/learn/boosting/cpp/ExponentialLoss.cpp",
+          "bob/learn/boosting/cpp/LogitLoss.cpp",
+          "bob/learn/boosting/cpp/TangentialLoss.cpp",
 
           "bob/learn/boosting/cpp/StumpMachine.cpp",
           "bob/learn/boosting/cpp/LUTMachine.cpp",
           "bob/learn/boosting/cpp/BoostedMachine.cpp",
 
           "bob/learn/boosting/cpp/LUTTrainer.cpp",
+          "bob/learn/boosting/cpp/StumpTrainer.cpp",
         ],
         bob_packages = bob_packages,
         version = version,
@@ -106,6 +110,7 @@ setup(
           "bob/learn/boosting/main.cpp",
           "bob/learn/boosting/loss_function.cpp",
           "bob/learn/boosting/jesorsky_loss.cpp",
+          "bob/learn/boosting/classification_loss.cpp",
 
           "bob/learn/boosting/weak_machine.cpp",
           "bob/learn/boosting/stump_machine.cpp",
@@ -113,6 +118,7 @@ setup(
           "bob/learn/boosting/boosted_machine.cpp",
 
           "bob/learn/boosting/lut_trainer.cpp",
+          "bob/learn/boosting/stump_trainer.cpp",
         ],
         bob_packages = bob_packages,
         version = version,